@@ -0,0 +1,125 @@
+# gimnasio_mgmt_gui/benchmarks/_bench_common.py
+# Utilidades compartidas por los scripts de benchmark (BD temporal, percentiles, informes).
+
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+# Los benchmarks se ejecutan como scripts (python benchmarks/bench_xxx.py): añadir la raíz del proyecto.
+PROJECT_ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT_DIR not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT_DIR)
+
+from core_logic.database import set_database_path, create_or_verify_tables, get_db_connection  # noqa: E402
+from core_logic.utils import normalize_text_for_search, make_spanish_sort_key  # noqa: E402
+
+# Datos sintéticos realistas para poblar BD grandes (nombres con tildes y eñes a propósito).
+SAMPLE_FIRST_NAMES = [
+    "José", "María", "Lucía", "Álvaro", "Iñaki", "Begoña", "Raúl", "Sofía", "Martín", "Nuria",
+    "Andrés", "Inés", "Jesús", "Ángela", "Óscar", "Zoe", "Héctor", "Elena", "Adrián", "Noelia",
+]
+SAMPLE_SURNAMES = [
+    "Muñoz", "Núñez", "García", "Pérez", "Gómez", "Ibáñez", "Rodríguez", "Fernández", "López", "Martínez",
+    "Sánchez", "Díaz", "Álvarez", "Romero", "Peña", "Castaño", "Ortega", "Rubio", "Suárez", "Domínguez",
+]
+SAMPLE_INCOME_CATEGORIES = ["Cuotas Socios", "Venta Productos", "Clases Dirigidas", "Entrenamiento Personal"]
+SAMPLE_EXPENSE_CATEGORIES = ["Costes de Suministros", "Mantenimiento", "Nóminas", "Material Deportivo"]
+SAMPLE_CITIES = ["Sevilla", "Málaga", "Córdoba", "Cádiz", "Jaén", "Huelva", "Almería", "Granada", "Logroño", "A Coruña"]
+
+
+def create_temporary_database(prefix: str = "gym_bench_") -> str:
+    """Crea una BD vacía con el esquema de la aplicación en un directorio temporal y la activa."""
+    temp_dir = tempfile.mkdtemp(prefix=prefix)
+    database_path = os.path.join(temp_dir, "gym_bench.db")
+    use_database(database_path)
+    if not create_or_verify_tables():
+        raise RuntimeError(f"No se pudo crear el esquema en {database_path}")
+    return database_path
+
+
+def use_database(database_path: str):
+    """Apunta core_logic a una BD concreta (p. ej. en un proceso hijo de un benchmark)."""
+    set_database_path(database_path)
+
+
+def seed_members(count: int, batch_size: int = 20000, random_seed: int = 42) -> int:
+    """Inserta `count` socios sintéticos directamente con SQL (mucho más rápido que add_new_member)."""
+    rng = random.Random(random_seed)
+    conn = get_db_connection()
+    inserted = 0
+    while inserted < count:
+        batch = []
+        for index in range(inserted, min(count, inserted + batch_size)):
+            full_name = f"{rng.choice(SAMPLE_FIRST_NAMES)} {rng.choice(SAMPLE_SURNAMES)} {rng.choice(SAMPLE_SURNAMES)}"
+            batch.append((
+                f"MBR-{index:012X}", full_name, normalize_text_for_search(full_name), make_spanish_sort_key(full_name),
+                f"6{rng.randrange(10**8):08d}", rng.choice(SAMPLE_CITIES),
+                f"2023-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}", "Activo" if rng.random() < 0.8 else "Inactivo",
+            ))
+        with conn:
+            conn.executemany(
+                """INSERT INTO members (internal_member_id, full_name, full_name_search_key, full_name_sort_key,
+                                        phone_number, address_city, join_date, current_status)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                batch
+            )
+        inserted += len(batch)
+    return inserted
+
+
+def seed_transactions(count: int, days_span: int = 3 * 365, batch_size: int = 20000, random_seed: int = 42) -> int:
+    """Inserta `count` transacciones sintéticas repartidas en los últimos `days_span` días."""
+    rng = random.Random(random_seed)
+    today = date.today()
+    conn = get_db_connection()
+    inserted = 0
+    while inserted < count:
+        batch = []
+        for index in range(inserted, min(count, inserted + batch_size)):
+            is_income = rng.random() < 0.7
+            category = rng.choice(SAMPLE_INCOME_CATEGORIES if is_income else SAMPLE_EXPENSE_CATEGORIES)
+            batch.append((
+                f"{'TRN' if is_income else 'EXP'}-{index:012X}", "income" if is_income else "expense",
+                (today - timedelta(days=rng.randrange(days_span))).isoformat(),
+                category, category, rng.randint(500, 90000), # Importe en céntimos
+                rng.choice(["Efectivo", "Tarjeta", "Transferencia"]),
+            ))
+        with conn:
+            conn.executemany(
+                """INSERT INTO financial_transactions (internal_transaction_id, transaction_type, transaction_date,
+                                                       description, category, amount, payment_method)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                batch
+            )
+        inserted += len(batch)
+    return inserted
+
+
+def time_call(func, *args, repeat: int = 5, **kwargs) -> list[float]:
+    """Ejecuta func(*args, **kwargs) `repeat` veces y devuelve la duración de cada ejecución (segundos)."""
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(*args, **kwargs)
+        durations.append(time.perf_counter() - started)
+    return durations
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Percentil por el método del rango más cercano sobre una lista YA ordenada."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def print_latency_report(title: str, latencies_seconds: list[float]):
+    """Imprime n, p50, p99 y máximo de una lista de latencias (en milisegundos)."""
+    values_ms = sorted(value * 1000 for value in latencies_seconds)
+    print(f"{title}: n={len(values_ms)}"
+          f"  p50={percentile(values_ms, 0.50):.2f} ms"
+          f"  p99={percentile(values_ms, 0.99):.2f} ms"
+          f"  max={(values_ms[-1] if values_ms else 0.0):.2f} ms")
@@ -0,0 +1,93 @@
+# gimnasio_mgmt_gui/benchmarks/bench_date_decoding.py
+# Microbenchmark de las funciones de fecha de core_logic.utils y de la decodificación de columnas DATE:
+# strptime (ruta anterior) frente al camino rápido fromisoformat de parse_string_to_date, y filas leídas
+# como texto + parse_string_to_date + format_date_for_ui por fila frente a los conversores registrados
+# (las filas llegan como date y solo se formatean las visibles al pintar).
+#
+# Uso:
+#   python benchmarks/bench_date_decoding.py [--calls 200000] [--rows 100000] [--visible 50] [--repeat 5]
+
+import argparse
+import sqlite3
+from datetime import datetime
+
+from _bench_common import create_temporary_database, seed_members, time_call, print_latency_report
+
+from core_logic.database import get_db_connection
+from core_logic.utils import (
+    parse_string_to_date, parse_string_to_datetime, format_date_for_ui, format_datetime_for_ui
+)
+
+SAMPLE_DB_DATE = "2024-03-15"
+SAMPLE_UI_DATE = "15/03/2024"
+SAMPLE_DB_DATETIME = "2024-03-15 18:42:07"
+SUMMARY_QUERY = "SELECT id, internal_member_id, full_name, current_status, join_date FROM members ORDER BY id"
+
+
+def _legacy_parse_date(date_str: str):
+    """Ruta anterior de parse_string_to_date: strptime con cada formato hasta que uno encaja."""
+    for fmt in ("%Y-%m-%d", "%d/%m/%Y"):
+        try:
+            return datetime.strptime(date_str.strip(), fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def _repeat_calls(func, value, calls: int):
+    for _ in range(calls):
+        func(value)
+
+
+def _decode_as_text(text_conn: sqlite3.Connection) -> list[dict]:
+    """Como antes: la fecha llega como texto y se parsea y formatea en todas las filas."""
+    rows = []
+    for row in text_conn.execute(SUMMARY_QUERY):
+        member_dict = dict(row)
+        join_date_obj = _legacy_parse_date(row['join_date'])
+        member_dict['join_date_ui'] = format_date_for_ui(join_date_obj)
+        member_dict['join_date_obj'] = join_date_obj
+        rows.append(member_dict)
+    return rows
+
+
+def _decode_with_converters(visible_rows: int) -> list[str]:
+    """Ahora: el conversor DATE entrega date y la GUI solo formatea las filas que pinta."""
+    rows = [dict(row) for row in get_db_connection().execute(SUMMARY_QUERY)]
+    return [format_date_for_ui(member_dict['join_date']) for member_dict in rows[:visible_rows]]
+
+
+def run_benchmark(calls: int, rows: int, visible_rows: int, repeat: int):
+    print(f"=== Funciones de utils ({calls:,} llamadas) ===")
+    parsed_date = parse_string_to_date(SAMPLE_DB_DATE)
+    parsed_datetime = parse_string_to_datetime(SAMPLE_DB_DATETIME)
+    for label, func, value in (
+        ("strptime AAAA-MM-DD (anterior)", _legacy_parse_date, SAMPLE_DB_DATE),
+        ("parse_string_to_date AAAA-MM-DD", parse_string_to_date, SAMPLE_DB_DATE),
+        ("parse_string_to_date DD/MM/AAAA", parse_string_to_date, SAMPLE_UI_DATE),
+        ("parse_string_to_date(date)", parse_string_to_date, parsed_date),
+        ("parse_string_to_datetime texto", parse_string_to_datetime, SAMPLE_DB_DATETIME),
+        ("format_date_for_ui", format_date_for_ui, parsed_date),
+        ("format_datetime_for_ui", format_datetime_for_ui, parsed_datetime),
+    ):
+        latencies = time_call(_repeat_calls, func, value, calls, repeat=repeat)
+        print(f"   {label:<34} {min(latencies) / calls * 1e9:8.0f} ns/llamada")
+
+    database_path = create_temporary_database(prefix="gym_bench_dates_")
+    seed_members(rows)
+    text_conn = sqlite3.connect(database_path) # Sin detect_types: las fechas llegan como texto
+    text_conn.row_factory = sqlite3.Row
+    print(f"\n=== Listado de {rows:,} socios ({visible_rows} filas visibles) ===")
+    print_latency_report("   Texto + parse + formato por fila", time_call(_decode_as_text, text_conn, repeat=repeat))
+    print_latency_report("   Conversor DATE + formato al pintar", time_call(_decode_with_converters, visible_rows, repeat=repeat))
+    text_conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Microbenchmark de fechas: strptime frente a fromisoformat y conversores.")
+    parser.add_argument("--calls", type=int, default=200000, help="Llamadas por función de utils.")
+    parser.add_argument("--rows", type=int, default=100000, help="Número de socios sintéticos.")
+    parser.add_argument("--visible", type=int, default=50, help="Filas que la GUI pinta de una vez.")
+    parser.add_argument("--repeat", type=int, default=5, help="Repeticiones por medición.")
+    arguments = parser.parse_args()
+    run_benchmark(arguments.calls, arguments.rows, arguments.visible, arguments.repeat)
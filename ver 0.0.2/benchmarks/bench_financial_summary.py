@@ -0,0 +1,42 @@
+# gimnasio_mgmt_gui/benchmarks/bench_financial_summary.py
+# Latencia de los resúmenes por rango de fechas (año en curso y tres años) calculados desde
+# financial_daily_rollup frente a recalcularlos desde el libro de transacciones, con libros de distinto tamaño.
+# Con el rollup el coste depende del número de días del rango, no del número de movimientos.
+#
+# Uso:
+#   python benchmarks/bench_financial_summary.py [--sizes 10000,100000,1000000] [--repeat 5]
+
+import argparse
+from datetime import date
+
+from _bench_common import create_temporary_database, seed_transactions, time_call, print_latency_report
+
+from core_logic.finances import get_financial_summary_grouped, verify_financial_daily_rollup
+
+
+def run_benchmark(sizes: list[int], repeat: int):
+    today = date.today()
+    date_ranges = {
+        "Año en curso": today.replace(month=1, day=1).isoformat(),
+        "Últimos 3 años": today.replace(year=today.year - 3).isoformat(),
+    }
+    for size in sizes:
+        create_temporary_database(prefix=f"gym_bench_summary_{size}_")
+        seed_transactions(size)
+        mismatches = verify_financial_daily_rollup()
+        print(f"\n=== {size:,} transacciones (rollup {'consistente' if not mismatches else f'con {len(mismatches)} diferencias'}) ===")
+        for range_label, start_date_str in date_ranges.items():
+            for group_by in ([], ["month", "category"]):
+                label = f"{range_label}, {'totales' if not group_by else ' x '.join(group_by)}"
+                print_latency_report(f"   {label} | libro", time_call(
+                    get_financial_summary_grouped, group_by, start_date_str=start_date_str, from_ledger=True, repeat=repeat))
+                print_latency_report(f"   {label} | rollup", time_call(
+                    get_financial_summary_grouped, group_by, start_date_str=start_date_str, repeat=repeat))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de resúmenes financieros: rollup diario frente al libro completo.")
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="Tamaños del libro de transacciones, separados por comas.")
+    parser.add_argument("--repeat", type=int, default=5, help="Repeticiones por consulta.")
+    arguments = parser.parse_args()
+    run_benchmark([int(size) for size in arguments.sizes.split(",")], arguments.repeat)
@@ -0,0 +1,74 @@
+# gimnasio_mgmt_gui/benchmarks/bench_member_search.py
+# Compara la búsqueda de socios con FTS5 (members.search_members) frente a la consulta
+# LIKE '%término%' original, con 10k, 100k y 1M socios sintéticos. Mide también la búsqueda mientras se
+# teclea de la pantalla de socios (primera ventana de la lista virtual más el recuento, letra a letra).
+#
+# Uso:
+#   python benchmarks/bench_member_search.py [--sizes 10000,100000,1000000] [--repeat 5]
+
+import argparse
+
+from _bench_common import create_temporary_database, seed_members, time_call, print_latency_report
+
+from core_logic.database import get_db_connection
+from core_logic.members import search_members, get_members_summary_with_active_membership, count_members_summary
+from core_logic.query_cache import clear_query_cache
+from config import VIRTUAL_TREEVIEW_BLOCK_SIZE
+
+# Consulta de búsqueda anterior a FTS5 (recorre la tabla completa por el comodín inicial).
+LEGACY_LIKE_SEARCH_QUERY = """
+    SELECT id, internal_member_id, full_name, current_status, join_date FROM members
+    WHERE (full_name LIKE ? OR internal_member_id LIKE ?) ORDER BY full_name
+"""
+
+# Lo que suele teclear recepción: un nombre, nombre + apellido parcial, un apellido, parte de un ID.
+SEARCH_TERMS = ["Nuria", "Jos Muñ", "Ibáñez", "MBR-0000000001"]
+
+
+def _legacy_like_search(search_term: str) -> list:
+    like_term = f"%{search_term}%"
+    return get_db_connection().execute(LEGACY_LIKE_SEARCH_QUERY, (like_term, like_term)).fetchall()
+
+
+def _uncached(func, *args, **kwargs):
+    """Sin la caché de resultados: cada repetición vuelve a consultar la BD."""
+    clear_query_cache()
+    return func(*args, **kwargs)
+
+
+def _first_window_and_count(search_term: str) -> int:
+    """Lo que pide la lista virtual al cambiar el texto (en la GUI, las dos consultas van en paralelo)."""
+    get_members_summary_with_active_membership(search_term=search_term, limit=VIRTUAL_TREEVIEW_BLOCK_SIZE)
+    return count_members_summary(search_term=search_term)
+
+
+def _typing_prefixes(search_term: str) -> list[str]:
+    """Lo que ve la búsqueda mientras se teclea 'Jos Muñ': 'J', 'Jo', 'Jos', 'Jos M', ..."""
+    return [search_term[:length] for length in range(1, len(search_term) + 1) if not search_term[length - 1].isspace()]
+
+
+def run_benchmark(sizes: list[int], repeat: int):
+    for size in sizes:
+        create_temporary_database(prefix=f"gym_bench_search_{size}_")
+        seed_members(size)
+        print(f"\n=== {size:,} socios ===")
+        for search_term in SEARCH_TERMS:
+            like_rows = len(_legacy_like_search(search_term))
+            fts_rows = len(search_members(search_term, limit=100))
+            print(f"-- '{search_term}' (LIKE: {like_rows} filas, FTS5: {fts_rows} filas, máx. 100)")
+            print_latency_report("   LIKE '%término%'", time_call(_legacy_like_search, search_term, repeat=repeat))
+            print_latency_report("   FTS5 search_members", time_call(_uncached, search_members, search_term, limit=100, repeat=repeat))
+        print(f"-- Mientras se teclea (primeras {VIRTUAL_TREEVIEW_BLOCK_SIZE} filas con membresía activa + recuento)")
+        for search_term in SEARCH_TERMS:
+            latencies = []
+            for prefix in _typing_prefixes(search_term):
+                latencies += time_call(_uncached, _first_window_and_count, prefix, repeat=repeat)
+            print_latency_report(f"   '{search_term}' letra a letra", latencies)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de búsqueda de socios: FTS5 frente a LIKE.")
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="Tamaños de la tabla de socios, separados por comas.")
+    parser.add_argument("--repeat", type=int, default=5, help="Repeticiones por consulta.")
+    arguments = parser.parse_args()
+    run_benchmark([int(size) for size in arguments.sizes.split(",")], arguments.repeat)
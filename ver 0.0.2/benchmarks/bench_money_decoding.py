@@ -0,0 +1,60 @@
+# gimnasio_mgmt_gui/benchmarks/bench_money_decoding.py
+# Decodificación de importes: almacenamiento anterior (DECIMAL(10, 2), que SQLite guarda como REAL, leído
+# con Decimal(str(row['amount'])) fila a fila) frente a céntimos enteros con el conversor MONEY_CENTS.
+# También muestra el error acumulado de SUM() sobre REAL frente a la suma exacta en céntimos.
+#
+# Uso:
+#   python benchmarks/bench_money_decoding.py [--rows 200000] [--repeat 5]
+
+import argparse
+import sqlite3
+from decimal import Decimal
+
+from _bench_common import create_temporary_database, seed_transactions, time_call, print_latency_report
+
+from core_logic.database import get_db_connection
+
+
+def _create_legacy_copy(database_path: str) -> sqlite3.Connection:
+    """Copia los importes a una tabla con el esquema anterior, en una conexión sin conversores."""
+    legacy_conn = sqlite3.connect(database_path)
+    legacy_conn.row_factory = sqlite3.Row
+    with legacy_conn:
+        legacy_conn.execute("DROP TABLE IF EXISTS legacy_amounts")
+        legacy_conn.execute("CREATE TABLE legacy_amounts (id INTEGER PRIMARY KEY, amount DECIMAL(10, 2) NOT NULL)")
+        legacy_conn.execute("INSERT INTO legacy_amounts (id, amount) SELECT id, amount / 100.0 FROM financial_transactions")
+    return legacy_conn
+
+
+def _decode_legacy(legacy_conn: sqlite3.Connection) -> list[Decimal]:
+    return [Decimal(str(row['amount'])) for row in legacy_conn.execute("SELECT id, amount FROM legacy_amounts")]
+
+
+def _decode_cents() -> list[Decimal]:
+    return [row['amount'] for row in get_db_connection().execute("SELECT id, amount FROM financial_transactions")]
+
+
+def run_benchmark(rows: int, repeat: int):
+    database_path = create_temporary_database(prefix="gym_bench_money_")
+    seed_transactions(rows)
+    legacy_conn = _create_legacy_copy(database_path)
+    print(f"=== {rows:,} importes ===")
+    for label, func, args in (("REAL + Decimal(str())", _decode_legacy, (legacy_conn,)),
+                              ("Céntimos + conversor", _decode_cents, ())):
+        latencies = time_call(func, *args, repeat=repeat)
+        print_latency_report(f"   {label}", latencies)
+        print(f"      {rows / min(latencies) / 1e6:.2f} M filas/s")
+
+    legacy_sum = legacy_conn.execute("SELECT SUM(amount) FROM legacy_amounts").fetchone()[0]
+    cents_sum = get_db_connection().execute('SELECT SUM(amount) AS "total [MONEY_CENTS]" FROM financial_transactions').fetchone()[0]
+    print(f"   SUM() sobre REAL:     {Decimal(str(legacy_sum))}")
+    print(f"   SUM() en céntimos:    {cents_sum}")
+    legacy_conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de decodificación de importes: REAL frente a céntimos enteros.")
+    parser.add_argument("--rows", type=int, default=200000, help="Número de transacciones sintéticas.")
+    parser.add_argument("--repeat", type=int, default=5, help="Repeticiones por lectura.")
+    arguments = parser.parse_args()
+    run_benchmark(arguments.rows, arguments.repeat)
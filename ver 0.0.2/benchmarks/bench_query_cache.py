@@ -0,0 +1,50 @@
+# gimnasio_mgmt_gui/benchmarks/bench_query_cache.py
+# Caché de resultados de core_logic (query_cache): lo que cuesta volver a Socios o Finanzas cuando no
+# ha cambiado nada (acierto) frente a repetir la consulta (caché vacía), y tras una escritura que
+# invalida solo las tablas afectadas.
+#
+# Uso:
+#   python benchmarks/bench_query_cache.py [--members 20000] [--transactions 100000] [--repeat 20]
+
+import argparse
+from datetime import date
+
+from _bench_common import create_temporary_database, seed_members, seed_transactions, time_call, print_latency_report
+
+from core_logic.query_cache import clear_query_cache, get_query_cache_stats
+from core_logic.members import get_all_members_summary, get_members_summary_with_active_membership
+from core_logic.finances import get_financial_summary, get_all_recurring_items, record_financial_transaction
+
+
+def _cold(func, *args):
+    clear_query_cache()
+    return func(*args)
+
+
+def run_benchmark(members: int, transactions: int, repeat: int):
+    create_temporary_database(prefix="gym_bench_query_cache_")
+    seed_members(members)
+    seed_transactions(transactions)
+    print(f"=== {members:,} socios, {transactions:,} transacciones ===")
+    for title, func in (("get_all_members_summary", get_all_members_summary),
+                        ("get_members_summary_with_active_membership", get_members_summary_with_active_membership),
+                        ("get_financial_summary", get_financial_summary),
+                        ("get_all_recurring_items", get_all_recurring_items)):
+        print_latency_report(f"   {title} (caché vacía)", time_call(_cold, func, repeat=repeat))
+        func()
+        print_latency_report(f"   {title} (acierto)", time_call(func, repeat=repeat))
+
+    get_all_members_summary(); get_financial_summary()
+    record_financial_transaction("income", date.today().isoformat(), "Escritura del benchmark", "Cuotas Socios", "10.00")
+    print_latency_report("   get_all_members_summary tras escribir en finanzas", time_call(get_all_members_summary, repeat=1))
+    print_latency_report("   get_financial_summary tras escribir en finanzas", time_call(get_financial_summary, repeat=1))
+    print(f"   {get_query_cache_stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de la caché de resultados de consultas.")
+    parser.add_argument("--members", type=int, default=20000, help="Número de socios sintéticos.")
+    parser.add_argument("--transactions", type=int, default=100000, help="Transacciones sintéticas.")
+    parser.add_argument("--repeat", type=int, default=20, help="Repeticiones por medición.")
+    arguments = parser.parse_args()
+    run_benchmark(arguments.members, arguments.transactions, arguments.repeat)
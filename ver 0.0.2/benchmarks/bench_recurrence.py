@@ -0,0 +1,60 @@
+# gimnasio_mgmt_gui/benchmarks/bench_recurrence.py
+# Calendario de ítems recurrentes: expandir un año de vencimientos llamando periodo a periodo a
+# _calculate_next_due_date_for_recurring (como el bucle anterior de la puesta al día) frente a una sola
+# llamada a recurrence.expand_occurrences, en frío (caché vacía) y con el calendario ya memorizado
+# (lo que ve la previsión cuando el proceso por lotes ya calculó esas fechas).
+#
+# Uso:
+#   python benchmarks/bench_recurrence.py [--items 5000] [--days 365] [--repeat 5]
+
+import argparse
+from datetime import date, timedelta
+
+from _bench_common import time_call, print_latency_report
+
+from config import VALID_FREQUENCIES
+from core_logic.finances import _calculate_next_due_date_for_recurring
+from core_logic.recurrence import expand_occurrences, clear_recurrence_cache, get_recurrence_cache_info
+
+
+def _item_definitions(count: int, window_start: date) -> list[tuple]:
+    """Definiciones variadas: todas las frecuencias, días de mes 1-31 y días de semana."""
+    return [(VALID_FREQUENCIES[index % len(VALID_FREQUENCIES)], window_start - timedelta(days=index % 400),
+             index % 31 + 1, index % 7) for index in range(count)]
+
+
+def _expand_step_by_step(definitions: list[tuple], window_start: date, window_end: date) -> int:
+    total = 0
+    for frequency, start_date, day_of_month, day_of_week in definitions:
+        due_date = start_date
+        while due_date and due_date <= window_end:
+            if due_date >= window_start: total += 1
+            due_date = _calculate_next_due_date_for_recurring(due_date, frequency, day_of_month, day_of_week, start_date)
+    return total
+
+
+def _expand_in_one_call(definitions: list[tuple], window_start: date, window_end: date, cold: bool) -> int:
+    if cold: clear_recurrence_cache()
+    return sum(len(expand_occurrences(frequency, start_date, window_start, window_end, day_of_month, day_of_week))
+               for frequency, start_date, day_of_month, day_of_week in definitions)
+
+
+def run_benchmark(items: int, days: int, repeat: int):
+    window_start = date.today()
+    window_end = window_start + timedelta(days=days)
+    definitions = _item_definitions(items, window_start)
+    print(f"=== {items:,} ítems, ventana de {days} días ===")
+    print(f"   Vencimientos en la ventana: {_expand_in_one_call(definitions, window_start, window_end, True):,}")
+    print_latency_report("   Periodo a periodo", time_call(_expand_step_by_step, definitions, window_start, window_end, repeat=repeat))
+    print_latency_report("   expand_occurrences (caché vacía)", time_call(_expand_in_one_call, definitions, window_start, window_end, True, repeat=repeat))
+    print_latency_report("   expand_occurrences (memorizado)", time_call(_expand_in_one_call, definitions, window_start, window_end, False, repeat=repeat))
+    print(f"   {get_recurrence_cache_info()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del calendario de ítems recurrentes.")
+    parser.add_argument("--items", type=int, default=5000, help="Definiciones de ítems recurrentes.")
+    parser.add_argument("--days", type=int, default=365, help="Días de la ventana a expandir.")
+    parser.add_argument("--repeat", type=int, default=5, help="Repeticiones por medición.")
+    arguments = parser.parse_args()
+    run_benchmark(arguments.items, arguments.days, arguments.repeat)
@@ -0,0 +1,96 @@
+# gimnasio_mgmt_gui/benchmarks/bench_recurring_catch_up.py
+# Puesta al día de ítems recurrentes atrasados: bucle anterior (process_single_recurring_item por ítem,
+# un periodo por llamada y un commit por ítem) frente a finances.process_due_recurring_items (todos los
+# periodos de todos los ítems en una transacción con executemany). Comprueba también que repetir el
+# proceso no genera duplicados.
+#
+# Uso:
+#   python benchmarks/bench_recurring_catch_up.py [--items 5000] [--periods 12] [--legacy-items 300] [--ledger 100000]
+
+import argparse
+import time
+from datetime import date
+
+from _bench_common import create_temporary_database, seed_transactions
+
+from core_logic.database import get_db_connection
+from core_logic.finances import (
+    process_due_recurring_items, process_single_recurring_item, get_pending_recurring_items_to_process,
+    count_financial_transactions
+)
+
+
+def _seed_overdue_monthly_items(count: int, periods: int, as_of: date):
+    """Ítems mensuales cuyo primer vencimiento quedó `periods` meses antes de `as_of`."""
+    first_due_month = as_of.month - periods
+    first_due = date(as_of.year + (first_due_month - 1) // 12, (first_due_month - 1) % 12 + 1, 1)
+    conn = get_db_connection()
+    with conn:
+        conn.executemany(
+            """INSERT INTO recurring_financial_items (item_type, description, default_amount, category, frequency,
+                                                     day_of_month_to_process, start_date, next_due_date, is_active)
+               VALUES (?, ?, ?, ?, 'monthly', 1, ?, ?, 1)""",
+            [("expense" if index % 3 else "income", f"Cuota recurrente {index}", 1500 + index % 5000,
+              "Alquiler/Hipoteca del Local" if index % 3 else "Cuotas Socios", first_due.isoformat(), first_due.isoformat())
+             for index in range(count)]
+        )
+
+
+def _legacy_catch_up(as_of: date) -> int:
+    """Como el antiguo FinanceManagementFrame.process_due_recurring_items, repetido hasta no dejar pendientes."""
+    calls = 0
+    while True:
+        pending_items = get_pending_recurring_items_to_process(as_of)
+        if not pending_items:
+            return calls
+        for item in pending_items:
+            process_single_recurring_item(item['id'], None)
+            calls += 1
+
+
+def _prepare(items: int, periods: int, ledger: int, as_of: date):
+    create_temporary_database(prefix="gym_bench_recurring_")
+    if ledger:
+        seed_transactions(ledger)
+    _seed_overdue_monthly_items(items, periods, as_of)
+
+
+def run_benchmark(items: int, periods: int, legacy_items: int, ledger: int):
+    as_of = date.today()
+
+    _prepare(legacy_items, periods, ledger, as_of)
+    started = time.perf_counter()
+    legacy_calls = _legacy_catch_up(as_of)
+    legacy_seconds = time.perf_counter() - started
+    per_occurrence_ms = legacy_seconds / max(legacy_calls, 1) * 1000
+    print(f"=== Bucle anterior: {legacy_items:,} ítems x {periods} periodos ({legacy_calls:,} llamadas) ===")
+    print(f"   {legacy_seconds:.2f} s ({per_occurrence_ms:.2f} ms por periodo; "
+          f"~{per_occurrence_ms * items * periods / 1000:.1f} s estimados para {items:,} ítems)")
+
+    _prepare(items, periods, ledger, as_of)
+    before_count = count_financial_transactions(force_refresh=True)
+    started = time.perf_counter()
+    success, message = process_due_recurring_items(as_of)
+    batch_seconds = time.perf_counter() - started
+    generated = count_financial_transactions(force_refresh=True) - before_count
+    print(f"\n=== Lote: {items:,} ítems x {periods} periodos ===")
+    print(f"   {batch_seconds:.2f} s ({batch_seconds / max(generated, 1) * 1e6:.0f} us por periodo) -> {message}")
+
+    started = time.perf_counter()
+    success, message = process_due_recurring_items(as_of)
+    print(f"   Repetición: {time.perf_counter() - started:.2f} s -> {message}")
+    with get_db_connection() as conn: # Simula que next_due_date no llegó a avanzar: no debe duplicar nada
+        conn.execute("UPDATE recurring_financial_items SET next_due_date = start_date")
+    success, message = process_due_recurring_items(as_of)
+    print(f"   Reproceso desde el inicio: {message} Total generado: "
+          f"{count_financial_transactions(force_refresh=True) - before_count:,}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de la puesta al día por lotes de ítems recurrentes.")
+    parser.add_argument("--items", type=int, default=5000, help="Ítems recurrentes atrasados para el proceso por lotes.")
+    parser.add_argument("--periods", type=int, default=12, help="Periodos mensuales atrasados por ítem.")
+    parser.add_argument("--legacy-items", type=int, default=300, help="Ítems para el bucle anterior (se extrapola).")
+    parser.add_argument("--ledger", type=int, default=100000, help="Transacciones ya existentes en el libro.")
+    arguments = parser.parse_args()
+    run_benchmark(arguments.items, arguments.periods, arguments.legacy_items, arguments.ledger)
@@ -0,0 +1,84 @@
+# gimnasio_mgmt_gui/benchmarks/bench_row_records.py
+# Memoria y velocidad de los listados: dict(row) con claves derivadas por fila (forma anterior) frente a
+# los registros compactos de core_logic.records (tupla + índice de columnas compartido, derivados al leer).
+#
+# Uso:
+#   python benchmarks/bench_row_records.py [--rows 100000] [--repeat 5]
+
+import argparse
+import tracemalloc
+
+from _bench_common import create_temporary_database, seed_members, seed_transactions, time_call, print_latency_report
+
+from core_logic.database import get_db_connection
+from core_logic.records import Member, Transaction
+from core_logic.utils import format_date_for_ui
+
+MEMBERS_QUERY = "SELECT id, internal_member_id, full_name, current_status, join_date FROM members ORDER BY id"
+TRANSACTIONS_QUERY = """
+    SELECT ft.*, m.full_name as member_name, su.username as recorded_by_username
+    FROM financial_transactions ft
+    LEFT JOIN members m ON ft.related_member_id = m.id
+    LEFT JOIN system_users su ON ft.recorded_by_user_id = su.id
+    ORDER BY ft.transaction_date DESC, ft.id DESC
+"""
+
+
+def _members_as_dicts() -> list[dict]:
+    members_list = []
+    for row in get_db_connection().execute(MEMBERS_QUERY):
+        member_dict = dict(row)
+        member_dict['join_date_obj'] = row['join_date']
+        member_dict['join_date_ui'] = format_date_for_ui(row['join_date'])
+        members_list.append(member_dict)
+    return members_list
+
+
+def _members_as_records() -> list[Member]:
+    return Member.fetch_all(get_db_connection().execute(MEMBERS_QUERY))
+
+
+def _transactions_as_dicts() -> list[dict]:
+    transactions_list = []
+    for row in get_db_connection().execute(TRANSACTIONS_QUERY):
+        trans_dict = dict(row)
+        trans_dict['transaction_date_obj'] = row['transaction_date']
+        trans_dict['transaction_date_ui'] = format_date_for_ui(row['transaction_date'])
+        trans_dict['amount_decimal'] = row['amount']
+        transactions_list.append(trans_dict)
+    return transactions_list
+
+
+def _transactions_as_records() -> list[Transaction]:
+    return Transaction.fetch_all(get_db_connection().execute(TRANSACTIONS_QUERY))
+
+
+def _retained_bytes(loader) -> int:
+    """Memoria que sigue ocupada por el resultado (filas + contenedores) tras cargarlo."""
+    tracemalloc.start()
+    result = loader()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return retained
+
+
+def run_benchmark(rows: int, repeat: int):
+    create_temporary_database(prefix="gym_bench_records_")
+    seed_members(rows)
+    seed_transactions(rows)
+    for title, dict_loader, record_loader in (("socios", _members_as_dicts, _members_as_records),
+                                              ("transacciones", _transactions_as_dicts, _transactions_as_records)):
+        print(f"\n=== {rows:,} {title} ===")
+        for label, loader in (("dict(row) + derivados", dict_loader), ("Registros compactos", record_loader)):
+            retained = _retained_bytes(loader)
+            print(f"   {label:<22} {retained / 2**20:8.1f} MiB retenidos ({retained / rows:.0f} B/fila)")
+            print_latency_report(f"   {label}", time_call(loader, repeat=repeat))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de memoria y velocidad: dict por fila frente a registros compactos.")
+    parser.add_argument("--rows", type=int, default=100000, help="Filas sintéticas de socios y de transacciones.")
+    parser.add_argument("--repeat", type=int, default=5, help="Repeticiones por carga.")
+    arguments = parser.parse_args()
+    run_benchmark(arguments.rows, arguments.repeat)
@@ -0,0 +1,145 @@
+# gimnasio_mgmt_gui/benchmarks/bench_startup.py
+# Presupuesto de arranque de la GUI (gui_frames/startup.py), siempre en procesos nuevos (arranque en frío):
+#   1. Importaciones hasta poder pintar el login (python -X importtime): total, los módulos más caros y
+#      comprobación de que Pillow y NumPy NO se cargan al arrancar (solo al usarlos).
+#   2. Tiempo real desde lanzar el proceso hasta que el login acepta credenciales, con una BD nueva
+#      (migraciones + superusuario) y con la misma BD ya preparada. Necesita pantalla (Tk); sin ella se omite.
+# Falla (código 1) si se supera STARTUP_IMPORT_BUDGET_MS o STARTUP_LOGIN_BUDGET_MS de config.py.
+#
+# Uso:
+#   python benchmarks/bench_startup.py [--repeat 5] [--top 12] [--import-budget-ms N] [--login-budget-ms N]
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from _bench_common import PROJECT_ROOT_DIR
+
+from config import STARTUP_IMPORT_BUDGET_MS, STARTUP_LOGIN_BUDGET_MS
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+STARTUP_IMPORTS = "import main_gui, gui_frames.login_frame" # Lo que se importa antes de pintar el login
+LAZY_ONLY_MODULES = ("PIL", "numpy") # Solo deben cargarse la primera vez que se usan
+
+# Proceso hijo: crea la aplicación sobre la BD indicada, avisa en cuanto el login acepta credenciales y
+# espera a que termine la precarga de frames para informar de todos los tiempos internos.
+_LOGIN_PROBE_SCRIPT = """
+import json, sys, time
+sys.path.insert(0, {benchmarks_dir!r})
+from _bench_common import use_database
+use_database({database_path!r})
+import main_gui
+from core_logic.database import close_all_db_connections
+app = main_gui.GymManagerApp()
+while not app.startup_ready:
+    app.update(); time.sleep(0.001)
+print("STARTUP_READY", flush=True)
+while "frames precargados" not in app.startup_timeline:
+    app.update(); time.sleep(0.001)
+print("STARTUP_MARKS " + json.dumps(app.startup_timeline.marks), flush=True)
+app.task_runner.shutdown(); app.destroy(); close_all_db_connections()
+"""
+_CHILD_ENVIRONMENT = dict(os.environ, PYTHONIOENCODING="utf-8")
+
+
+def _run_python(arguments: list[str]) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable] + arguments, cwd=PROJECT_ROOT_DIR, capture_output=True,
+                          text=True, encoding="utf-8", errors="replace", env=_CHILD_ENVIRONMENT)
+
+
+def _time_login_probe(database_path: str) -> tuple[float | None, dict, str]:
+    """(ms desde lanzar el proceso hasta STARTUP_READY, tiempos internos, stderr)."""
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "-c", _LOGIN_PROBE_SCRIPT.format(benchmarks_dir=BENCHMARKS_DIR, database_path=database_path)],
+                               cwd=PROJECT_ROOT_DIR, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                               text=True, encoding="utf-8", errors="replace", env=_CHILD_ENVIRONMENT)
+    ready_ms, marks = None, {}
+    for line in process.stdout:
+        if line.startswith("STARTUP_READY") and ready_ms is None:
+            ready_ms = (time.perf_counter() - started) * 1000
+        elif line.startswith("STARTUP_MARKS "):
+            marks = json.loads(line[len("STARTUP_MARKS "):])
+    stderr = process.stderr.read(); process.wait()
+    return ready_ms, marks, stderr
+
+
+def _parse_import_times(stderr: str) -> dict[str, tuple[int, int]]:
+    """{módulo: (propio_us, acumulado_us)} de la salida de -X importtime (solo la primera importación)."""
+    import_times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line: continue
+        self_us, cumulative_us, module_name = (part.strip() for part in line[len("import time:"):].split("|"))
+        import_times.setdefault(module_name, (int(self_us), int(cumulative_us)))
+    return import_times
+
+
+def _bench_imports(repeat: int, top: int, budget_ms: float) -> list[str]:
+    print(f"-- Importaciones hasta pintar el login ({STARTUP_IMPORTS})")
+    runs = []
+    for _ in range(repeat):
+        result = _run_python(["-X", "importtime", "-c", STARTUP_IMPORTS])
+        if result.returncode != 0:
+            return [f"No se pudo importar el arranque:\n{result.stderr[-2000:]}"]
+        import_times = _parse_import_times(result.stderr)
+        total_us = sum(cumulative_us for name, (_, cumulative_us) in import_times.items() if name in ("main_gui", "gui_frames.login_frame"))
+        runs.append((total_us, import_times))
+    total_us, import_times = min(runs, key=lambda run: run[0]) # El mejor de N: menos ruido del sistema
+    print(f"   Total: {total_us / 1000:,.1f} ms (mejor de {repeat}; presupuesto {budget_ms:,.0f} ms)")
+    print("   Módulos más caros (propio / acumulado):")
+    for name, (self_us, cumulative_us) in sorted(import_times.items(), key=lambda item: -item[1][0])[:top]:
+        print(f"     {name:<40} {self_us / 1000:7.1f} ms / {cumulative_us / 1000:7.1f} ms")
+
+    problems = []
+    if total_us / 1000 > budget_ms:
+        problems.append(f"Importaciones del arranque: {total_us / 1000:,.1f} ms > {budget_ms:,.0f} ms")
+    for name in LAZY_ONLY_MODULES:
+        if name in import_times:
+            problems.append(f"'{name}' se importa al arrancar (debe cargarse solo al usarse)")
+    return problems
+
+
+def _bench_login(repeat: int, budget_ms: float) -> list[str]:
+    print("-- Hasta que el login acepta credenciales (proceso nuevo)")
+    problems = []
+    for label in ("BD nueva", "BD ya preparada"):
+        wall_times_ms, marks = [], {}
+        for _ in range(repeat):
+            database_path = os.path.join(tempfile.mkdtemp(prefix="gym_bench_startup_"), "gym_bench.db")
+            if label == "BD ya preparada": # Un arranque previo deja la BD migrada y con superusuario
+                _time_login_probe(database_path)
+            ready_ms, marks, stderr = _time_login_probe(database_path)
+            if ready_ms is None:
+                if "display" in stderr.lower(): # Sin pantalla (servidor, CI)
+                    print(f"   Tk: se omite ({stderr.strip().splitlines()[-1]})")
+                    return problems
+                return problems + [f"El arranque no llegó al login ({label}):\n{stderr[-2000:]}"]
+            wall_times_ms.append(ready_ms)
+        best_ms = min(wall_times_ms)
+        steps = ", ".join(f"{step} {elapsed_ms:,.0f} ms" for step, elapsed_ms in marks.items())
+        print(f"   {label}: {best_ms:,.0f} ms hasta el login listo (mejor de {repeat}; presupuesto {budget_ms:,.0f} ms)")
+        print(f"     dentro de la aplicación: {steps}")
+        if best_ms > budget_ms:
+            problems.append(f"Arranque hasta el login ({label}): {best_ms:,.0f} ms > {budget_ms:,.0f} ms")
+    return problems
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark y presupuesto del arranque de la GUI.")
+    parser.add_argument("--repeat", type=int, default=5, help="Procesos lanzados por medición.")
+    parser.add_argument("--top", type=int, default=12, help="Módulos más caros a mostrar.")
+    parser.add_argument("--import-budget-ms", type=float, default=STARTUP_IMPORT_BUDGET_MS, help="Presupuesto de importaciones.")
+    parser.add_argument("--login-budget-ms", type=float, default=STARTUP_LOGIN_BUDGET_MS, help="Presupuesto hasta el login listo.")
+    arguments = parser.parse_args()
+
+    found_problems = _bench_imports(arguments.repeat, arguments.top, arguments.import_budget_ms)
+    found_problems += _bench_login(arguments.repeat, arguments.login_budget_ms)
+    if found_problems:
+        print(f"FALLO: {len(found_problems)} problema(s) de arranque:")
+        for problem in found_problems:
+            print(f"  {problem}")
+        raise SystemExit(1)
+    print("OK: el arranque está dentro del presupuesto.")
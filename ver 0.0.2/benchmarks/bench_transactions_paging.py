@@ -0,0 +1,52 @@
+# gimnasio_mgmt_gui/benchmarks/bench_transactions_paging.py
+# Compara la paginación del listado de transacciones por LIMIT/OFFSET + COUNT(*) (get_financial_transactions)
+# con la paginación por cursor (get_financial_transactions_page) en las páginas 1, 50 y 500.
+#
+# Uso:
+#   python benchmarks/bench_transactions_paging.py [--rows 200000] [--pages 1,50,500] [--repeat 5]
+
+import argparse
+
+from _bench_common import create_temporary_database, seed_transactions, time_call, print_latency_report
+
+from core_logic.finances import get_financial_transactions, get_financial_transactions_page
+
+PAGE_SIZE = 25
+
+
+def _cursor_for_page(page_number: int, transaction_type: str | None) -> str | None:
+    """Recorre las páginas con cursores (como haría la GUI) y devuelve el cursor que lleva a `page_number`."""
+    cursor_token = None
+    for _ in range(page_number - 1):
+        cursor_token = get_financial_transactions_page(transaction_type=transaction_type, page_size=PAGE_SIZE,
+                                                       cursor_token=cursor_token)["next_cursor"]
+    return cursor_token
+
+
+def run_benchmark(rows: int, pages: list[int], repeat: int):
+    create_temporary_database(prefix="gym_bench_paging_")
+    seed_transactions(rows)
+    print(f"=== {rows:,} transacciones, {PAGE_SIZE} por página ===")
+    for transaction_type in (None, "expense"):
+        print(f"\n-- Filtro de tipo: {transaction_type or 'todos'}")
+        for page_number in pages:
+            cursor_token = _cursor_for_page(page_number, transaction_type)
+            print_latency_report(
+                f"   Pág {page_number:>4} OFFSET + COUNT(*)",
+                time_call(get_financial_transactions, transaction_type=transaction_type, limit=PAGE_SIZE,
+                          offset=(page_number - 1) * PAGE_SIZE, repeat=repeat)
+            )
+            print_latency_report(
+                f"   Pág {page_number:>4} cursor",
+                time_call(get_financial_transactions_page, transaction_type=transaction_type, page_size=PAGE_SIZE,
+                          cursor_token=cursor_token, repeat=repeat)
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de paginación de transacciones: OFFSET frente a cursor.")
+    parser.add_argument("--rows", type=int, default=200000, help="Número de transacciones sintéticas.")
+    parser.add_argument("--pages", default="1,50,500", help="Páginas a medir, separadas por comas.")
+    parser.add_argument("--repeat", type=int, default=5, help="Repeticiones por consulta.")
+    arguments = parser.parse_args()
+    run_benchmark(arguments.rows, [int(page) for page in arguments.pages.split(",")], arguments.repeat)
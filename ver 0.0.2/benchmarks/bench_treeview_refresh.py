@@ -0,0 +1,68 @@
+# gimnasio_mgmt_gui/benchmarks/bench_treeview_refresh.py
+# Refresco de los Treeview (gui_frames/treeview_sync.py): borrar todo e insertar todo (antes) frente a
+# aplicar solo las diferencias por iid, para una recarga sin cambios, una fila editada, una fila nueva
+# arriba y una fila borrada. Cuenta también las operaciones de Tk que hace cada refresco por diferencias.
+# Necesita pantalla (Tk); sin ella se omite.
+#
+# Uso:
+#   python benchmarks/bench_treeview_refresh.py [--rows 2000] [--repeat 5]
+
+import argparse
+import time
+
+import _bench_common  # noqa: F401  (añade la raíz del proyecto a sys.path)
+from gui_frames.treeview_sync import TreeviewSync
+
+
+def _rows(count: int) -> list[tuple[str, tuple]]:
+    return [(f"MBR-{number:06d}", (f"MBR-{number:06d}", f"Socio {number}", "Activo", "01/01/2026", "Ninguno"))
+            for number in range(count)]
+
+
+def _variants(rows: list) -> dict[str, list]:
+    edited = list(rows); edited[len(rows) // 2] = (edited[len(rows) // 2][0], ("editado",) * 5)
+    new_on_top = [("MBR-NUEVO", ("MBR-NUEVO", "Socio nuevo", "Activo", "", "Ninguno"))] + rows
+    return {"sin cambios": rows, "una fila editada": edited, "una fila nueva arriba": new_on_top,
+            "una fila borrada": rows[:10] + rows[11:]}
+
+
+def _rebuild(tree, rows: list):
+    tree.delete(*tree.get_children())
+    for iid, values in rows:
+        tree.insert("", "end", iid=iid, values=values)
+
+
+def run_benchmark(row_count: int, repeat: int):
+    try:
+        import tkinter as tk
+        from tkinter import ttk
+        root = tk.Tk(); root.withdraw()
+    except Exception as e: # Sin pantalla (servidor, CI)
+        print(f"-- Tk: se omite ({e})")
+        return
+    tree = ttk.Treeview(root, columns=("id", "name", "status", "join_date", "plan"), show="headings")
+    base_rows = _rows(row_count)
+    print(f"=== {row_count:,} filas, {repeat} repeticiones ===")
+    for label, new_rows in _variants(base_rows).items():
+        rebuild_ms, sync_ms, operations = [], [], 0
+        for _ in range(repeat):
+            _rebuild(tree, base_rows); root.update()
+            started = time.perf_counter(); _rebuild(tree, new_rows); root.update()
+            rebuild_ms.append((time.perf_counter() - started) * 1000)
+
+            tree.delete(*tree.get_children())
+            tree_sync = TreeviewSync(tree); tree_sync.sync(base_rows); root.update()
+            started = time.perf_counter(); operations = tree_sync.sync(new_rows); root.update()
+            sync_ms.append((time.perf_counter() - started) * 1000)
+            tree.delete(*tree.get_children())
+        print(f"   {label}: borrar e insertar {min(rebuild_ms):,.1f} ms | por diferencias {min(sync_ms):,.2f} ms "
+              f"({operations} operaciones de Tk)")
+    root.destroy()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del refresco por diferencias de los Treeview.")
+    parser.add_argument("--rows", type=int, default=2000, help="Filas en el Treeview.")
+    parser.add_argument("--repeat", type=int, default=5, help="Repeticiones por medición.")
+    arguments = parser.parse_args()
+    run_benchmark(arguments.rows, arguments.repeat)
@@ -0,0 +1,112 @@
+# gimnasio_mgmt_gui/benchmarks/bench_virtual_lists.py
+# Listas virtuales de la GUI (gui_frames/virtual_treeview.py): lo que cuesta cada ventana de filas que
+# piden al desplazarse (al principio, en medio y al final del listado; con OFFSET al arrastrar la barra y
+# a partir de la fila anterior al bajar) frente a cargar el listado entero como antes.
+# Si hay pantalla, mide también Tk: insertar todos los socios en un Treeview frente a la lista virtual.
+#
+# Uso:
+#   python benchmarks/bench_virtual_lists.py [--members 100000] [--transactions 300000] [--repeat 5]
+
+import argparse
+import time
+
+from _bench_common import create_temporary_database, seed_members, seed_transactions, time_call, print_latency_report
+
+from config import VIRTUAL_TREEVIEW_BLOCK_SIZE
+from core_logic.members import get_members_summary_with_active_membership, count_members_summary
+from core_logic.finances import get_financial_transactions_window, count_financial_transactions
+from core_logic.query_cache import clear_query_cache
+
+
+def _uncached(func, *args, **kwargs):
+    clear_query_cache()
+    return func(*args, **kwargs)
+
+
+def _window_offsets(total_rows: int) -> dict[str, int]:
+    return {"principio": 0, "mitad": total_rows // 2, "final": max(0, total_rows - VIRTUAL_TREEVIEW_BLOCK_SIZE)}
+
+
+def _bench_member_windows(members: int, repeat: int):
+    print(f"-- Socios ({members:,})")
+    print_latency_report("   Listado completo (antes)", time_call(_uncached, get_members_summary_with_active_membership, repeat=repeat))
+    print_latency_report("   Recuento", time_call(_uncached, count_members_summary, repeat=repeat))
+    for label, offset in _window_offsets(members).items():
+        print_latency_report(f"   Ventana de {VIRTUAL_TREEVIEW_BLOCK_SIZE} ({label})",
+                             time_call(_uncached, get_members_summary_with_active_membership,
+                                       limit=VIRTUAL_TREEVIEW_BLOCK_SIZE, offset=offset, repeat=repeat))
+
+
+def _bench_transaction_windows(transactions: int, repeat: int):
+    print(f"-- Transacciones ({transactions:,})")
+    print_latency_report("   Recuento", time_call(count_financial_transactions, force_refresh=True, repeat=repeat))
+    for label, offset in _window_offsets(transactions).items():
+        print_latency_report(f"   Ventana con OFFSET ({label})",
+                             time_call(get_financial_transactions_window, offset=offset,
+                                       limit=VIRTUAL_TREEVIEW_BLOCK_SIZE, repeat=repeat))
+        if offset:
+            previous_row = get_financial_transactions_window(offset=offset - 1, limit=1)[0]
+            print_latency_report(f"   Ventana desde la fila anterior ({label})",
+                                 time_call(get_financial_transactions_window, limit=VIRTUAL_TREEVIEW_BLOCK_SIZE,
+                                           after_position=(previous_row['transaction_date'], previous_row['id']),
+                                           repeat=repeat))
+
+
+def _bench_tk_lists(members: int):
+    """Tk: insertar todo el listado (antes) frente a la lista virtual (solo filas visibles)."""
+    try:
+        import tkinter as tk
+        from tkinter import ttk
+        from gui_frames.virtual_treeview import VirtualTreeview
+        root = tk.Tk()
+    except Exception as e: # Sin pantalla (servidor, CI)
+        print(f"-- Tk: se omite ({e})")
+        return
+    root.geometry("900x600")
+    columns = ("internal_id", "full_name", "status")
+    members_data = get_members_summary_with_active_membership()
+    format_row = lambda member: (member['internal_member_id'], member['full_name'], member['current_status'])
+
+    plain_tree = ttk.Treeview(root, columns=columns, show="headings"); plain_tree.pack(fill="both", expand=True)
+    started = time.perf_counter()
+    for member in members_data:
+        plain_tree.insert("", "end", iid=member['internal_member_id'], values=format_row(member))
+    root.update()
+    print(f"-- Tk: Treeview con todo el listado: {(time.perf_counter() - started) * 1000:,.0f} ms, "
+          f"{len(plain_tree.get_children()):,} items")
+    plain_tree.destroy()
+
+    virtual_tree = VirtualTreeview(root, columns=columns, show="headings", format_row=format_row,
+                                   row_id=lambda member: member['internal_member_id'])
+    virtual_tree.pack(fill="both", expand=True)
+    started = time.perf_counter()
+    virtual_tree.set_row_source(
+        lambda offset, limit, previous_row: get_members_summary_with_active_membership(limit=limit, offset=offset),
+        count_members_summary)
+    root.update()
+    print(f"-- Tk: lista virtual: {(time.perf_counter() - started) * 1000:,.0f} ms, "
+          f"{len(virtual_tree.tree.get_children()):,} items")
+    started = time.perf_counter()
+    for fraction in (0.25, 0.5, 0.75, 1.0):
+        virtual_tree.yview("moveto", fraction); root.update()
+    print(f"-- Tk: 4 saltos con la barra: {(time.perf_counter() - started) * 1000:,.0f} ms")
+    root.destroy()
+
+
+def run_benchmark(members: int, transactions: int, repeat: int):
+    create_temporary_database(prefix="gym_bench_virtual_lists_")
+    seed_members(members)
+    seed_transactions(transactions)
+    print(f"=== {members:,} socios, {transactions:,} transacciones, bloques de {VIRTUAL_TREEVIEW_BLOCK_SIZE} filas ===")
+    _bench_member_windows(members, repeat)
+    _bench_transaction_windows(transactions, repeat)
+    _bench_tk_lists(members)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de las consultas por ventanas de las listas virtuales.")
+    parser.add_argument("--members", type=int, default=100000, help="Número de socios sintéticos.")
+    parser.add_argument("--transactions", type=int, default=300000, help="Transacciones sintéticas.")
+    parser.add_argument("--repeat", type=int, default=5, help="Repeticiones por medición.")
+    arguments = parser.parse_args()
+    run_benchmark(arguments.members, arguments.transactions, arguments.repeat)
@@ -0,0 +1,101 @@
+# gimnasio_mgmt_gui/benchmarks/bench_write_contention.py
+# Simula varios PCs (procesos) escribiendo a la vez en la misma BD y mide la latencia
+# de cada escritura (p50/p99) y cuántas fallan por "database is locked".
+#
+# Uso:
+#   python benchmarks/bench_write_contention.py [--writers 3] [--writes 200] [--journal-mode WAL|DELETE]
+
+import argparse
+import multiprocessing
+import time
+
+from _bench_common import create_temporary_database, use_database, print_latency_report
+
+
+def _writer_process(database_path: str, journal_mode: str, worker_index: int, writes_per_worker: int, results_queue):
+    """Proceso de 'recepción': alterna altas de socios y cobros, midiendo cada escritura."""
+    from core_logic import database
+    from core_logic.members import add_new_member
+    from core_logic.finances import record_financial_transaction
+
+    database.DATABASE_JOURNAL_MODE = journal_mode
+    use_database(database_path)
+
+    latencies, failures = [], 0
+    for write_index in range(writes_per_worker):
+        started = time.perf_counter()
+        if write_index % 2 == 0:
+            success, _ = add_new_member(f"Socio Bench {worker_index}-{write_index}")
+        else:
+            success, _ = record_financial_transaction(
+                "income", "2024-01-15", f"Cuota {worker_index}-{write_index}", "Cuotas Socios", "35.00", "Efectivo"
+            )
+        latencies.append(time.perf_counter() - started)
+        if not success:
+            failures += 1
+    stats = database.get_db_connection_stats()
+    results_queue.put((latencies, failures, stats["write_retries"]))
+
+
+def _reader_process(database_path: str, journal_mode: str, stop_event, results_queue):
+    """Proceso de 'oficina': lanza consultas largas continuamente mientras los demás escriben."""
+    from core_logic import database
+    from core_logic.finances import get_financial_transactions, get_financial_summary
+
+    database.DATABASE_JOURNAL_MODE = journal_mode
+    use_database(database_path)
+
+    latencies = []
+    while not stop_event.is_set():
+        started = time.perf_counter()
+        get_financial_transactions(limit=500)
+        get_financial_summary()
+        latencies.append(time.perf_counter() - started)
+    results_queue.put(latencies)
+
+
+def run_benchmark(writers: int, writes_per_worker: int, journal_mode: str):
+    from core_logic import database
+    database.DATABASE_JOURNAL_MODE = journal_mode
+    database_path = create_temporary_database()
+    print(f"BD temporal: {database_path} (journal_mode={journal_mode}, escritores={writers}, escrituras/escritor={writes_per_worker})")
+
+    writer_results, reader_results = multiprocessing.Queue(), multiprocessing.Queue()
+    stop_event = multiprocessing.Event()
+    reader = multiprocessing.Process(target=_reader_process, args=(database_path, journal_mode, stop_event, reader_results))
+    workers = [
+        multiprocessing.Process(target=_writer_process, args=(database_path, journal_mode, index, writes_per_worker, writer_results))
+        for index in range(writers)
+    ]
+    started = time.perf_counter()
+    reader.start()
+    for worker in workers:
+        worker.start()
+
+    all_latencies, total_failures, total_retries = [], 0, 0
+    for _ in workers:
+        latencies, failures, retries = writer_results.get()
+        all_latencies.extend(latencies)
+        total_failures += failures
+        total_retries += retries
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+    stop_event.set()
+    reader_latencies = reader_results.get()
+    reader.join()
+
+    print_latency_report("Escrituras", all_latencies)
+    print_latency_report("Lecturas (oficina)", reader_latencies)
+    print(f"Tiempo total: {elapsed:.2f} s  Reintentos: {total_retries}  Escrituras fallidas: {total_failures}")
+    return total_failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de contención de escrituras entre varios procesos.")
+    parser.add_argument("--writers", type=int, default=3, help="Procesos escritores (PCs de recepción).")
+    parser.add_argument("--writes", type=int, default=200, help="Escrituras por proceso.")
+    parser.add_argument("--journal-mode", default="WAL", choices=["WAL", "DELETE"], help="Modo de diario de SQLite.")
+    arguments = parser.parse_args()
+    failed_writes = run_benchmark(arguments.writers, arguments.writes, arguments.journal_mode)
+    raise SystemExit(1 if failed_writes else 0)
@@ -0,0 +1,179 @@
+# gimnasio_mgmt_gui/benchmarks/check_query_plans.py
+# Regresión de planes de consulta: ejecuta las funciones públicas de core_logic sobre una BD temporal,
+# captura cada sentencia SQL que llega a SQLite, la pasa por EXPLAIN QUERY PLAN y termina con
+# código 1 si alguna recorre una tabla completa (SCAN sin índice) sin estar explícitamente permitida.
+#
+# Uso:
+#   python benchmarks/check_query_plans.py [-v]
+
+import argparse
+import re
+import sqlite3
+import sys
+from datetime import date, timedelta
+
+from _bench_common import create_temporary_database
+
+from core_logic.database import get_db_connection
+from core_logic import members, finances, auth
+
+# Recorridos completos aceptados a propósito: (función de core_logic, tabla o alias del plan) -> motivo.
+ALLOWED_FULL_SCANS = {
+    ("get_all_recurring_items", "rfi"): "Listado completo de una tabla de configuración pequeña.",
+    ("get_financial_summary_grouped", "fdr"): "Totales diarios: una fila por día y combinación, no por movimiento.",
+    ("verify_financial_daily_rollup", "l"): "Comprobación de consistencia: recorre el libro agregado entero.",
+    ("verify_financial_daily_rollup", "r"): "Comprobación de consistencia: recorre los totales diarios.",
+    ("rebuild_financial_daily_rollup", "financial_daily_rollup"): "Recuento informativo tras reconstruir (mantenimiento).",
+}
+
+_BARE_SCAN_PATTERN = re.compile(r"^SCAN (\w+)$")
+# Resultado de una subconsulta en FROM: recorrerlo no es recorrer una tabla (sus filas ya salen acotadas).
+_SUBQUERY_RESULT_PATTERN = re.compile(r"^(?:CO-ROUTINE|MATERIALIZE) (\w+)$")
+_STATEMENT_PREFIXES_WITH_PLAN = ("SELECT", "WITH", "UPDATE", "DELETE", "INSERT", "REPLACE")
+
+# sql expandido -> nombre de la función de core_logic que lo lanzó
+_captured_statements: dict[str, str] = {}
+
+
+def _find_core_logic_caller() -> str:
+    """Primera función de la pila que pertenece a core_logic (sin contar database.py ni sus decoradores)."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        module_name = frame.f_globals.get("__name__", "")
+        if module_name.startswith("core_logic.") and module_name not in ("core_logic.database", "core_logic.migrations"):
+            return frame.f_code.co_name
+        frame = frame.f_back
+    return "<desconocido>"
+
+
+def _trace_statement(sql: str):
+    statement = " ".join(sql.split())
+    if statement.upper().startswith(_STATEMENT_PREFIXES_WITH_PLAN):
+        _captured_statements.setdefault(statement, _find_core_logic_caller())
+
+
+def exercise_core_logic():
+    """Llama a las funciones de core_logic con argumentos representativos para capturar su SQL."""
+    today = date.today()
+    month_ago = (today - timedelta(days=30)).strftime("%Y-%m-%d")
+    today_str = today.strftime("%Y-%m-%d")
+
+    auth.initialize_superuser_account()
+    auth.create_system_user("recepcion1", "Recepcion123", auth.ROLE_SYSTEM_ADMIN)
+    auth.attempt_user_login("recepcion1", "Recepcion123")
+    auth.attempt_user_login("recepcion1", "clave-incorrecta")
+    auth.get_system_user_by_username("recepcion1")
+    auth.get_all_system_users()
+    auth.get_all_system_users(exclude_superuser=True)
+    auth.update_user_password("recepcion1", "Recepcion456")
+    auth.update_user_role("recepcion1", auth.ROLE_DATA_MANAGER, auth.ROLE_SUPERUSER)
+    auth.set_user_activation_status("recepcion1", False, auth.ROLE_SUPERUSER)
+
+    _, member_internal_id = members.add_new_member("Ana Pérez Gómez", phone_number="600111222", address_city="Sevilla")
+    members.add_new_member("Luis Núñez")
+    members.get_member_by_internal_id(member_internal_id)
+    members.get_all_members_summary()
+    members.get_all_members_summary(active_only=True)
+    members.get_all_members_summary(search_term="pérez")
+    members.get_all_members_summary(active_only=True, search_term="ana")
+    members.get_members_summary_with_active_membership()
+    members.get_members_summary_with_active_membership(active_only=True, search_term="ana")
+    members.get_members_summary_with_active_membership(limit=100, offset=1)
+    members.get_members_summary_with_active_membership(search_term="MBR-", limit=100, offset=1)
+    members.count_members_summary()
+    members.count_members_summary(search_term="ana")
+    members.search_members("ana pér")
+    members.search_members("600111", active_only=True)
+    members.update_member_details(member_internal_id, phone_number="600333444")
+    members.add_membership_to_member(member_internal_id, "mensual_basic", today_str)
+    members.get_member_active_membership(member_internal_id)
+    members.get_all_memberships_for_member(member_internal_id)
+
+    finances.record_financial_transaction("income", today_str, "Cuota mensual", "Cuotas Socios", "35.00", "Efectivo",
+                                          related_member_internal_id=member_internal_id)
+    finances.record_financial_transaction("expense", month_ago, "Luz", "Costes de Suministros", "120.50", "Transferencia")
+    finances.get_financial_transactions()
+    finances.get_financial_transactions(start_date_str=month_ago, end_date_str=today_str)
+    finances.get_financial_transactions(start_date_str=month_ago, transaction_type="income", category="cuotas")
+    first_page = finances.get_financial_transactions_page(page_size=1)
+    finances.get_financial_transactions_page(page_size=1, cursor_token=first_page["next_cursor"])
+    finances.get_financial_transactions_page(page_size=1, cursor_token=first_page["next_cursor"], direction="prev")
+    finances.get_financial_transactions_page(transaction_type="expense", page_size=1, cursor_token=first_page["next_cursor"])
+    finances.count_financial_transactions(start_date_str=month_ago, end_date_str=today_str)
+    finances.get_financial_transactions_window(limit=1, offset=1)
+    finances.get_financial_transactions_window(start_date_str=month_ago, limit=1, after_position=(today, 10**9))
+    finances.get_financial_summary()
+    finances.get_financial_summary(start_date_str=month_ago, end_date_str=today_str)
+    finances.get_financial_summary_grouped(["month", "category"], start_date_str=month_ago, end_date_str=today_str)
+    finances.get_financial_summary_grouped(["week", "payment_method"], transaction_type="income")
+    finances.get_financial_summary_grouped(["member"], start_date_str=month_ago)
+    finances.get_financial_summary_grouped(["month"], start_date_str=month_ago, from_ledger=True)
+    finances.verify_financial_daily_rollup()
+    finances.rebuild_financial_daily_rollup()
+
+    success, recurring_id = finances.add_recurring_financial_item(
+        "expense", "Alquiler del local", "900.00", "Alquiler/Hipoteca del Local", "monthly", month_ago,
+        day_of_month=1, auto_generate=True
+    )
+    finances.get_pending_recurring_items_to_process(today)
+    finances.get_all_recurring_items()
+    if success:
+        finances.get_recurring_item_by_id(int(recurring_id))
+        finances.process_single_recurring_item(int(recurring_id), None)
+        finances.process_due_recurring_items(today + timedelta(days=90))
+        finances.update_recurring_item(
+            int(recurring_id), "expense", "Alquiler del local (actualizado)", "950.00",
+            "Alquiler/Hipoteca del Local", "monthly", month_ago, day_of_month=1
+        )
+        finances.delete_recurring_item(int(recurring_id))
+    finances.get_cash_flow_forecast(24)
+
+    auth.delete_system_user("recepcion1", "root", auth.ROLE_SUPERUSER)
+
+
+def check_captured_plans(database_path: str, verbose: bool = False) -> list[str]:
+    """Devuelve la lista de problemas encontrados (vacía si todos los planes usan índices)."""
+    problems = []
+    explain_conn = sqlite3.connect(database_path)
+    try:
+        for statement, caller in sorted(_captured_statements.items(), key=lambda item: item[1]):
+            try:
+                plan_rows = explain_conn.execute(f"EXPLAIN QUERY PLAN {statement}").fetchall()
+            except sqlite3.Error as e:
+                problems.append(f"[{caller}] No se pudo analizar: {e}\n    {statement}")
+                continue
+            plan_details = [row[3] for row in plan_rows]
+            if verbose:
+                print(f"[{caller}] {statement}")
+                for detail in plan_details:
+                    print(f"    {detail}")
+            subquery_names = {match.group(1) for match in map(_SUBQUERY_RESULT_PATTERN.match, plan_details) if match}
+            for detail in plan_details:
+                match = _BARE_SCAN_PATTERN.match(detail)
+                # sqlite_master y demás tablas internas de SQLite son diminutas y no crecen con los datos.
+                if match and not match.group(1).startswith("sqlite_") and match.group(1) not in subquery_names \
+                        and (caller, match.group(1)) not in ALLOWED_FULL_SCANS:
+                    problems.append(f"[{caller}] {detail}\n    {statement}")
+    finally:
+        explain_conn.close()
+    return problems
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Verifica que las consultas de core_logic usan índices.")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Mostrar el plan de cada sentencia.")
+    arguments = parser.parse_args()
+
+    database_path = create_temporary_database(prefix="gym_query_plans_")
+    get_db_connection().set_trace_callback(_trace_statement)
+    exercise_core_logic()
+    get_db_connection().set_trace_callback(None)
+
+    found_problems = check_captured_plans(database_path, verbose=arguments.verbose)
+    print(f"Sentencias analizadas: {len(_captured_statements)}")
+    if found_problems:
+        print(f"FALLO: {len(found_problems)} plan(es) con recorrido completo de tabla:")
+        for problem in found_problems:
+            print(f"  {problem}")
+        raise SystemExit(1)
+    print("OK: todas las consultas usan índices.")
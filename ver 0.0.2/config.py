@@ -12,6 +12,17 @@ APP_AUTHOR = "Pedro Miguel González Fernández"
 # El archivo de la BD se guardará dentro del directorio de datos de la aplicación.
 DATABASE_SUBDIR_NAME = "database"         # Subdirectorio para la BD dentro de APP_DATA_DIR
 DATABASE_FILENAME = "gym_pro_data.db" # Nombre del archivo de la base de datos SQLite
+DATABASE_STATEMENT_CACHE_SIZE = 256   # Sentencias preparadas que cada conexión persistente mantiene en caché
+
+# --- CONCURRENCIA (varios PCs de recepción/oficina usando la misma BD) ---
+# WAL permite que las lecturas largas no bloqueen las escrituras (y viceversa).
+# IMPORTANTE: WAL requiere que todos los procesos estén en el MISMO equipo (memoria compartida).
+# Si el archivo de BD está en una carpeta de red compartida, usar "DELETE".
+DATABASE_JOURNAL_MODE = "WAL"
+DATABASE_BUSY_TIMEOUT_MS = 5000                 # Espera máxima de SQLite ante un bloqueo antes de fallar
+DATABASE_WRITE_RETRY_ATTEMPTS = 5               # Reintentos de una escritura que falla por "database is locked"
+DATABASE_WRITE_RETRY_BASE_DELAY_SECONDS = 0.05  # Espera inicial entre reintentos (se duplica en cada uno)
+DATABASE_CHANGE_POLL_INTERVAL_MS = 1000         # Cada cuánto mira la GUI si otro PC ha escrito en la BD
 
 # --- CREDENCIALES DEL SUPERUSUARIO INICIAL ---
 # Estas se usarán para crear el primer superadministrador si no existe.
@@ -117,6 +128,8 @@ MEMBER_STATUS_OPTIONS_LIST = [
     "Activo", "Inactivo", "Pendiente de Pago", "Expirado",
     "Congelado Temporalmente", "Baja Solicitada", "Baja Definitiva"
 ]
+MEMBER_LOOKUP_CACHE_MAX_ENTRIES = 2048             # Socios recientes guardados en memoria (LRU) por internal_member_id
+MEMBER_SEARCH_DEBOUNCE_MS = 200                    # Pausa sin teclear antes de buscar socios (cubre el intervalo habitual entre teclas, ~100-200 ms)
 
 # --- RUTAS Y DIRECTORIOS PRINCIPALES ---
 # Directorio raíz del proyecto (donde se encuentra este archivo config.py)
@@ -167,6 +180,36 @@ APPLICATION_DEBUG_MODE = True
 
 VALID_FREQUENCIES = ['daily', 'weekly', 'bi-weekly', 'monthly', 'quarterly', 'semi-annually', 'annually']
 
+# --- LISTADO DE TRANSACCIONES ---
+FINANCE_TRANSACTIONS_PAGE_SIZE = 25                # Filas por página en la pestaña de transacciones
+FINANCE_TRANSACTION_COUNT_CACHE_TTL_SECONDS = 30   # Validez del total (aprox.) de transacciones por filtro
+
+# --- TAREAS EN SEGUNDO PLANO (GUI) ---
+TASK_RUNNER_MAX_WORKERS = 3        # Hilos para las llamadas a core_logic (cada uno con su conexión a la BD)
+TASK_RUNNER_POLL_INTERVAL_MS = 15  # Cada cuánto recoge la GUI los resultados mientras hay tareas en marcha
+
+# --- LISTAS VIRTUALES (GUI) ---
+VIRTUAL_TREEVIEW_BLOCK_SIZE = 100         # Filas pedidas a core_logic por consulta al desplazarse por una lista
+VIRTUAL_TREEVIEW_MAX_CACHED_BLOCKS = 20   # Bloques guardados por lista (los más recientes); el resto se vuelve a pedir
+
+# --- CACHÉ DE RESULTADOS DE CONSULTAS ---
+QUERY_RESULT_CACHE_MAX_ENTRIES = 128               # Resultados (función, argumentos) guardados en memoria (LRU)
+QUERY_RESULT_CACHE_MAX_ROWS = 400000              # Tope de filas sumando todos los resultados guardados
+
+# --- PROCESO DE ÍTEMS RECURRENTES ---
+RECURRING_CATCH_UP_MAX_OCCURRENCES_PER_ITEM = 366  # Tope de periodos atrasados generados por ítem en cada pasada
+
+# --- PREVISIÓN DE TESORERÍA ---
+FORECAST_DEFAULT_MONTHS = 12                       # Horizonte por defecto de la previsión (meses)
+FORECAST_MAX_MONTHS = 60                           # Horizonte máximo admitido
+FORECAST_RENEWAL_LOOKBACK_DAYS = 365               # Historial usado para la tasa de renovación por plan
+FORECAST_RENEWAL_GRACE_DAYS = 30                   # Días tras la caducidad en los que una nueva membresía cuenta como renovación
+FORECAST_RENEWAL_RATE_WITHOUT_HISTORY = 0.5        # Tasa supuesta si aún no hay ninguna membresía caducada
+
+# --- ARRANQUE (benchmarks/bench_startup.py falla si se superan) ---
+STARTUP_IMPORT_BUDGET_MS = 150                     # Importaciones hasta poder pintar el login (python -X importtime)
+STARTUP_LOGIN_BUDGET_MS = 2000                     # Desde lanzar el proceso hasta que el login acepta credenciales
+
 # --- Script de autocomprobación para este archivo (ejecutar `python config.py`) ---
 if __name__ == "__main__":
     print(f"--- {APP_NAME} Configuration File Self-Check ---")
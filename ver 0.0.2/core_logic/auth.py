@@ -7,8 +7,13 @@ import os # <-- CORRECCIÓN 1: Importar el módulo os
 
 # Importaciones del mismo paquete (core_logic) o de la raíz del proyecto
 try:
-    from .database import get_db_connection
-    from .utils import hash_secure_password, is_valid_system_username, check_password_strength
+    from .database import (
+        get_db_connection, retry_on_database_locked, raise_if_database_locked, DATABASE_BUSY_WRITE_RESULT,
+        transaction
+    )
+    from .query_cache import cached_query, mark_tables_changed, skip_result_caching
+    from .records import SystemUser
+    from .utils import hash_secure_password, is_valid_system_username, check_password_strength, parse_string_to_datetime
     from config import (
         SUPERUSER_INIT_USERNAME, SUPERUSER_INIT_PASSWORD, ROLE_SUPERUSER,
         ALL_DEFINED_ROLES, MAX_FAILED_LOGIN_ATTEMPTS_BEFORE_LOCKOUT,
@@ -21,6 +26,7 @@ except ImportError as e:
     raise
 
 
+@retry_on_database_locked(failure_result=DATABASE_BUSY_WRITE_RESULT)
 def create_system_user(username: str, password: str, role: str, is_active: bool = True) -> tuple[bool, str]:
     """
     Crea un nuevo usuario del sistema.
@@ -42,7 +48,7 @@ def create_system_user(username: str, password: str, role: str, is_active: bool
         return False, "No se pudo conectar a la base de datos."
 
     try:
-        with conn: 
+        with transaction(conn):
             hashed_pwd = hash_secure_password(password)
             cursor = conn.cursor()
             cursor.execute(
@@ -50,15 +56,18 @@ def create_system_user(username: str, password: str, role: str, is_active: bool
                    VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)""",
                 (username.strip().lower(), hashed_pwd, role, 1 if is_active else 0)
             )
+            mark_tables_changed("system_users")
             user_id = cursor.lastrowid
             return True, str(user_id) 
     except sqlite3.IntegrityError:
         return False, f"El nombre de usuario '{username.strip().lower()}' ya existe."
     except sqlite3.Error as e:
+        raise_if_database_locked(e)
         print(f"ERROR (auth.py - create_system_user): {e}")
         return False, "Error de base de datos al crear usuario."
 
 
+@retry_on_database_locked()
 def initialize_superuser_account():
     """
     Verifica y crea la cuenta del superusuario inicial si no existe.
@@ -70,7 +79,7 @@ def initialize_superuser_account():
         return
 
     try:
-        with conn:
+        with transaction(conn):
             cursor = conn.cursor()
             cursor.execute("SELECT id FROM system_users WHERE username = ?", (SUPERUSER_INIT_USERNAME.lower(),))
             if not cursor.fetchone():
@@ -85,8 +94,10 @@ def initialize_superuser_account():
                 else:
                     print(f"ERROR CRÍTICO (auth.py): Falló la creación del superusuario. Razón: {msg_or_id}")
     except sqlite3.Error as e:
+        raise_if_database_locked(e)
         print(f"ERROR (auth.py - initialize_superuser): Error de BD. {e}")
 
+@retry_on_database_locked()
 def attempt_user_login(username: str, password: str) -> dict | None:
     """
     Intenta autenticar un usuario.
@@ -115,10 +126,10 @@ def attempt_user_login(username: str, password: str) -> dict | None:
         if not user_record:
             return None
 
-        if user_record["account_locked_until"]:
-            lockout_time = datetime.fromisoformat(user_record["account_locked_until"])
+        lockout_time = parse_string_to_datetime(user_record["account_locked_until"]) # TIMESTAMP: ya suele ser datetime
+        if lockout_time:
             if datetime.now() < lockout_time:
-                return {"error": "account_locked", "unlock_time": user_record["account_locked_until"]}
+                return {"error": "account_locked", "unlock_time": lockout_time}
             else:
                 _reset_failed_login_attempts(conn, username_clean)
                 user_record = cursor.execute(
@@ -128,13 +139,14 @@ def attempt_user_login(username: str, password: str) -> dict | None:
             if not user_record["is_active"]:
                 return {"error": "account_inactive"}
 
-            with conn:
+            with transaction(conn):
                 cursor.execute(
                     """UPDATE system_users
                        SET failed_login_attempts = 0, account_locked_until = NULL, last_login_at = CURRENT_TIMESTAMP
                        WHERE username = ?""",
                     (username_clean,)
                 )
+                mark_tables_changed("system_users")
             return {
                 "id": user_record["id"],
                 "username": user_record["username"],
@@ -146,6 +158,7 @@ def attempt_user_login(username: str, password: str) -> dict | None:
             return None
             
     except sqlite3.Error as e:
+        raise_if_database_locked(e)
         print(f"ERROR (auth.py - attempt_user_login): Error de BD. {e}")
         return None # Podríamos devolver un dict de error también
     finally:
@@ -164,28 +177,32 @@ def _handle_failed_login_attempt(conn: sqlite3.Connection, username: str, curren
         print(f"WARN (auth.py): Cuenta '{username}' bloqueada por {MAX_FAILED_LOGIN_ATTEMPTS_BEFORE_LOCKOUT} intentos fallidos. Bloqueada hasta {lock_until_timestamp}.")
 
     try:
-        with conn: 
+        with transaction(conn):
             cursor = conn.cursor()
             cursor.execute(
                 "UPDATE system_users SET failed_login_attempts = ?, account_locked_until = ? WHERE username = ?",
                 (new_attempts, lock_until_timestamp, username)
             )
+            mark_tables_changed("system_users")
     except sqlite3.Error as e:
+        raise_if_database_locked(e)
         print(f"ERROR (auth.py - _handle_failed_login_attempt): Error de BD. {e}")
 
 def _reset_failed_login_attempts(conn: sqlite3.Connection, username: str):
     try:
-        with conn:
+        with transaction(conn):
             cursor = conn.cursor()
             cursor.execute(
                 "UPDATE system_users SET failed_login_attempts = 0, account_locked_until = NULL WHERE username = ?",
                 (username,)
             )
+            mark_tables_changed("system_users")
     except sqlite3.Error as e:
+        raise_if_database_locked(e)
         print(f"ERROR (auth.py - _reset_failed_login_attempts): Error de BD. {e}")
 
 
-def get_system_user_by_username(username: str) -> dict | None:
+def get_system_user_by_username(username: str) -> SystemUser | None:
     # (Sin cambios, pero asegurarse que conn se cierra)
     conn = get_db_connection()
     if not conn: return None
@@ -195,19 +212,18 @@ def get_system_user_by_username(username: str) -> dict | None:
             "SELECT id, username, role, is_active, last_login_at, created_at FROM system_users WHERE username = ?",
             (username.strip().lower(),)
         )
-        user_data = cursor.fetchone()
-        return dict(user_data) if user_data else None
+        return SystemUser.fetch_one(cursor)
     except sqlite3.Error as e:
         print(f"ERROR (auth.py - get_system_user_by_username): {e}")
         return None
     finally:
         if conn: conn.close()
 
-def get_all_system_users(exclude_superuser: bool = False) -> list[dict]:
+@cached_query("system_users")
+def get_all_system_users(exclude_superuser: bool = False) -> list[SystemUser]:
     # (Sin cambios, pero asegurarse que conn se cierra)
     conn = get_db_connection()
-    if not conn: return []
-    users_list = []
+    if not conn: skip_result_caching(); return []
     try:
         cursor = conn.cursor()
         query = "SELECT id, username, role, is_active, last_login_at FROM system_users ORDER BY username"
@@ -217,16 +233,16 @@ def get_all_system_users(exclude_superuser: bool = False) -> list[dict]:
             params = (SUPERUSER_INIT_USERNAME.lower(),) # Comparar con el username del superuser
         
         cursor.execute(query, params)
-        for row in cursor.fetchall():
-            users_list.append(dict(row))
-        return users_list
+        return SystemUser.fetch_all(cursor)
     except sqlite3.Error as e:
         print(f"ERROR (auth.py - get_all_system_users): {e}")
+        skip_result_caching()
         return []
     finally:
         if conn: conn.close()
 
 
+@retry_on_database_locked(failure_result=DATABASE_BUSY_WRITE_RESULT)
 def update_user_password(username: str, new_password: str) -> tuple[bool, str]:
     # (Sin cambios, pero asegurarse que conn se cierra)
     is_strong_enough, strength_msg = check_password_strength(new_password)
@@ -236,7 +252,7 @@ def update_user_password(username: str, new_password: str) -> tuple[bool, str]:
     conn = get_db_connection()
     if not conn: return False, "Error de conexión a BD."
     try:
-        with conn:
+        with transaction(conn):
             cursor = conn.cursor()
             hashed_pwd = hash_secure_password(new_password)
             cursor.execute(
@@ -246,16 +262,19 @@ def update_user_password(username: str, new_password: str) -> tuple[bool, str]:
                    WHERE username = ?""",
                 (hashed_pwd, username.strip().lower())
             )
+            mark_tables_changed("system_users")
             if cursor.rowcount == 0:
                 return False, "Usuario no encontrado."
             return True, "Contraseña actualizada exitosamente."
     except sqlite3.Error as e:
+        raise_if_database_locked(e)
         print(f"ERROR (auth.py - update_user_password): {e}")
         return False, "Error de base de datos al actualizar contraseña."
     finally: # Asegurar que la conexión se cierre si se abrió en esta función
         if conn: conn.close()
 
 
+@retry_on_database_locked(failure_result=DATABASE_BUSY_WRITE_RESULT)
 def update_user_role(username: str, new_role: str, current_admin_role: str) -> tuple[bool, str]:
     # (Sin cambios, pero asegurarse que conn se cierra)
     username_clean = username.strip().lower()
@@ -270,21 +289,24 @@ def update_user_role(username: str, new_role: str, current_admin_role: str) -> t
     conn = get_db_connection()
     if not conn: return False, "Error de conexión a BD."
     try:
-        with conn:
+        with transaction(conn):
             cursor = conn.cursor()
             cursor.execute(
                 "UPDATE system_users SET role = ?, updated_at = CURRENT_TIMESTAMP WHERE username = ?",
                 (new_role, username_clean)
             )
+            mark_tables_changed("system_users")
             if cursor.rowcount == 0:
                 return False, "Usuario no encontrado."
             return True, f"Rol de '{username_clean}' actualizado a '{new_role}'."
     except sqlite3.Error as e:
+        raise_if_database_locked(e)
         print(f"ERROR (auth.py - update_user_role): {e}")
         return False, "Error de base de datos al actualizar rol."
     finally:
         if conn: conn.close()
 
+@retry_on_database_locked(failure_result=DATABASE_BUSY_WRITE_RESULT)
 def set_user_activation_status(username: str, is_active: bool, current_admin_role: str) -> tuple[bool, str]:
     # (Sin cambios, pero asegurarse que conn se cierra)
     username_clean = username.strip().lower()
@@ -295,23 +317,26 @@ def set_user_activation_status(username: str, is_active: bool, current_admin_rol
     conn = get_db_connection()
     if not conn: return False, "Error de conexión a BD."
     try:
-        with conn:
+        with transaction(conn):
             cursor = conn.cursor()
             cursor.execute(
                 "UPDATE system_users SET is_active = ?, updated_at = CURRENT_TIMESTAMP WHERE username = ?",
                 (1 if is_active else 0, username_clean)
             )
+            mark_tables_changed("system_users")
             if cursor.rowcount == 0:
                 return False, "Usuario no encontrado."
             action = "activada" if is_active else "desactivada"
             return True, f"Cuenta '{username_clean}' ha sido {action}."
     except sqlite3.Error as e:
+        raise_if_database_locked(e)
         print(f"ERROR (auth.py - set_user_activation_status): {e}")
         return False, f"Error de base de datos al cambiar estado de activación."
     finally:
         if conn: conn.close()
 
 
+@retry_on_database_locked(failure_result=DATABASE_BUSY_WRITE_RESULT)
 def delete_system_user(username_to_delete: str, current_admin_username: str, current_admin_role: str) -> tuple[bool, str]:
     # (Sin cambios, pero asegurarse que conn se cierra)
     username_clean_delete = username_to_delete.strip().lower()
@@ -325,13 +350,15 @@ def delete_system_user(username_to_delete: str, current_admin_username: str, cur
     conn = get_db_connection()
     if not conn: return False, "Error de conexión a BD."
     try:
-        with conn:
+        with transaction(conn):
             cursor = conn.cursor()
             cursor.execute("DELETE FROM system_users WHERE username = ?", (username_clean_delete,))
+            mark_tables_changed("system_users")
             if cursor.rowcount == 0:
                 return False, "Usuario no encontrado para eliminar."
             return True, f"Usuario '{username_clean_delete}' eliminado exitosamente."
     except sqlite3.Error as e:
+        raise_if_database_locked(e)
         print(f"ERROR (auth.py - delete_system_user): {e}")
         return False, "Error de base de datos al eliminar usuario."
     finally:
@@ -3,10 +3,21 @@
 
 import sqlite3
 import os
+import threading
+import time
+import random
+import functools
+import contextlib
+from datetime import date, datetime
+from decimal import Decimal
 
 # --- Importaciones ---
 try:
-    from config import APP_DATA_ROOT_DIR, DATABASE_SUBDIR_NAME, DATABASE_FILENAME
+    from config import (
+        APP_DATA_ROOT_DIR, DATABASE_SUBDIR_NAME, DATABASE_FILENAME,
+        DATABASE_STATEMENT_CACHE_SIZE, DATABASE_JOURNAL_MODE, DATABASE_BUSY_TIMEOUT_MS,
+        DATABASE_WRITE_RETRY_ATTEMPTS, DATABASE_WRITE_RETRY_BASE_DELAY_SECONDS, DATABASE_CHANGE_POLL_INTERVAL_MS
+    )
     from .utils import ensure_directory_exists 
 except ImportError as e:
     print(f"ADVERTENCIA (database.py): No se pudo importar desde 'config' o '.utils'. Error: {e}")
@@ -14,6 +25,12 @@ except ImportError as e:
     APP_DATA_ROOT_DIR = os.path.join(_fallback_project_root, "_gym_app_data_db_fallback")
     DATABASE_SUBDIR_NAME = "db_fb"
     DATABASE_FILENAME = "gym_pro_data_fb.db"
+    DATABASE_STATEMENT_CACHE_SIZE = 256
+    DATABASE_JOURNAL_MODE = "WAL"
+    DATABASE_BUSY_TIMEOUT_MS = 5000
+    DATABASE_WRITE_RETRY_ATTEMPTS = 5
+    DATABASE_WRITE_RETRY_BASE_DELAY_SECONDS = 0.05
+    DATABASE_CHANGE_POLL_INTERVAL_MS = 1000
     
     # Firma de fallback corregida para coincidir con utils.ensure_directory_exists
     def ensure_directory_exists(dir_path: str) -> bool:
@@ -28,207 +45,454 @@ except ImportError as e:
                 return False
         return True
 
+from .migrations import get_schema_version, apply_pending_migrations, LATEST_SCHEMA_VERSION
+from .utils import MONEY_SQL_TYPE, parse_string_to_date, parse_string_to_datetime
+
 # --- CONSTRUCCIÓN DE LA RUTA A LA BASE DE DATOS ---
 DB_DIRECTORY = os.path.join(APP_DATA_ROOT_DIR, DATABASE_SUBDIR_NAME)
 FULL_DATABASE_PATH = os.path.join(DB_DIRECTORY, DATABASE_FILENAME)
 
 
-def get_db_connection() -> sqlite3.Connection | None:
-    if not ensure_directory_exists(DB_DIRECTORY):
-        print(f"ERROR CRÍTICO (database.py): No se pudo crear/acceder al directorio de la base de datos: {DB_DIRECTORY}")
-        return None
-    
+# --- TIPOS DE COLUMNA ---
+# Los importes se guardan en céntimos enteros (columnas MONEY_CENTS): SUM() es exacto y cada fila se
+# convierte a Decimal una sola vez al leerla, sin pasar por float. Al escribir, cada INSERT/UPDATE de un
+# importe lo pasa a céntimos con utils.money_to_cents: no se registra un adaptador para Decimal, que
+# afectaría a todo sqlite3 en el proceso (un Decimal en otra columna se guardaría multiplicado por 100).
+# Un Decimal pasado directamente como parámetro da error en lugar de guardarse mal.
+# En sentencias con agregados se usa el alias 'AS "total [MONEY_CENTS]"'.
+def _convert_money_cents(value: bytes) -> Decimal:
+    return Decimal(value.decode("ascii")).scaleb(-2)
+
+# Las columnas DATE y TIMESTAMP llegan ya como date/datetime (fromisoformat, sin strptime por fila).
+# Se sustituyen así los conversores por defecto de sqlite3, obsoletos desde Python 3.12. Un valor que no
+# sea ISO (datos antiguos o escritos a mano) se devuelve como texto en lugar de romper la consulta.
+def _convert_date(value: bytes) -> date | str:
+    text = value.decode("utf-8")
+    try:
+        return date.fromisoformat(text)
+    except ValueError:
+        return parse_string_to_date(text) or text
+
+def _convert_timestamp(value: bytes) -> datetime | str:
+    text = value.decode("utf-8")
+    return parse_string_to_datetime(text) or text
+
+def _adapt_date(value: date) -> str:
+    return value.isoformat()
+
+def _adapt_datetime(value: datetime) -> str:
+    # Mismo formato que CURRENT_TIMESTAMP para que las comparaciones de texto en SQL sigan siendo válidas.
+    return value.isoformat(sep=" ", timespec="seconds")
+
+sqlite3.register_converter(MONEY_SQL_TYPE, _convert_money_cents)
+sqlite3.register_adapter(date, _adapt_date)
+sqlite3.register_adapter(datetime, _adapt_datetime)
+sqlite3.register_converter("DATE", _convert_date)
+sqlite3.register_converter("TIMESTAMP", _convert_timestamp)
+
+
+# --- GESTOR DE CONEXIONES ---
+# Cada hilo mantiene UNA conexión persistente, configurada una sola vez (row_factory,
+# PRAGMAs, caché de sentencias). get_db_connection() sigue siendo el único punto de
+# entrada: los módulos de core_logic no necesitan saber si la conexión es nueva o reutilizada.
+
+class PooledConnection(sqlite3.Connection):
+    """
+    Conexión persistente del gestor. close() NO cierra la conexión física: las funciones
+    de core_logic la llaman al terminar cada operación y la conexión vuelve a quedar
+    disponible para el mismo hilo. Para cerrarla de verdad se usa close_physically().
+    """
+    unit_of_work_depth = 0 # Niveles de transaction() abiertos ahora mismo en esta conexión
+    after_commit_callbacks: list | None = None # Se crea al abrir la transacción más externa
+    last_seen_data_version: int | None = None # PRAGMA data_version visto por la caché de consultas (query_cache)
+
+    def close(self):
+        # No se hace rollback aquí: una función anidada (ej. get_member_by_internal_id
+        # llamada dentro de otra transacción) comparte esta misma conexión.
+        pass
+
+    def close_physically(self):
+        super().close()
+
+
+_thread_local_state = threading.local()
+_connections_lock = threading.Lock()
+_open_connections_by_thread: dict[int, PooledConnection] = {} # ident del hilo -> conexión
+_connection_stats = {"opened": 0, "reused": 0, "closed": 0, "write_retries": 0, "write_failures_locked": 0}
+_pool_generation = 0 # Se incrementa al cerrar todas las conexiones; invalida las referencias de cada hilo
+_verified_db_directories: set[str] = set()
+
+
+def _open_new_connection() -> PooledConnection:
+    """Abre y configura una conexión nueva para el hilo actual."""
+    conn = sqlite3.connect(
+        FULL_DATABASE_PATH,
+        factory=PooledConnection,
+        timeout=DATABASE_BUSY_TIMEOUT_MS / 1000, # busy_timeout: SQLite espera antes de devolver SQLITE_BUSY
+        cached_statements=DATABASE_STATEMENT_CACHE_SIZE,
+        detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES, # Conversores de tipos (ver arriba)
+        check_same_thread=False # Cada conexión solo la usa su hilo; esto permite cerrarla al salir desde otro.
+    )
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON;")
+    _apply_concurrency_mode(conn)
+    return conn
+
+
+def _apply_concurrency_mode(conn: sqlite3.Connection):
+    """Configura el modo de diario (WAL por defecto) y la sincronización de la conexión."""
+    journal_mode = (DATABASE_JOURNAL_MODE or "DELETE").upper()
     try:
-        conn = sqlite3.connect(FULL_DATABASE_PATH)
-        conn.row_factory = sqlite3.Row
-        conn.execute("PRAGMA foreign_keys = ON;")
+        # journal_mode=WAL es persistente en el archivo; en conexiones posteriores es una simple lectura.
+        current_mode = conn.execute(f"PRAGMA journal_mode = {journal_mode};").fetchone()[0]
+        if current_mode.upper() != journal_mode:
+            print(f"ADVERTENCIA (database.py): No se pudo activar journal_mode={journal_mode} (actual: {current_mode}).")
+        if current_mode.upper() == "WAL":
+            # En WAL, NORMAL es seguro ante caídas de la aplicación y evita un fsync por cada commit.
+            conn.execute("PRAGMA synchronous = NORMAL;")
+    except sqlite3.Error as e:
+        # Otro proceso puede tener la BD bloqueada justo al convertirla a WAL; se reintentará en otra conexión.
+        print(f"ADVERTENCIA (database.py): No se pudo configurar journal_mode={journal_mode}. Error: {e}")
+
+
+def _discard_connections_of_finished_threads():
+    """Cierra las conexiones de hilos que ya terminaron. Debe llamarse con _connections_lock tomado."""
+    alive_idents = {t.ident for t in threading.enumerate()}
+    for ident in [i for i in _open_connections_by_thread if i not in alive_idents]:
+        stale_conn = _open_connections_by_thread.pop(ident)
+        try:
+            stale_conn.close_physically()
+        except sqlite3.Error:
+            pass
+        _connection_stats["closed"] += 1
+
+
+def get_db_connection() -> sqlite3.Connection | None:
+    """
+    Devuelve la conexión persistente del hilo actual, abriéndola la primera vez.
+    Las llamadas posteriores desde el mismo hilo reutilizan la conexión ya configurada.
+    """
+    conn = getattr(_thread_local_state, "connection", None)
+    if conn is not None and _thread_local_state.pool_generation == _pool_generation:
+        with _connections_lock:
+            _connection_stats["reused"] += 1
         return conn
+
+    if DB_DIRECTORY not in _verified_db_directories:
+        if not ensure_directory_exists(DB_DIRECTORY):
+            print(f"ERROR CRÍTICO (database.py): No se pudo crear/acceder al directorio de la base de datos: {DB_DIRECTORY}")
+            return None
+        _verified_db_directories.add(DB_DIRECTORY)
+
+    if conn is not None: # El gestor cerró todas las conexiones (ej. set_database_path)
+        _thread_local_state.connection = None
+
+    try:
+        conn = _open_new_connection()
     except sqlite3.Error as e:
         print(f"ERROR (database.py): No se pudo conectar a la base de datos '{FULL_DATABASE_PATH}'. Error: {e}")
         return None
 
+    _thread_local_state.connection = conn
+    _thread_local_state.pool_generation = _pool_generation
+    with _connections_lock:
+        _discard_connections_of_finished_threads()
+        _open_connections_by_thread[threading.get_ident()] = conn
+        _connection_stats["opened"] += 1
+    return conn
+
+
+def get_connection_pool_generation() -> int:
+    """Cambia cada vez que se cierran todas las conexiones (p. ej. set_database_path): lo guardado en memoria de la BD anterior ya no vale."""
+    return _pool_generation
+
+
+def close_all_db_connections():
+    """Cierra físicamente todas las conexiones abiertas (llamar al cerrar la aplicación)."""
+    global _pool_generation
+    with _connections_lock:
+        _pool_generation += 1
+        connections = list(_open_connections_by_thread.values())
+        _open_connections_by_thread.clear()
+        _connection_stats["closed"] += len(connections)
+    _thread_local_state.connection = None
+    for conn in connections:
+        try:
+            conn.close_physically()
+        except sqlite3.Error as e:
+            print(f"ADVERTENCIA (database.py): Error al cerrar una conexión: {e}")
+
+
+def get_db_connection_stats() -> dict:
+    """Contadores del gestor: conexiones abiertas, reutilizadas, cerradas y activas ahora."""
+    with _connections_lock:
+        stats = dict(_connection_stats)
+        stats["active"] = len(_open_connections_by_thread)
+    return stats
+
+
+# --- UNIDAD DE TRABAJO (una acción del usuario = una transacción = un commit) ---
+# Las funciones de escritura de core_logic abren su transacción con `with transaction(conn):`.
+# Si se llaman desde otra que ya tiene una abierta en la misma conexión (p. ej. add_membership_to_member
+# -> update_member_details), se unen a ella con un SAVEPOINT en lugar de hacer commit por su cuenta:
+# un fallo en la anidada deshace solo su parte, y el único commit lo hace la más externa.
+
+@contextlib.contextmanager
+def transaction(conn: sqlite3.Connection):
+    """
+    Transacción anidable sobre la conexión del hilo. La más externa empieza con BEGIN IMMEDIATE
+    (reserva la escritura desde el principio, así busy_timeout puede esperar en lugar de fallar al
+    pasar de lectura a escritura) y hace commit al salir sin excepción o rollback si la hay.
+    """
+    depth = conn.unit_of_work_depth
+    savepoint_name = f"unit_of_work_{depth}"
+    if depth == 0:
+        conn.execute("BEGIN IMMEDIATE;")
+        conn.after_commit_callbacks = []
+    else:
+        conn.execute(f"SAVEPOINT {savepoint_name};")
+    conn.unit_of_work_depth = depth + 1
+    try:
+        yield conn
+    except BaseException:
+        conn.unit_of_work_depth = depth
+        if depth == 0:
+            conn.rollback()
+            conn.after_commit_callbacks = []
+        else:
+            try:
+                conn.execute(f"ROLLBACK TO {savepoint_name};")
+                conn.execute(f"RELEASE {savepoint_name};")
+            except sqlite3.Error:
+                pass # SQLite ya deshizo la transacción entera (p. ej. disco lleno); la externa hará rollback
+        raise
+    conn.unit_of_work_depth = depth
+    if depth > 0:
+        conn.execute(f"RELEASE {savepoint_name};")
+        return
+    try:
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        conn.after_commit_callbacks = []
+        raise
+    callbacks, conn.after_commit_callbacks = conn.after_commit_callbacks, []
+    for callback in callbacks:
+        callback()
+
+
+def call_after_commit(callback):
+    """
+    Ejecuta `callback` cuando se confirme la unidad de trabajo abierta en este hilo (o ya mismo si
+    no hay ninguna). Para invalidar cachés sin que otro hilo vuelva a llenarlas con datos sin confirmar.
+    """
+    conn = getattr(_thread_local_state, "connection", None)
+    if conn is not None and conn.unit_of_work_depth > 0:
+        conn.after_commit_callbacks.append(callback)
+    else:
+        callback()
+
+
+def is_inside_unit_of_work() -> bool:
+    """True si este hilo tiene una unidad de trabajo abierta (lo leído puede no estar confirmado)."""
+    conn = getattr(_thread_local_state, "connection", None)
+    return conn is not None and conn.unit_of_work_depth > 0
+
+
+# --- REINTENTOS ANTE BLOQUEOS ("database is locked") ---
+# Resultado estándar (éxito, mensaje) de una escritura que no pudo completarse por bloqueo.
+DATABASE_BUSY_WRITE_RESULT = (False, "La base de datos está ocupada por otro equipo. Inténtelo de nuevo.")
+
+def is_database_locked_error(error: BaseException) -> bool:
+    """True si el error de SQLite se debe a que otra conexión tiene la BD bloqueada."""
+    if not isinstance(error, sqlite3.OperationalError):
+        return False
+    error_code = getattr(error, "sqlite_errorcode", None)
+    if error_code is not None:
+        return (error_code & 0xFF) in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+    message = str(error).lower()
+    return "database is locked" in message or "database is busy" in message or "database table is locked" in message
+
+
+def is_interrupted_error(error: BaseException) -> bool:
+    """True si la consulta se canceló con Connection.interrupt() (p. ej. una búsqueda sustituida por otra)."""
+    if not isinstance(error, sqlite3.OperationalError):
+        return False
+    error_code = getattr(error, "sqlite_errorcode", None)
+    if error_code is not None:
+        return (error_code & 0xFF) == sqlite3.SQLITE_INTERRUPT
+    return str(error).lower() == "interrupted"
+
+
+def raise_if_database_locked(error: BaseException):
+    """
+    Para usar al inicio de los bloques `except sqlite3.Error` de las funciones de escritura:
+    deja escapar los errores de bloqueo para que retry_on_database_locked reintente la operación.
+    """
+    if is_database_locked_error(error):
+        raise error
+
+
+def retry_on_database_locked(failure_result=None):
+    """
+    Decorador para las funciones de escritura de core_logic. Si la función lanza un error
+    de bloqueo, se reintenta con espera exponencial (con algo de aleatoriedad para que varios
+    PCs no reintenten a la vez). Si se agotan los intentos devuelve `failure_result`.
+    Dentro de una unidad de trabajo ya abierta no se reintenta: el error sube hasta la función
+    más externa, que repite la acción completa desde su BEGIN.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            delay_seconds = DATABASE_WRITE_RETRY_BASE_DELAY_SECONDS
+            for attempt in range(1, DATABASE_WRITE_RETRY_ATTEMPTS + 1):
+                try:
+                    return func(*args, **kwargs)
+                except sqlite3.OperationalError as e:
+                    if not is_database_locked_error(e) or is_inside_unit_of_work():
+                        raise
+                    if attempt == DATABASE_WRITE_RETRY_ATTEMPTS:
+                        with _connections_lock:
+                            _connection_stats["write_failures_locked"] += 1
+                        print(f"ERROR (database.py - {func.__name__}): BD bloqueada tras {attempt} intentos. {e}")
+                        return failure_result
+                    with _connections_lock:
+                        _connection_stats["write_retries"] += 1
+                    time.sleep(delay_seconds * random.uniform(1.0, 1.5))
+                    delay_seconds *= 2
+            return failure_result
+        return wrapper
+    return decorator
+
+
+# --- DETECCIÓN DE CAMBIOS HECHOS DESDE OTROS PCs ---
+# La GUI consulta cada segundo (en el bucle de Tk, sin hilos) PRAGMA data_version, que SQLite cambia
+# cuando OTRA conexión confirma una escritura: si no cambió, no hay nada más que leer. Si cambió, los
+# contadores de data_change_log (migración 10) dicen qué tablas se tocaron y solo se avisa a las
+# pantallas suscritas a ellas. Las escrituras de esta misma conexión no cambian data_version; si
+# coinciden con un cambio externo, las pantallas afectadas refrescan una vez de más, nada peor.
+
+_change_subscribers: list[tuple] = [] # (callback, frozenset de tablas o None = todas)
+_change_monitor_state = {"pool_generation": None, "data_version": None, "change_counts": {}, "after_id": None, "widget": None}
+
+
+def subscribe_to_database_changes(callback, table_names=None):
+    """
+    Registra `callback(tablas_cambiadas: set[str])` para cuando otro PC (u otra conexión) escriba en
+    alguna de `table_names` (todas si es None). Se llama desde el hilo de la GUI, dentro de poll_database_changes.
+    """
+    unsubscribe_from_database_changes(callback)
+    _change_subscribers.append((callback, frozenset(table_names) if table_names else None))
+
+
+def unsubscribe_from_database_changes(callback):
+    """Deja de avisar a `callback` (p. ej. al destruir el frame que se suscribió)."""
+    _change_subscribers[:] = [entry for entry in _change_subscribers if entry[0] != callback]
+
+
+def _read_change_counts(conn: sqlite3.Connection) -> dict[str, int]:
+    return {row[0]: row[1] for row in conn.execute("SELECT table_name, change_count FROM data_change_log")}
+
+
+def poll_database_changes() -> set[str]:
+    """
+    Comprueba si otra conexión escribió desde la última llamada y avisa a los suscriptores afectados.
+    Devuelve el conjunto de tablas cambiadas (vacío en el caso normal, con una sola lectura de PRAGMA).
+    La primera llamada (o tras cambiar de BD) solo toma la referencia.
+    """
+    state = _change_monitor_state
+    conn = get_db_connection()
+    if not conn or conn.unit_of_work_depth > 0:
+        return set()
+    try:
+        data_version = conn.execute("PRAGMA data_version;").fetchone()[0]
+        if state["pool_generation"] == _pool_generation and state["data_version"] == data_version:
+            return set()
+        change_counts = _read_change_counts(conn)
+    except sqlite3.Error as e:
+        print(f"ERROR (database.py - poll_database_changes): {e}")
+        return set()
+    finally:
+        conn.close()
+    is_first_poll = state["pool_generation"] != _pool_generation
+    previous_counts = state["change_counts"]
+    state.update(pool_generation=_pool_generation, data_version=data_version, change_counts=change_counts)
+    if is_first_poll:
+        return set()
+    changed_tables = {table_name for table_name, count in change_counts.items() if previous_counts.get(table_name) != count}
+    for callback, table_names in list(_change_subscribers):
+        if changed_tables and (table_names is None or table_names & changed_tables):
+            try:
+                callback(changed_tables)
+            except Exception as e: # Un frame con errores no debe parar la detección para los demás
+                print(f"ERROR (database.py - poll_database_changes): Fallo en el suscriptor {callback}: {e}")
+    return changed_tables
+
+
+def start_database_change_polling(tk_widget, interval_ms: int = DATABASE_CHANGE_POLL_INTERVAL_MS):
+    """Programa poll_database_changes cada `interval_ms` en el bucle de eventos de `tk_widget` (la ventana principal)."""
+    stop_database_change_polling()
+    state = _change_monitor_state
+
+    def _poll_and_reschedule():
+        poll_database_changes()
+        state["after_id"] = tk_widget.after(interval_ms, _poll_and_reschedule)
+
+    state["widget"] = tk_widget
+    poll_database_changes() # Referencia inicial
+    state["after_id"] = tk_widget.after(interval_ms, _poll_and_reschedule)
+
+
+def stop_database_change_polling():
+    """Cancela el sondeo programado con start_database_change_polling."""
+    state = _change_monitor_state
+    if state["after_id"] is not None and state["widget"] is not None:
+        try:
+            state["widget"].after_cancel(state["after_id"])
+        except Exception: # La ventana ya se destruyó
+            pass
+    state["after_id"] = None; state["widget"] = None
+
+
+def set_database_path(database_full_path: str):
+    """
+    Cambia el archivo de BD que usan las conexiones (pruebas de rendimiento, copias de trabajo).
+    Cierra las conexiones existentes; cada hilo abrirá una nueva en su próxima llamada.
+    """
+    global DB_DIRECTORY, FULL_DATABASE_PATH
+    close_all_db_connections()
+    FULL_DATABASE_PATH = os.path.abspath(database_full_path)
+    DB_DIRECTORY = os.path.dirname(FULL_DATABASE_PATH)
+
+
+@retry_on_database_locked(failure_result=False)
 def create_or_verify_tables():
+    """
+    Deja el esquema de la BD en la última versión. Si ya lo está (caso normal en cada arranque),
+    solo lee PRAGMA user_version y no ejecuta ninguna sentencia DDL.
+    """
     print_prefix = "INFO (database.py - Tablas):"
     conn = get_db_connection()
     if not conn:
         print(f"{print_prefix} No se pudo obtener conexión a la BD. Creación de tablas abortada.")
         return False
 
-    cursor = conn.cursor()
-    all_ok = True
-
     try:
-        print(f"{print_prefix} Verificando/Creando tablas en '{FULL_DATABASE_PATH}'...")
-
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS system_users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                password_hash TEXT NOT NULL,
-                role TEXT NOT NULL,
-                is_active INTEGER DEFAULT 1,
-                last_login_at TIMESTAMP,
-                failed_login_attempts INTEGER DEFAULT 0,
-                account_locked_until TIMESTAMP,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        # print(f"{print_prefix} Tabla 'system_users' verificada/creada.") # Comentado para menos verbosidad
-
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS members (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                internal_member_id TEXT UNIQUE NOT NULL,
-                full_name TEXT NOT NULL,
-                date_of_birth DATE,
-                gender TEXT,
-                phone_number TEXT,
-                address_line1 TEXT,
-                address_city TEXT,
-                address_postal_code TEXT,
-                join_date DATE NOT NULL,
-                current_status TEXT NOT NULL,
-                notes TEXT,
-                photo_filename TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        # print(f"{print_prefix} Tabla 'members' verificada/creada.")
-
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS member_memberships (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                member_id INTEGER NOT NULL,
-                plan_key TEXT NOT NULL,
-                plan_name_at_purchase TEXT NOT NULL,
-                price_paid DECIMAL(10, 2) NOT NULL,
-                start_date DATE NOT NULL,
-                expiry_date DATE NOT NULL,
-                sessions_total INTEGER,
-                sessions_remaining INTEGER,
-                payment_transaction_id INTEGER,
-                is_current INTEGER DEFAULT 0,
-                notes TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (member_id) REFERENCES members(id) ON DELETE CASCADE,
-                FOREIGN KEY (payment_transaction_id) REFERENCES financial_transactions(id) ON DELETE SET NULL
-            )
-        """)
-        # print(f"{print_prefix} Tabla 'member_memberships' verificada/creada.")
-
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS member_attendance (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                member_id INTEGER NOT NULL,
-                membership_id INTEGER,
-                check_in_datetime TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                check_out_datetime TIMESTAMP,
-                attended_activity_name TEXT,
-                notes TEXT,
-                FOREIGN KEY (member_id) REFERENCES members(id) ON DELETE CASCADE,
-                FOREIGN KEY (membership_id) REFERENCES member_memberships(id) ON DELETE SET NULL
-            )
-        """)
-        # print(f"{print_prefix} Tabla 'member_attendance' verificada/creada.")
-
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS financial_transactions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                internal_transaction_id TEXT UNIQUE NOT NULL,
-                transaction_type TEXT NOT NULL CHECK(transaction_type IN ('income', 'expense')),
-                transaction_date DATE NOT NULL,
-                description TEXT NOT NULL,
-                category TEXT NOT NULL,
-                amount DECIMAL(10, 2) NOT NULL,
-                payment_method TEXT,
-                related_member_id INTEGER,
-                recorded_by_user_id INTEGER,
-                reference_document_number TEXT,
-                notes TEXT,
-                is_recurring_source INTEGER DEFAULT 0,
-                source_recurring_id INTEGER,      
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (related_member_id) REFERENCES members(id) ON DELETE SET NULL,
-                FOREIGN KEY (recorded_by_user_id) REFERENCES system_users(id) ON DELETE SET NULL,
-                FOREIGN KEY (source_recurring_id) REFERENCES recurring_financial_items(id) ON DELETE SET NULL 
-            )
-        """)
-        # print(f"{print_prefix} Tabla 'financial_transactions' verificada/creada.")
-
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS recurring_financial_items (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                item_type TEXT NOT NULL CHECK(item_type IN ('income', 'expense')),
-                description TEXT NOT NULL,
-                default_amount DECIMAL(10, 2) NOT NULL,
-                category TEXT NOT NULL,
-                frequency TEXT NOT NULL,
-                day_of_month_to_process INTEGER,
-                day_of_week_to_process INTEGER,
-                start_date DATE NOT NULL,
-                end_date DATE,
-                next_due_date DATE NOT NULL,
-                is_active INTEGER DEFAULT 1,
-                auto_generate_transaction INTEGER DEFAULT 0,
-                related_member_id INTEGER,
-                notes TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (related_member_id) REFERENCES members(id) ON DELETE SET NULL
-            )
-        """)
-        # print(f"{print_prefix} Tabla 'recurring_financial_items' verificada/creada.")
-
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS application_settings (
-                setting_key TEXT PRIMARY KEY NOT NULL,
-                setting_value TEXT,
-                value_data_type TEXT DEFAULT 'string' CHECK(value_data_type IN ('string', 'integer', 'float', 'boolean', 'json')),
-                description TEXT,
-                is_user_configurable INTEGER DEFAULT 1,
-                last_updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        # print(f"{print_prefix} Tabla 'application_settings' verificada/creada.")
-
-        tables_with_auto_update_timestamp = {
-            "system_users": ("id", "updated_at"),
-            "members": ("id", "updated_at"),
-            "financial_transactions": ("id", "updated_at"),
-            "recurring_financial_items": ("id", "updated_at"),
-            "application_settings": ("setting_key", "last_updated_at")
-        }
-
-        for table, (pk_col, ts_col) in tables_with_auto_update_timestamp.items():
-            trigger_name = f"trigger_update_{table}_{ts_col}"
-            cursor.execute(f"""
-                CREATE TRIGGER IF NOT EXISTS {trigger_name}
-                AFTER UPDATE ON {table}
-                FOR EACH ROW
-                BEGIN
-                    UPDATE {table}
-                    SET {ts_col} = CURRENT_TIMESTAMP
-                    WHERE {pk_col} = OLD.{pk_col};
-                END;
-            """)
-        # print(f"{print_prefix} Triggers para timestamps verificados/creados.") # Un solo mensaje
-        print(f"{print_prefix} Todas las tablas y triggers definidos han sido procesados.")
+        if get_schema_version(conn) >= LATEST_SCHEMA_VERSION:
+            return True
 
-        conn.commit()
-        print(f"{print_prefix} Cambios comprometidos exitosamente.")
+        print(f"{print_prefix} Actualizando esquema en '{FULL_DATABASE_PATH}' a la versión {LATEST_SCHEMA_VERSION}...")
+        success, message = apply_pending_migrations(conn)
+        print(f"{print_prefix} {message}")
+        return success
 
     except sqlite3.Error as e:
+        raise_if_database_locked(e)
         print(f"ERROR (database.py): Ocurrió un error durante creación/verificación de tablas: {e}")
-        conn.rollback()
-        all_ok = False
+        return False
     finally:
         if conn:
             conn.close()
-    
-    return all_ok
 
 
 if __name__ == "__main__":
@@ -252,5 +516,7 @@ if __name__ == "__main__":
                     else: print("ADVERTENCIA: Tabla 'system_users' NO encontrada post-creación.")
                 except sqlite3.Error as et: print(f"Error verificando tabla: {et}")
                 finally: conn_t.close()
+            print(f"Versión del esquema: {LATEST_SCHEMA_VERSION}")
+            print(f"Estadísticas de conexiones: {get_db_connection_stats()}")
         else:
             print("\nFALLÓ inicialización de la BD.")
\ No newline at end of file
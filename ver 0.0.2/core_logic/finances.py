@@ -5,14 +5,27 @@ import sqlite3
 from datetime import date, datetime, timedelta
 from decimal import Decimal, InvalidOperation
 import os
+import base64
+import calendar
+import json
+import threading
+import time
 
 # Importaciones del mismo paquete (core_logic) o de la raíz del proyecto
 try:
-    from .database import get_db_connection
+    from .database import (
+        get_db_connection, retry_on_database_locked, raise_if_database_locked, DATABASE_BUSY_WRITE_RESULT,
+        transaction, call_after_commit, is_interrupted_error
+    )
+    from .migrations import fill_financial_daily_rollup
+    from .query_cache import cached_query, mark_tables_changed, skip_result_caching
+    from .records import Transaction, RecurringItem
+    from .recurrence import get_recurrence_schedule, next_occurrence_after, first_occurrence_on_or_after
     from .utils import (
-        generate_internal_id, sanitize_text_input, parse_string_to_date,
+        generate_internal_id, generate_internal_ids, sanitize_text_input, parse_string_to_date,
         format_date_for_ui, convert_date_to_db_string, parse_string_to_decimal,
-        get_current_date_for_db, format_currency_for_display # format_currency_for_display sí se importa
+        get_current_date_for_db, format_currency_for_display, # format_currency_for_display sí se importa
+        MONEY_SQL_TYPE, money_to_cents
     )
     # Asegurarse de que TODAS las constantes de config usadas aquí estén importadas.
     from config import (
@@ -20,7 +33,11 @@ try:
         VALID_FREQUENCIES, # Esta debe estar definida en tu config.py
         DB_STORAGE_DATE_FORMAT, # Usada indirectamente por convert_date_to_db_string
         UI_DISPLAY_DATE_FORMAT, # Usada en el if __name__
-        CURRENCY_DISPLAY_SYMBOL # Usada en el if __name__
+        CURRENCY_DISPLAY_SYMBOL, # Usada en el if __name__
+        FINANCE_TRANSACTIONS_PAGE_SIZE, FINANCE_TRANSACTION_COUNT_CACHE_TTL_SECONDS,
+        RECURRING_CATCH_UP_MAX_OCCURRENCES_PER_ITEM, DEFAULT_MEMBERSHIP_PLANS,
+        FORECAST_DEFAULT_MONTHS, FORECAST_MAX_MONTHS, FORECAST_RENEWAL_LOOKBACK_DAYS, FORECAST_RENEWAL_GRACE_DAYS,
+        FORECAST_RENEWAL_RATE_WITHOUT_HISTORY
     )
 except ImportError as e:
     print(f"ERROR CRÍTICO (finances.py): Fallo en importaciones esenciales. Error: {e}")
@@ -30,6 +47,7 @@ except ImportError as e:
 #     porque se asume que se importa de config.py ---
 
 # --- GESTIÓN DE TRANSACCIONES FINANCIERAS (INGRESOS/GASTOS PUNTUALES) ---
+@retry_on_database_locked(failure_result=DATABASE_BUSY_WRITE_RESULT)
 def record_financial_transaction(
     transaction_type: str,
     transaction_date_str: str, # Espera un str no None
@@ -65,7 +83,7 @@ def record_financial_transaction(
     conn = get_db_connection()
     if not conn: return False, "Error de conexión a BD."
     try:
-        with conn:
+        with transaction(conn):
             cursor = conn.cursor()
             # Usar trans_date_obj convertido a string para la BD
             db_date_str = convert_date_to_db_string(trans_date_obj) # Devuelve str | None
@@ -81,15 +99,18 @@ def record_financial_transaction(
                 ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
             """, (
                 internal_transaction_id, transaction_type, db_date_str,
-                clean_description, sanitize_text_input(category), str(amount_decimal), 
+                clean_description, sanitize_text_input(category), money_to_cents(amount_decimal), 
                 sanitize_text_input(payment_method, allow_empty=True),
                 related_member_db_id, recorded_by_user_id,  
                 sanitize_text_input(reference_document_number, allow_empty=True),
                 sanitize_text_input(notes, allow_empty=True),
                 1 if is_from_recurring else 0, source_recurring_id 
             ))
-            return True, internal_transaction_id
+            mark_tables_changed("financial_transactions")
+        call_after_commit(invalidate_transaction_count_cache) # Tras el commit de la unidad de trabajo
+        return True, internal_transaction_id
     except sqlite3.Error as e:
+        raise_if_database_locked(e)
         print(f"ERROR (finances.py - record_financial_transaction): {e}"); return False, "Error de BD."
     finally:
         if conn: conn.close()
@@ -97,6 +118,32 @@ def record_financial_transaction(
 # (get_financial_transactions y get_financial_summary permanecen igual que en tu código,
 #  asumiendo que internamente usan las funciones de utils y config correctamente)
 
+def _build_transaction_filters(
+    start_date_str: str | None, end_date_str: str | None, transaction_type: str | None, category: str | None,
+    table_alias: str = "ft"
+) -> tuple[list[str], list]:
+    """Condiciones y parámetros comunes a los listados y resúmenes (libro 'ft' o rollup 'fdr')."""
+    conditions, params = [], []
+    if start_date_str:
+        s_date = parse_string_to_date(start_date_str, True)
+        if s_date: conditions.append(f"{table_alias}.transaction_date >= ?"); params.append(convert_date_to_db_string(s_date))
+    if end_date_str:
+        e_date = parse_string_to_date(end_date_str, True)
+        if e_date: conditions.append(f"{table_alias}.transaction_date <= ?"); params.append(convert_date_to_db_string(e_date))
+    if transaction_type in ['income', 'expense']:
+        conditions.append(f"{table_alias}.transaction_type = ?"); params.append(transaction_type)
+    if category:
+        clean_cat = sanitize_text_input(category)
+        if clean_cat: conditions.append(f"LOWER({table_alias}.category) LIKE LOWER(?)"); params.append(f"%{clean_cat}%")
+    return conditions, params
+
+_TRANSACTIONS_SELECT_SQL = """
+    SELECT ft.*, m.full_name as member_name, su.username as recorded_by_username
+    FROM financial_transactions ft
+    LEFT JOIN members m ON ft.related_member_id = m.id
+    LEFT JOIN system_users su ON ft.recorded_by_user_id = su.id
+"""
+
 def get_financial_transactions(
     start_date_str: str | None = None,
     end_date_str: str | None = None,
@@ -104,82 +151,362 @@ def get_financial_transactions(
     category: str | None = None,
     limit: int = 100, 
     offset: int = 0
-) -> tuple[list[dict], int]:
+) -> tuple[list[Transaction], int]:
+    """
+    Listado por LIMIT/OFFSET con el total exacto. Cada página recorre las filas anteriores y recuenta
+    todo el filtro: para la GUI usar get_financial_transactions_page + count_financial_transactions.
+    """
     conn = get_db_connection()
     if not conn: return [], 0
-    conditions, params = [], []
+    conditions, params = _build_transaction_filters(start_date_str, end_date_str, transaction_type, category)
     count_query = "SELECT COUNT(ft.id) as total_count FROM financial_transactions ft"
-    data_query = """
-        SELECT ft.*, m.full_name as member_name, su.username as recorded_by_username
-        FROM financial_transactions ft
-        LEFT JOIN members m ON ft.related_member_id = m.id
-        LEFT JOIN system_users su ON ft.recorded_by_user_id = su.id
-    """
-    if start_date_str:
-        s_date = parse_string_to_date(start_date_str, True)
-        if s_date: conditions.append("ft.transaction_date >= ?"); params.append(convert_date_to_db_string(s_date))
-    if end_date_str:
-        e_date = parse_string_to_date(end_date_str, True)
-        if e_date: conditions.append("ft.transaction_date <= ?"); params.append(convert_date_to_db_string(e_date))
-    if transaction_type in ['income', 'expense']:
-        conditions.append("ft.transaction_type = ?"); params.append(transaction_type)
-    if category:
-        clean_cat = sanitize_text_input(category)
-        if clean_cat: conditions.append("LOWER(ft.category) LIKE LOWER(?)"); params.append(f"%{clean_cat}%")
+    data_query = _TRANSACTIONS_SELECT_SQL
 
     if conditions:
         where_clause = " WHERE " + " AND ".join(conditions)
         count_query += where_clause; data_query += where_clause
     data_query += " ORDER BY ft.transaction_date DESC, ft.id DESC LIMIT ? OFFSET ?"
     
-    transactions_list, total_count = [], 0
+    total_count = 0
     try:
         cursor = conn.cursor()
         cursor.execute(count_query, tuple(params)); count_result = cursor.fetchone()
         if count_result: total_count = count_result['total_count']
         cursor.execute(data_query, tuple(params + [limit, offset]))
-        for row in cursor.fetchall():
-            trans_dict = dict(row)
-            trans_dict['transaction_date_obj'] = parse_string_to_date(row['transaction_date'])
-            trans_dict['transaction_date_ui'] = format_date_for_ui(trans_dict['transaction_date_obj'])
-            trans_dict['amount_decimal'] = Decimal(str(row['amount']))
-            transactions_list.append(trans_dict)
-        return transactions_list, total_count
+        return Transaction.fetch_all(cursor), total_count
     except sqlite3.Error as e: print(f"ERROR (get_financial_transactions): {e}"); return [], 0
     finally:
         if conn: conn.close()
 
+# --- PAGINACIÓN POR CURSOR (keyset) ---
+# El cursor identifica la última (o primera) fila mostrada por su clave de orden (transaction_date, id);
+# la página siguiente se obtiene con un salto directo en el índice, sin OFFSET, así que la página 500
+# cuesta lo mismo que la 1.
+def _transaction_date_key(transaction_date: date | str) -> str:
+    """
+    Fecha de la clave de orden tal como se compara en SQL. Un valor antiguo que no es ISO llega como texto
+    desde el conversor DATE (database._convert_date) y se usa tal cual, igual que lo guarda la BD.
+    """
+    if isinstance(transaction_date, str): return transaction_date
+    return convert_date_to_db_string(transaction_date)
+
+def _encode_transactions_cursor(transaction_date: date | str, transaction_id: int) -> str:
+    """Token opaco para la GUI: base64 de [fecha ISO, id]."""
+    raw = json.dumps([_transaction_date_key(transaction_date), transaction_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+def _decode_transactions_cursor(cursor_token: str) -> tuple[str, int] | None:
+    try:
+        transaction_date, transaction_id = json.loads(base64.urlsafe_b64decode(cursor_token.encode("ascii")))
+        return str(transaction_date), int(transaction_id)
+    except (ValueError, TypeError, UnicodeError):
+        return None
+
+def get_financial_transactions_page(
+    start_date_str: str | None = None,
+    end_date_str: str | None = None,
+    transaction_type: str | None = None,
+    category: str | None = None,
+    page_size: int = FINANCE_TRANSACTIONS_PAGE_SIZE,
+    cursor_token: str | None = None,
+    direction: str = "next"
+) -> dict:
+    """
+    Una página de transacciones (más recientes primero) a partir de un cursor.
+    - cursor_token=None: primera página.
+    - direction="next" con el 'next_cursor' de una página: la página siguiente (más antigua).
+    - direction="prev" con el 'prev_cursor' de una página: la página anterior (más reciente).
+    Devuelve {"transactions": [...], "next_cursor": str | None, "prev_cursor": str | None}.
+    Un cursor a None indica que no hay más páginas en esa dirección.
+    """
+    empty_page = {"transactions": [], "next_cursor": None, "prev_cursor": None}
+    conn = get_db_connection()
+    if not conn: return empty_page
+
+    conditions, params = _build_transaction_filters(start_date_str, end_date_str, transaction_type, category)
+    cursor_position = _decode_transactions_cursor(cursor_token) if cursor_token else None
+    going_back = direction == "prev" and cursor_position is not None
+    if cursor_position:
+        conditions.append("(ft.transaction_date, ft.id) > (?, ?)" if going_back else "(ft.transaction_date, ft.id) < (?, ?)")
+        params.extend(cursor_position)
+
+    data_query = _TRANSACTIONS_SELECT_SQL
+    if conditions:
+        data_query += " WHERE " + " AND ".join(conditions)
+    # Hacia atrás se lee en orden ascendente desde el cursor y luego se invierte.
+    data_query += (" ORDER BY ft.transaction_date ASC, ft.id ASC" if going_back
+                   else " ORDER BY ft.transaction_date DESC, ft.id DESC")
+    data_query += " LIMIT ?"
+
+    try:
+        cursor = conn.cursor()
+        # Una fila extra para saber si hay más páginas sin contar.
+        transactions_list = Transaction.fetch_all(cursor.execute(data_query, tuple(params + [page_size + 1])))
+        has_more_in_direction = len(transactions_list) > page_size
+        del transactions_list[page_size:]
+        if going_back:
+            transactions_list.reverse()
+        if not transactions_list:
+            return empty_page
+
+        first_row, last_row = transactions_list[0], transactions_list[-1]
+        first_cursor = _encode_transactions_cursor(first_row['transaction_date'], first_row['id'])
+        last_cursor = _encode_transactions_cursor(last_row['transaction_date'], last_row['id'])
+        if going_back:
+            has_newer, has_older = has_more_in_direction, True
+        else:
+            has_newer, has_older = cursor_position is not None, has_more_in_direction
+        return {
+            "transactions": transactions_list,
+            "next_cursor": last_cursor if has_older else None,
+            "prev_cursor": first_cursor if has_newer else None,
+        }
+    except sqlite3.Error as e:
+        print(f"ERROR (finances.py - get_financial_transactions_page): {e}")
+        return empty_page
+    finally:
+        if conn: conn.close()
+
+def get_financial_transactions_window(
+    start_date_str: str | None = None,
+    end_date_str: str | None = None,
+    transaction_type: str | None = None,
+    category: str | None = None,
+    offset: int = 0,
+    limit: int = FINANCE_TRANSACTIONS_PAGE_SIZE,
+    after_position: tuple[date | str, int] | None = None
+) -> list[Transaction]:
+    """
+    Filas offset..offset+limit-1 del filtro (más recientes primero), para las listas virtuales de la GUI.
+    Si se conoce la fila justo anterior a la ventana, after_position=(transaction_date, id) de esa fila
+    salta directo en el índice como los cursores; el OFFSET solo se recorre al arrastrar la barra.
+    """
+    conn = get_db_connection()
+    if not conn: return []
+
+    conditions, params = _build_transaction_filters(start_date_str, end_date_str, transaction_type, category, table_alias="w")
+    if after_position:
+        conditions.append("(w.transaction_date, w.id) < (?, ?)")
+        params.extend([_transaction_date_key(after_position[0]), after_position[1]])
+    # Los id de la ventana salen del índice (transaction_date, id); los JOIN solo se hacen para esas filas.
+    window_query = "SELECT w.id FROM financial_transactions w"
+    if conditions:
+        window_query += " WHERE " + " AND ".join(conditions)
+    window_query += " ORDER BY w.transaction_date DESC, w.id DESC LIMIT ? OFFSET ?"
+    data_query = (_TRANSACTIONS_SELECT_SQL + f" WHERE ft.id IN ({window_query})"
+                  " ORDER BY ft.transaction_date DESC, ft.id DESC")
+    try:
+        cursor = conn.execute(data_query, tuple(params + [limit, 0 if after_position else offset]))
+        return Transaction.fetch_all(cursor)
+    except sqlite3.Error as e:
+        if not is_interrupted_error(e): # La GUI la interrumpe al cambiar de filtro o de posición
+            print(f"ERROR (finances.py - get_financial_transactions_window): {e}")
+        return []
+    finally:
+        if conn: conn.close()
+
+# Totales por filtro: contar un filtro amplio recorre todo el índice, así que se guarda el resultado
+# durante FINANCE_TRANSACTION_COUNT_CACHE_TTL_SECONDS y se descarta al registrar movimientos desde este PC.
+_transaction_count_cache: dict[tuple, tuple[float, int]] = {}
+_transaction_count_cache_lock = threading.Lock()
+
+def invalidate_transaction_count_cache():
+    with _transaction_count_cache_lock:
+        _transaction_count_cache.clear()
+
+def count_financial_transactions(
+    start_date_str: str | None = None,
+    end_date_str: str | None = None,
+    transaction_type: str | None = None,
+    category: str | None = None,
+    force_refresh: bool = False
+) -> int:
+    """Total de transacciones del filtro (cacheado; puede ir unos segundos por detrás de otros PCs)."""
+    cache_key = (start_date_str, end_date_str, transaction_type, category)
+    now = time.monotonic()
+    if not force_refresh:
+        with _transaction_count_cache_lock:
+            cached = _transaction_count_cache.get(cache_key)
+        if cached and now - cached[0] < FINANCE_TRANSACTION_COUNT_CACHE_TTL_SECONDS:
+            return cached[1]
+
+    conn = get_db_connection()
+    if not conn: return 0
+    conditions, params = _build_transaction_filters(start_date_str, end_date_str, transaction_type, category)
+    count_query = "SELECT COUNT(*) FROM financial_transactions ft"
+    if conditions:
+        count_query += " WHERE " + " AND ".join(conditions)
+    try:
+        total_count = conn.execute(count_query, tuple(params)).fetchone()[0]
+        with _transaction_count_cache_lock:
+            _transaction_count_cache[cache_key] = (now, total_count)
+        return total_count
+    except sqlite3.Error as e:
+        print(f"ERROR (finances.py - count_financial_transactions): {e}")
+        return 0
+    finally:
+        if conn: conn.close()
+
+# --- RESÚMENES AGRUPADOS ---
+# Dimensión -> (expresión GROUP BY, [(columna de salida, expresión SELECT), ...]); {t} es el alias de la tabla.
+# Las semanas se identifican por la fecha de su lunes (AAAA-MM-DD), que ordena bien y sirve de etiqueta.
+SUMMARY_GROUP_DIMENSIONS = {
+    "day": ("{t}.transaction_date", [("day", "{t}.transaction_date")]),
+    "week": ("date({t}.transaction_date, '-6 days', 'weekday 1')", [("week", "date({t}.transaction_date, '-6 days', 'weekday 1')")]),
+    "month": ("substr({t}.transaction_date, 1, 7)", [("month", "substr({t}.transaction_date, 1, 7)")]),
+    "year": ("substr({t}.transaction_date, 1, 4)", [("year", "substr({t}.transaction_date, 1, 4)")]),
+    "category": ("{t}.category", [("category", "{t}.category")]),
+    "payment_method": ("{t}.payment_method", [("payment_method", "{t}.payment_method")]),
+    "member": ("{t}.related_member_id", [("member_internal_id", "m.internal_member_id"), ("member_name", "m.full_name")]),
+}
+SUMMARY_TOTAL_COLUMNS = ("total_income", "total_expense", "net_balance", "transaction_count")
+# Dimensiones que se pueden responder desde financial_daily_rollup (el socio solo está en el libro).
+# Allí los NULL se guardan como '' y se devuelven de nuevo como None.
+ROLLUP_GROUP_DIMENSIONS = {"day", "week", "month", "year", "category", "payment_method"}
+_ROLLUP_SELECT_OVERRIDES = {"category": "NULLIF({t}.category, '')", "payment_method": "NULLIF({t}.payment_method, '')"}
+
+def _empty_grouped_summary(output_columns: list[str]) -> dict[str, list]:
+    return {column: [] for column in output_columns}
+
+@cached_query("financial_transactions", "members") # Agrupando por socio, su nombre sale de members
+def get_financial_summary_grouped(
+    group_by: list[str] | tuple[str, ...] = (),
+    start_date_str: str | None = None,
+    end_date_str: str | None = None,
+    transaction_type: str | None = None,
+    category: str | None = None,
+    from_ledger: bool = False
+) -> dict[str, list]:
+    """
+    Ingresos, gastos, balance y nº de transacciones agrupados por cualquier combinación de
+    SUMMARY_GROUP_DIMENSIONS (p. ej. ["month", "category"]), en un único recorrido con agregación condicional.
+    Resultado en columnas: {"month": [...], "category": [...], "total_income": [Decimal, ...], ...};
+    la fila i es el valor i de cada lista. Sin group_by hay una sola fila con los totales del filtro.
+    Se lee de financial_daily_rollup salvo si se agrupa por socio o from_ledger=True (libro completo).
+    """
+    group_by = list(dict.fromkeys(group_by)) # Sin duplicados, conservando el orden
+    unknown_dimensions = [dimension for dimension in group_by if dimension not in SUMMARY_GROUP_DIMENSIONS]
+    output_columns = [column for dimension in group_by if dimension in SUMMARY_GROUP_DIMENSIONS
+                      for column, _ in SUMMARY_GROUP_DIMENSIONS[dimension][1]] + list(SUMMARY_TOTAL_COLUMNS)
+    if unknown_dimensions:
+        print(f"ERROR (finances.py - get_financial_summary_grouped): Dimensiones no válidas: {', '.join(unknown_dimensions)}")
+        return _empty_grouped_summary(output_columns)
+
+    conn = get_db_connection()
+    if not conn: skip_result_caching(); return _empty_grouped_summary(output_columns)
+
+    # El rollup tiene las mismas columnas de clave que el libro, así que filtros y agrupaciones son los mismos.
+    use_rollup = not from_ledger and ROLLUP_GROUP_DIMENSIONS.issuperset(group_by)
+    if use_rollup:
+        t, source_table, amount_column, count_expression = "fdr", "financial_daily_rollup", "fdr.amount_total", "SUM(fdr.transaction_count)"
+    else:
+        t, source_table, amount_column, count_expression = "ft", "financial_transactions", "ft.amount", "COUNT(*)"
+    select_parts = [f"{(_ROLLUP_SELECT_OVERRIDES.get(column, expression) if use_rollup else expression).format(t=t)} AS {column}"
+                    for dimension in group_by for column, expression in SUMMARY_GROUP_DIMENSIONS[dimension][1]]
+    select_parts += [
+        # Sumas enteras de céntimos (exactas); el alias [MONEY_CENTS] las devuelve como Decimal.
+        f"IFNULL(SUM(CASE WHEN {t}.transaction_type = 'income' THEN {amount_column} END), 0) AS \"total_income [{MONEY_SQL_TYPE}]\"",
+        f"IFNULL(SUM(CASE WHEN {t}.transaction_type = 'expense' THEN {amount_column} END), 0) AS \"total_expense [{MONEY_SQL_TYPE}]\"",
+        f"IFNULL({count_expression}, 0) AS transaction_count",
+    ]
+    query = f"SELECT {', '.join(select_parts)} FROM {source_table} {t}"
+    if "member" in group_by:
+        query += f" LEFT JOIN members m ON {t}.related_member_id = m.id"
+    conditions, params = _build_transaction_filters(start_date_str, end_date_str, transaction_type, category, table_alias=t)
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    if group_by:
+        group_expressions = ", ".join(SUMMARY_GROUP_DIMENSIONS[dimension][0].format(t=t) for dimension in group_by)
+        query += f" GROUP BY {group_expressions} ORDER BY {group_expressions}"
+
+    summary_columns = _empty_grouped_summary(output_columns)
+    try:
+        for row in conn.execute(query, tuple(params)):
+            for dimension in group_by:
+                for column, _ in SUMMARY_GROUP_DIMENSIONS[dimension][1]:
+                    summary_columns[column].append(row[column])
+            summary_columns["total_income"].append(row['total_income'])
+            summary_columns["total_expense"].append(row['total_expense'])
+            summary_columns["net_balance"].append(row['total_income'] - row['total_expense'])
+            summary_columns["transaction_count"].append(row['transaction_count'])
+        return summary_columns
+    except sqlite3.Error as e:
+        print(f"ERROR (finances.py - get_financial_summary_grouped): {e}")
+        skip_result_caching()
+        return _empty_grouped_summary(output_columns)
+    finally:
+        if conn: conn.close()
+
 def get_financial_summary(
     start_date_str: str | None = None,
     end_date_str: str | None = None
 ) -> dict:
-    # ... (código como el tuyo) ...
+    """Totales de ingresos, gastos y balance del periodo (desde financial_daily_rollup)."""
+    totals = get_financial_summary_grouped(start_date_str=start_date_str, end_date_str=end_date_str)
+    if not totals["transaction_count"]:
+        return {"total_income": Decimal('0'), "total_expense": Decimal('0'), "net_balance": Decimal('0')}
+    return {"total_income": totals["total_income"][0], "total_expense": totals["total_expense"][0],
+            "net_balance": totals["net_balance"][0]}
+
+
+# --- MANTENIMIENTO DE financial_daily_rollup ---
+@retry_on_database_locked(failure_result=DATABASE_BUSY_WRITE_RESULT)
+def rebuild_financial_daily_rollup() -> tuple[bool, str]:
+    """Recalcula los totales diarios desde el libro de transacciones (p. ej. tras detectar diferencias)."""
     conn = get_db_connection()
-    if not conn: return {"total_income": Decimal('0'), "total_expense": Decimal('0'), "net_balance": Decimal('0')}
-    base_query = "SELECT SUM(amount) FROM financial_transactions WHERE transaction_type = ?"
-    conditions, params_suffix = [], []
-    if start_date_str:
-        s_date = parse_string_to_date(start_date_str, True)
-        if s_date: conditions.append("transaction_date >= ?"); params_suffix.append(convert_date_to_db_string(s_date))
-    if end_date_str:
-        e_date = parse_string_to_date(end_date_str, True)
-        if e_date: conditions.append("transaction_date <= ?"); params_suffix.append(convert_date_to_db_string(e_date))
-    query_suffix_str = " AND " + " AND ".join(conditions) if conditions else ""
-    
-    total_income, total_expense = Decimal('0'), Decimal('0')
+    if not conn: return False, "Error de conexión a BD."
     try:
-        cursor = conn.cursor()
-        cursor.execute(base_query + query_suffix_str, tuple(['income'] + params_suffix))
-        result = cursor.fetchone(); total_income = Decimal(str(result[0])) if result and result[0] is not None else Decimal('0')
-        cursor.execute(base_query + query_suffix_str, tuple(['expense'] + params_suffix))
-        result = cursor.fetchone(); total_expense = Decimal(str(result[0])) if result and result[0] is not None else Decimal('0')
-        return {"total_income": total_income, "total_expense": total_expense, "net_balance": total_income - total_expense}
-    except sqlite3.Error as e: print(f"ERROR (get_financial_summary): {e}"); return {"total_income":Decimal('0'), "total_expense":Decimal('0'), "net_balance":Decimal('0')}
+        with transaction(conn):
+            fill_financial_daily_rollup(conn)
+            mark_tables_changed("financial_transactions")
+            rollup_rows = conn.execute("SELECT COUNT(*) FROM financial_daily_rollup").fetchone()[0]
+        return True, f"Totales diarios reconstruidos ({rollup_rows} filas)."
+    except sqlite3.Error as e:
+        raise_if_database_locked(e)
+        print(f"ERROR (finances.py - rebuild_financial_daily_rollup): {e}"); return False, "Error de BD."
+    finally:
+        if conn: conn.close()
+
+def verify_financial_daily_rollup() -> list[dict]:
+    """
+    Compara financial_daily_rollup con el libro de transacciones y devuelve las claves que no cuadran:
+    [{"transaction_date", "transaction_type", "category", "payment_method",
+      "rollup_amount", "ledger_amount", "rollup_count", "ledger_count"}, ...]. Lista vacía si todo cuadra.
+    """
+    conn = get_db_connection()
+    if not conn: return []
+    # FULL OUTER JOIN simulado: claves del libro contra el rollup y claves que solo están en el rollup.
+    query = f"""
+        WITH ledger AS (
+            SELECT transaction_date, transaction_type, IFNULL(category, '') AS category, IFNULL(payment_method, '') AS payment_method,
+                   SUM(amount) AS amount_total, COUNT(*) AS transaction_count
+            FROM financial_transactions
+            GROUP BY transaction_date, transaction_type, IFNULL(category, ''), IFNULL(payment_method, '')
+        )
+        SELECT l.transaction_date, l.transaction_type, l.category, l.payment_method,
+               r.amount_total AS "rollup_amount [{MONEY_SQL_TYPE}]", l.amount_total AS "ledger_amount [{MONEY_SQL_TYPE}]",
+               IFNULL(r.transaction_count, 0) AS rollup_count, l.transaction_count AS ledger_count
+        FROM ledger l
+        LEFT JOIN financial_daily_rollup r USING (transaction_date, transaction_type, category, payment_method)
+        WHERE r.transaction_count IS NULL OR r.transaction_count != l.transaction_count OR r.amount_total != l.amount_total
+        UNION ALL
+        SELECT r.transaction_date, r.transaction_type, r.category, r.payment_method,
+               r.amount_total, NULL, r.transaction_count, 0
+        FROM financial_daily_rollup r
+        WHERE NOT EXISTS (SELECT 1 FROM ledger l WHERE l.transaction_date = r.transaction_date AND l.transaction_type = r.transaction_type
+                          AND l.category = r.category AND l.payment_method = r.payment_method)
+        ORDER BY 1, 2, 3, 4
+    """
+    try:
+        return [dict(row) for row in conn.execute(query)]
+    except sqlite3.Error as e:
+        print(f"ERROR (finances.py - verify_financial_daily_rollup): {e}"); return []
     finally:
         if conn: conn.close()
 
 
 # --- GESTIÓN DE ÍTEMS FINANCIEROS RECURRENTES ---
+@retry_on_database_locked(failure_result=DATABASE_BUSY_WRITE_RESULT)
 def add_recurring_financial_item(
     item_type: str, description: str, default_amount_str: str, category: str,
     frequency: str, start_date_str: str, day_of_month: int | None = None, 
@@ -199,26 +526,30 @@ def add_recurring_financial_item(
     start_date_obj = parse_string_to_date(start_date_str, True)
     if not start_date_obj: return False, "Fecha de inicio no válida."
     end_date_obj = parse_string_to_date(end_date_str, True) if end_date_str else None
-    next_due_date_obj = _calculate_next_due_date_for_recurring(start_date_obj, frequency, day_of_month, day_of_week, start_date_obj)
+    next_due_date_obj = first_occurrence_on_or_after(frequency, start_date_obj, start_date_obj, day_of_month, day_of_week)
     if not next_due_date_obj: return False, "No se pudo calcular la próxima fecha de vencimiento."
     related_member_db_id = None # Placeholder
     conn = get_db_connection(); 
     if not conn: return False, "Error de conexión a BD."
     try:
-        with conn:
+        with transaction(conn):
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT INTO recurring_financial_items (item_type, description, default_amount, category, frequency,
                     day_of_month_to_process, day_of_week_to_process, start_date, end_date, next_due_date, 
                     is_active, auto_generate_transaction, related_member_id, notes, created_at, updated_at
                 ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)""",
-                (item_type, clean_description, str(default_amount), sanitize_text_input(category), frequency,
+                (item_type, clean_description, money_to_cents(default_amount), sanitize_text_input(category), frequency,
                 day_of_month, day_of_week, convert_date_to_db_string(start_date_obj),
                 convert_date_to_db_string(end_date_obj) if end_date_obj else None,
                 convert_date_to_db_string(next_due_date_obj), 1 if is_active else 0, 
                 1 if auto_generate else 0, related_member_db_id, sanitize_text_input(notes, True)))
+            mark_tables_changed("recurring_financial_items")
             return True, str(cursor.lastrowid)
-    except sqlite3.Error as e: print(f"ERROR (add_recurring_financial_item): {e}"); return False, "Error BD."
+    except sqlite3.Error as e:
+        raise_if_database_locked(e)
+        print(f"ERROR (add_recurring_financial_item): {e}")
+        return False, "Error BD."
     finally:
         if conn: conn.close()
 
@@ -227,87 +558,44 @@ def _calculate_next_due_date_for_recurring(
     base_date: date, frequency: str, day_of_month_setting: int | None = None,
     day_of_week_setting: int | None = None, actual_start_date_of_item: date | None = None
 ) -> date | None:
-    # (Código como el tuyo, pero VALID_FREQUENCIES no se usa aquí, solo 'frequency' string)
-    today = date.today()
-    if not actual_start_date_of_item: actual_start_date_of_item = base_date
-    next_occurrence = None
-    # ... (la lógica compleja de cálculo de fechas como la tenías, necesita revisión exhaustiva)
-    # Simplificación para la corrección, la lógica interna de esta función no es la causa directa de los errores de Pylance que estamos tratando.
-    # Asegúrate de que, sin importar la lógica, devuelva un 'date | None'.
-    # Lo importante es que si frequency no es reconocida, maneje el caso o devuelva None.
-    if frequency == 'daily': next_occurrence = base_date + timedelta(days=1)
-    elif frequency == 'monthly': # Ejemplo muy simplificado
-        year, month = base_date.year, base_date.month + 1
-        if month > 12: month = 1; year += 1
-        day = day_of_month_setting if day_of_month_setting and 1 <= day_of_month_setting <= 28 else 1 # Super simplificado
-        try: next_occurrence = date(year, month, day)
-        except ValueError: # ej. dia 30 en Feb
-             last_day_of_prev_month = date(year,month,1)-timedelta(days=1)
-             next_occurrence = last_day_of_prev_month # No es ideal pero evita error
-    # ... (otras frecuencias)
-    else: # Frecuencia no manejada
-        print(f"ADVERTENCIA (finances.py): Frecuencia '{frequency}' no manejada en _calculate_next_due_date.")
-        return base_date + timedelta(days=30) # Fallback muy simple
-
-    # Post-procesamiento para asegurar que es futura y después del inicio real
-    if next_occurrence and next_occurrence < actual_start_date_of_item:
-        # Si la calculada es antes del inicio del item, intentar recalcular desde el inicio del item
-        return _calculate_next_due_date_for_recurring(actual_start_date_of_item, frequency, day_of_month_setting, day_of_week_setting, actual_start_date_of_item)
-    
-    # Si next_occurrence sigue siendo menor o igual a base_date (y base_date no es futura), forzar avance
-    if next_occurrence and next_occurrence <= base_date:
-         # Este es un parche simple, la lógica recursiva anterior es mejor pero más compleja de acertar.
-        if frequency == 'daily': next_occurrence = base_date + timedelta(days=1)
-        # ... necesitaría más lógica para otras frecuencias para realmente "saltar" un periodo ...
-        # La llamada recursiva es la forma más elegante si la condición de terminación es correcta.
-        # Para ahora, con el cambio de `base_date` al calcular, esto podría no ser necesario siempre.
-        # print(f"WARN: next_occurrence {next_occurrence} <= base_date {base_date} for {frequency}. Forcing advance or re-evaluating.")
-
-
-    return next_occurrence
+    """
+    Siguiente vencimiento posterior a base_date según el calendario del ítem (core_logic.recurrence),
+    anclado a su fecha de inicio. None si la frecuencia no es válida.
+    """
+    return next_occurrence_after(
+        frequency, actual_start_date_of_item or base_date, base_date, day_of_month_setting, day_of_week_setting
+    )
 
 
-def get_pending_recurring_items_to_process(as_of_date_obj: date | None = None) -> list[dict]:
+def get_pending_recurring_items_to_process(as_of_date_obj: date | None = None) -> list[RecurringItem]:
     # (Código como el tuyo)
     if as_of_date_obj is None: as_of_date_obj = date.today()
     conn = get_db_connection();
     if not conn: return []
-    items_list = []
     try:
         cursor = conn.cursor()
         cursor.execute("""SELECT * FROM recurring_financial_items WHERE is_active = 1 AND next_due_date <= ? 
                           AND (end_date IS NULL OR end_date >= ?) ORDER BY next_due_date ASC, id ASC""",
                        (convert_date_to_db_string(as_of_date_obj), convert_date_to_db_string(as_of_date_obj)))
-        for row in cursor.fetchall():
-            item_dict = dict(row)
-            item_dict['default_amount_decimal'] = Decimal(str(row['default_amount']))
-            item_dict['start_date_obj'] = parse_string_to_date(row['start_date'])
-            item_dict['next_due_date_obj'] = parse_string_to_date(row['next_due_date'])
-            item_dict['end_date_obj'] = parse_string_to_date(row['end_date']) if row['end_date'] else None
-            items_list.append(item_dict)
-        return items_list
+        return RecurringItem.fetch_all(cursor)
     except sqlite3.Error as e: print(f"ERROR (get_pending_recurring_items_to_process): {e}"); return []
     finally:
         if conn: conn.close()
 
 
+@retry_on_database_locked(failure_result=DATABASE_BUSY_WRITE_RESULT)
 def process_single_recurring_item(item_id: int, recorded_by_user_id: int | None) -> tuple[bool, str]:
     conn = get_db_connection()
     if not conn: return False, "Error de conexión a BD."
     try:
-        with conn:
+        with transaction(conn):
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM recurring_financial_items WHERE id = ?", (item_id,))
-            item_data = cursor.fetchone()
-            if not item_data: return False, f"Ítem recurrente ID {item_id} no encontrado."
-            if not item_data['is_active']: return False, f"Ítem recurrente {item_id} no activo."
-
-            item_dict = dict(item_data)
-            item_dict['default_amount_decimal'] = Decimal(str(item_data['default_amount']))
-            item_dict['start_date_obj'] = parse_string_to_date(item_data['start_date'])
-            item_dict['next_due_date_obj'] = parse_string_to_date(item_data['next_due_date']) # Será el transaction_date
+            item_dict = RecurringItem.fetch_one(cursor)
+            if not item_dict: return False, f"Ítem recurrente ID {item_id} no encontrado."
+            if not item_dict['is_active']: return False, f"Ítem recurrente {item_id} no activo."
 
-            transaction_date_obj_for_record = item_dict['next_due_date_obj']
+            transaction_date_obj_for_record = item_dict['next_due_date_obj'] # Será el transaction_date
             if not transaction_date_obj_for_record:
                  return False, f"Fecha de vencimiento inválida para ítem {item_id}."
 
@@ -342,17 +630,117 @@ def process_single_recurring_item(item_id: int, recorded_by_user_id: int | None)
                 "UPDATE recurring_financial_items SET next_due_date = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
                 (convert_date_to_db_string(new_next_due_obj), item_id)
             )
+            mark_tables_changed("recurring_financial_items")
             return True, f"Ítem {item_id} procesado. Transacción: {msg_trn_id}. Próx. venc.: {format_date_for_ui(new_next_due_obj)}."
     except sqlite3.Error as e:
+        raise_if_database_locked(e)
         print(f"ERROR (finances.py - process_single_recurring_item): {e}"); return False, f"Error BD procesando {item_id}."
     finally:
         if conn: conn.close()
 
-def get_all_recurring_items() -> list[dict]:
+# --- PROCESO POR LOTES DE ÍTEMS RECURRENTES (puesta al día) ---
+# Una sola transacción para todos los ítems vencidos: se generan TODOS los periodos atrasados de cada
+# ítem (no solo uno), se insertan con executemany y next_due_date avanza una sola vez por ítem.
+# Cada inserción comprueba que no exista ya la transacción de ese ítem para esa fecha, así que repetir
+# el proceso (o lanzarlo a la vez desde dos equipos) no duplica movimientos.
+_INSERT_RECURRING_OCCURRENCE_SQL = """
+    INSERT INTO financial_transactions (
+        internal_transaction_id, transaction_type, transaction_date, description, category,
+        amount, payment_method, related_member_id, recorded_by_user_id,
+        reference_document_number, notes, is_recurring_source, source_recurring_id,
+        created_at, updated_at
+    )
+    SELECT ?, ?, ?, ?, ?, ?, NULL, ?, ?, NULL, NULL, 1, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
+    WHERE NOT EXISTS (
+        SELECT 1 FROM financial_transactions WHERE source_recurring_id = ? AND transaction_date = ?
+    )
+"""
+
+def _expand_due_occurrences(item: RecurringItem, as_of_date_obj: date) -> tuple[list[date], date | None]:
+    """
+    Fechas vencidas del ítem hasta as_of_date_obj (y su end_date) y la next_due_date resultante.
+    Devuelve ([], None) si no se pudo calcular la siguiente fecha.
+    """
+    schedule = get_recurrence_schedule(
+        item.frequency, item.start_date, item.day_of_month_to_process, item.day_of_week_to_process)
+    due_date = item.next_due_date
+    if not schedule or not due_date:
+        return [], None
+    last_date = min(as_of_date_obj, item.end_date) if item.end_date else as_of_date_obj
+    if due_date > last_date:
+        return [], due_date
+    # next_due_date puede haberse fijado a mano fuera del calendario: se respeta y después se sigue el calendario.
+    occurrences = [due_date]
+    occurrences += schedule.between(due_date + timedelta(days=1), last_date)
+    del occurrences[RECURRING_CATCH_UP_MAX_OCCURRENCES_PER_ITEM:]
+    return occurrences, schedule.next_after(occurrences[-1])
+
+@retry_on_database_locked(failure_result=DATABASE_BUSY_WRITE_RESULT)
+def process_due_recurring_items(
+    as_of_date_obj: date | None = None, recorded_by_user_id: int | None = None
+) -> tuple[bool, str]:
+    """
+    Pone al día todos los ítems recurrentes activos vencidos a as_of_date_obj (hoy por defecto):
+    una transacción por cada periodo atrasado y next_due_date al primer periodo aún no vencido.
+    Los ítems muy atrasados se completan en varias pasadas (RECURRING_CATCH_UP_MAX_OCCURRENCES_PER_ITEM).
+    Devuelve (éxito, mensaje con el número de transacciones generadas e ítems actualizados).
+    """
+    if as_of_date_obj is None: as_of_date_obj = date.today()
+    conn = get_db_connection()
+    if not conn: return False, "Error de conexión a BD."
+    as_of_db_str = convert_date_to_db_string(as_of_date_obj)
+    try:
+        with transaction(conn):
+            # Se leen dentro de la transacción: otro equipo puede haberlos procesado mientras esperábamos.
+            cursor = conn.cursor()
+            cursor.execute("""SELECT * FROM recurring_financial_items WHERE is_active = 1 AND next_due_date <= ?
+                              AND (end_date IS NULL OR end_date >= ?) ORDER BY next_due_date ASC, id ASC""",
+                           (as_of_db_str, as_of_db_str))
+            due_items = RecurringItem.fetch_all(cursor)
+            occurrence_rows, next_due_updates, failed_item_ids = [], [], []
+            for item in due_items:
+                item_id = item.id
+                occurrences, new_next_due_date = _expand_due_occurrences(item, as_of_date_obj)
+                if not new_next_due_date:
+                    failed_item_ids.append(item_id); continue
+                item_type, category, amount_cents, member_id = item.item_type, item.category, money_to_cents(item.default_amount), item.related_member_id
+                internal_ids = generate_internal_ids("TRN" if item_type == 'income' else "EXP", len(occurrences))
+                description = f"(Recurrente) {item.description}"
+                occurrence_rows.extend(
+                    (internal_id, item_type, due_date, description, category,
+                     amount_cents, member_id, recorded_by_user_id, item_id, item_id, due_date)
+                    for internal_id, due_date in zip(internal_ids, occurrences)
+                )
+                next_due_updates.append((new_next_due_date, item_id, item.next_due_date))
+
+            # En orden de fecha: los índices que empiezan por transaction_date y los totales diarios
+            # se actualizan en páginas contiguas en lugar de saltar por todo el árbol en cada fila.
+            occurrence_rows.sort(key=lambda row: (row[2], row[1], row[4]))
+            cursor.executemany(_INSERT_RECURRING_OCCURRENCE_SQL, occurrence_rows)
+            generated_count = cursor.rowcount if occurrence_rows else 0
+            # Solo avanza si nadie la ha movido desde que se leyó (misma transacción: es una red de seguridad).
+            cursor.executemany(
+                "UPDATE recurring_financial_items SET next_due_date = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ? AND next_due_date = ?",
+                next_due_updates
+            )
+            mark_tables_changed("financial_transactions", "recurring_financial_items")
+        if generated_count:
+            call_after_commit(invalidate_transaction_count_cache)
+        message = f"{generated_count} transacción(es) generada(s) para {len(next_due_updates)} ítem(s) recurrente(s)."
+        if failed_item_ids:
+            message += f" Sin procesar (fecha de vencimiento no calculable): {', '.join(str(i) for i in failed_item_ids)}."
+        return True, message
+    except sqlite3.Error as e:
+        raise_if_database_locked(e)
+        print(f"ERROR (finances.py - process_due_recurring_items): {e}"); return False, "Error de BD procesando ítems recurrentes."
+    finally:
+        if conn: conn.close()
+
+@cached_query("recurring_financial_items")
+def get_all_recurring_items() -> list[RecurringItem]:
     """Obtiene todos los ítems financieros recurrentes definidos."""
     conn = get_db_connection()
-    if not conn: return []
-    items_list = []
+    if not conn: skip_result_caching(); return []
     try:
         cursor = conn.cursor()
         cursor.execute("""
@@ -360,43 +748,29 @@ def get_all_recurring_items() -> list[dict]:
             FROM recurring_financial_items rfi
             ORDER BY rfi.item_type, rfi.description
         """) # Podrías añadir JOIN con members si related_member_id se usa
-        for row in cursor.fetchall():
-            item_dict = dict(row)
-            # Convertir campos a tipos más usables si es necesario (como hicimos en get_pending)
-            item_dict['default_amount_decimal'] = Decimal(str(row['default_amount']))
-            item_dict['start_date_obj'] = parse_string_to_date(row['start_date'])
-            item_dict['next_due_date_obj'] = parse_string_to_date(row['next_due_date'])
-            item_dict['end_date_obj'] = parse_string_to_date(row['end_date']) if row['end_date'] else None
-            items_list.append(item_dict)
-        return items_list
+        return RecurringItem.fetch_all(cursor) # *_obj y default_amount_decimal: campos derivados del registro
     except sqlite3.Error as e:
         print(f"ERROR (finances.py - get_all_recurring_items): {e}")
+        skip_result_caching()
         return []
     finally:
         if conn: conn.close()
 
-def get_recurring_item_by_id(item_id: int) -> dict | None:
+def get_recurring_item_by_id(item_id: int) -> RecurringItem | None:
     """Obtiene un ítem financiero recurrente por su ID de base de datos."""
     conn = get_db_connection()
     if not conn: return None
     try:
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM recurring_financial_items WHERE id = ?", (item_id,))
-        row = cursor.fetchone()
-        if row:
-            item_dict = dict(row)
-            item_dict['default_amount_decimal'] = Decimal(str(row['default_amount']))
-            item_dict['start_date_obj'] = parse_string_to_date(row['start_date'])
-            item_dict['next_due_date_obj'] = parse_string_to_date(row['next_due_date'])
-            item_dict['end_date_obj'] = parse_string_to_date(row['end_date']) if row['end_date'] else None
-            return item_dict
-        return None
+        return RecurringItem.fetch_one(cursor)
     except sqlite3.Error as e:
         print(f"ERROR (finances.py - get_recurring_item_by_id): {e}")
         return None
     finally:
         if conn: conn.close()
 
+@retry_on_database_locked(failure_result=DATABASE_BUSY_WRITE_RESULT)
 def update_recurring_item(
     item_id: int,
     item_type: str, description: str, default_amount_str: str, category: str,
@@ -444,7 +818,7 @@ def update_recurring_item(
             # Si cambió algo que afecta la recurrencia, recalcular next_due_date
             # Aquí base_date para recalcular debería ser la fecha de inicio del ítem
             # o una fecha de referencia, no necesariamente today.
-            next_due_date_to_set_obj = _calculate_next_due_date_for_recurring(start_date_obj, frequency, day_of_month, day_of_week, start_date_obj)
+            next_due_date_to_set_obj = first_occurrence_on_or_after(frequency, start_date_obj, start_date_obj, day_of_month, day_of_week)
             if not next_due_date_to_set_obj: return False, "No se pudo recalcular la próxima fecha de vencimiento."
         else:
             next_due_date_to_set_obj = current_item['next_due_date_obj'] # Mantener la existente
@@ -454,7 +828,7 @@ def update_recurring_item(
     conn = get_db_connection()
     if not conn: return False, "Error de conexión."
     try:
-        with conn:
+        with transaction(conn):
             cursor = conn.cursor()
             cursor.execute("""
                 UPDATE recurring_financial_items SET
@@ -465,7 +839,7 @@ def update_recurring_item(
                     notes = ?, updated_at = CURRENT_TIMESTAMP
                 WHERE id = ?
             """, (
-                item_type, sanitize_text_input(description), str(default_amount), sanitize_text_input(category), frequency,
+                item_type, sanitize_text_input(description), money_to_cents(default_amount), sanitize_text_input(category), frequency,
                 day_of_month, day_of_week,
                 convert_date_to_db_string(start_date_obj),
                 convert_date_to_db_string(end_date_obj) if end_date_obj else None,
@@ -474,36 +848,206 @@ def update_recurring_item(
                 related_member_db_id, sanitize_text_input(notes, True),
                 item_id
             ))
+            mark_tables_changed("recurring_financial_items")
             if cursor.rowcount == 0:
                 return False, "Ítem recurrente no encontrado para actualizar o sin cambios."
             return True, "Ítem recurrente actualizado exitosamente."
     except sqlite3.Error as e:
+        raise_if_database_locked(e)
         print(f"ERROR (finances.py - update_recurring_item): {e}")
         return False, "Error de BD al actualizar ítem recurrente."
     finally:
         if conn: conn.close()
 
+@retry_on_database_locked(failure_result=DATABASE_BUSY_WRITE_RESULT)
 def delete_recurring_item(item_id: int) -> tuple[bool, str]:
     """Elimina un ítem financiero recurrente."""
     conn = get_db_connection()
     if not conn: return False, "Error de conexión."
     try:
-        with conn:
+        with transaction(conn):
             cursor = conn.cursor()
             # Primero verificar si hay transacciones generadas por este recurrente
             # y decidir qué hacer (desvincular o impedir borrado).
             # La FK en financial_transactions (source_recurring_id) es ON DELETE SET NULL.
             cursor.execute("DELETE FROM recurring_financial_items WHERE id = ?", (item_id,))
+            mark_tables_changed("recurring_financial_items", "financial_transactions") # ON DELETE SET NULL en el libro
             if cursor.rowcount == 0:
                 return False, "Ítem recurrente no encontrado para eliminar."
             return True, "Ítem recurrente eliminado exitosamente."
     except sqlite3.Error as e:
+        raise_if_database_locked(e)
         print(f"ERROR (finances.py - delete_recurring_item): {e}")
         return False, "Error de BD al eliminar ítem recurrente."
     finally:
         if conn: conn.close()
 
 
+# --- PREVISIÓN DE TESORERÍA ---
+# Ingresos y gastos esperados, día a día y por mes, para los próximos N meses. Se combinan:
+#   - los vencimientos de los ítems recurrentes activos (calendario de core_logic.recurrence), y
+#   - las renovaciones esperadas de las membresías vigentes: la que caduca en el horizonte se renueva con
+#     la tasa histórica de renovación de su plan; la renovada vuelve a caducar y a renovarse, así que la
+#     k-ésima renovación aporta precio * tasa^k.
+# Los importes se acumulan por día con NumPy (np.bincount sobre todas las ocurrencias a la vez). NumPy solo
+# se importa al pedir la previsión, para no retrasar el arranque de la aplicación.
+FORECAST_COLUMNS = ("recurring_income", "recurring_expense", "renewal_income", "total_income", "total_expense", "net_balance")
+_MIN_EXPECTED_RENEWAL_WEIGHT = 0.001 # Renovaciones encadenadas menos probables se descartan
+
+def _forecast_end_date(start_date_obj: date, months: int) -> date:
+    """Último día del horizonte: mismo día N meses después (recortado al mes) menos un día."""
+    month_index = start_date_obj.year * 12 + start_date_obj.month - 1 + months
+    year, month = divmod(month_index, 12)
+    return date(year, month + 1, min(start_date_obj.day, calendar.monthrange(year, month + 1)[1])) - timedelta(days=1)
+
+def get_membership_renewal_rates(as_of_date_obj: date | None = None) -> dict[str, dict]:
+    """
+    Tasa histórica de renovación por plan_key: de las membresías caducadas en los últimos
+    FORECAST_RENEWAL_LOOKBACK_DAYS (con el margen de FORECAST_RENEWAL_GRACE_DAYS ya cumplido), cuántas
+    tuvieron otra membresía del mismo socio empezada antes de acabar ese margen.
+    {plan_key: {"expired": n, "renewed": n, "rate": float, "average_price": float, "average_duration_days": float}}
+    """
+    if as_of_date_obj is None: as_of_date_obj = date.today()
+    conn = get_db_connection()
+    if not conn: return {}
+    lookback_end = as_of_date_obj - timedelta(days=FORECAST_RENEWAL_GRACE_DAYS)
+    lookback_start = lookback_end - timedelta(days=FORECAST_RENEWAL_LOOKBACK_DAYS)
+    try:
+        # Agregados sin tipo declarado: llegan como números simples (céntimos y días), sin conversores.
+        rows = conn.execute("""
+            SELECT mm.plan_key, COUNT(*) AS expired_count,
+                   SUM(EXISTS (SELECT 1 FROM member_memberships renewal
+                               WHERE renewal.member_id = mm.member_id AND renewal.start_date > mm.start_date
+                                 AND renewal.start_date <= date(mm.expiry_date, ?))) AS renewed_count,
+                   AVG(mm.price_paid) AS average_price_cents,
+                   AVG(julianday(mm.expiry_date) - julianday(mm.start_date)) AS average_duration_days
+            FROM member_memberships mm
+            WHERE mm.expiry_date >= ? AND mm.expiry_date < ?
+            GROUP BY mm.plan_key
+        """, (f"+{FORECAST_RENEWAL_GRACE_DAYS} days", convert_date_to_db_string(lookback_start),
+              convert_date_to_db_string(lookback_end))).fetchall()
+        return {row['plan_key']: {
+                    "expired": row['expired_count'], "renewed": row['renewed_count'],
+                    "rate": row['renewed_count'] / row['expired_count'],
+                    "average_price": row['average_price_cents'] / 100,
+                    "average_duration_days": row['average_duration_days']}
+                for row in rows}
+    except sqlite3.Error as e:
+        print(f"ERROR (finances.py - get_membership_renewal_rates): {e}"); return {}
+    finally:
+        if conn: conn.close()
+
+def _collect_recurring_forecast_occurrences(conn: sqlite3.Connection, start_date_obj: date, end_date_obj: date):
+    """(ordinales de día, céntimos con signo +ingreso/-gasto) de todos los vencimientos recurrentes del horizonte."""
+    items = RecurringItem.fetch_all(conn.execute(
+        """SELECT * FROM recurring_financial_items WHERE is_active = 1 AND next_due_date <= ?
+           AND (end_date IS NULL OR end_date >= ?)""",
+        (convert_date_to_db_string(end_date_obj), convert_date_to_db_string(start_date_obj))
+    ))
+    day_ordinals, signed_cents = [], []
+    for item in items:
+        schedule = get_recurrence_schedule(
+            item.frequency, item.start_date, item.day_of_month_to_process, item.day_of_week_to_process)
+        due_date = item.next_due_date
+        if not schedule or not due_date: continue
+        window_end = min(end_date_obj, item.end_date) if item.end_date else end_date_obj
+        if due_date >= start_date_obj: # Como en la puesta al día: el vencimiento fijado a mano se respeta
+            occurrences = [due_date] if due_date <= window_end else []
+            occurrences += schedule.between(due_date + timedelta(days=1), window_end)
+        else: # Atrasado: lo pendiente se genera con la puesta al día, aquí solo cuenta el horizonte
+            occurrences = schedule.between(start_date_obj, window_end)
+        cents = int(item.default_amount * 100) * (1 if item.item_type == 'income' else -1)
+        day_ordinals.extend(occurrence.toordinal() for occurrence in occurrences)
+        signed_cents.extend([cents] * len(occurrences))
+    return day_ordinals, signed_cents, len(items)
+
+def get_cash_flow_forecast(months: int = FORECAST_DEFAULT_MONTHS, start_date_obj: date | None = None) -> dict | None:
+    """
+    Previsión de tesorería desde start_date_obj (hoy por defecto) durante `months` meses.
+    Devuelve None si NumPy no está instalado, el horizonte no es válido o falla la BD. Si no:
+      {"start_date", "end_date", "opening_balance" (saldo neto del libro hasta hoy),
+       "daily":   {"date": [date, ...], <FORECAST_COLUMNS>: np.ndarray, "balance": np.ndarray},
+       "monthly": {"month": ["AAAA-MM", ...], <FORECAST_COLUMNS>: np.ndarray, "balance": np.ndarray},
+       "renewal_rates": {plan_key: tasa}, "recurring_item_count": n, "expiring_membership_count": n}
+    Los importes son valores esperados en unidades de moneda (float), no importes contables.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        print("ERROR (finances.py - get_cash_flow_forecast): NumPy no está instalado (pip install numpy).")
+        return None
+    if not isinstance(months, int) or not 1 <= months <= FORECAST_MAX_MONTHS:
+        print(f"ERROR (finances.py - get_cash_flow_forecast): Horizonte no válido: {months} meses.")
+        return None
+    if start_date_obj is None: start_date_obj = date.today()
+    end_date_obj = _forecast_end_date(start_date_obj, months)
+    first_ordinal, day_count = start_date_obj.toordinal(), (end_date_obj - start_date_obj).days + 1
+
+    renewal_stats = get_membership_renewal_rates(start_date_obj)
+    conn = get_db_connection()
+    if not conn: return None
+    try:
+        day_ordinals, signed_cents, recurring_item_count = _collect_recurring_forecast_occurrences(conn, start_date_obj, end_date_obj)
+        # Renovación el día siguiente a la caducidad; los números llegan ya calculados por SQLite.
+        expiring_rows = conn.execute("""
+            SELECT mm.plan_key, CAST(julianday(mm.expiry_date) - julianday(?) AS INTEGER) + 1 AS renewal_day
+            FROM member_memberships mm
+            WHERE mm.expiry_date >= ? AND mm.expiry_date < ? AND mm.is_current = 1
+        """, (convert_date_to_db_string(start_date_obj), convert_date_to_db_string(start_date_obj - timedelta(days=1)),
+              convert_date_to_db_string(end_date_obj))).fetchall()
+        opening_balance = get_financial_summary(end_date_str=convert_date_to_db_string(start_date_obj - timedelta(days=1)))["net_balance"]
+    except sqlite3.Error as e:
+        print(f"ERROR (finances.py - get_cash_flow_forecast): {e}"); return None
+    finally:
+        if conn: conn.close()
+
+    # Recurrentes: una sola pasada de bincount para ingresos y otra para gastos.
+    recurring_days = np.fromiter(day_ordinals, dtype=np.int64, count=len(day_ordinals)) - first_ordinal
+    recurring_cents = np.fromiter(signed_cents, dtype=np.float64, count=len(signed_cents))
+    recurring_income = np.bincount(recurring_days, weights=np.clip(recurring_cents, 0, None), minlength=day_count) / 100
+    recurring_expense = np.bincount(recurring_days, weights=np.clip(-recurring_cents, 0, None), minlength=day_count) / 100
+
+    # Renovaciones: por plan, matriz socios x renovaciones encadenadas (día = primera + k * duración).
+    history_expired = sum(stats["expired"] for stats in renewal_stats.values())
+    default_rate = (sum(stats["renewed"] for stats in renewal_stats.values()) / history_expired
+                    if history_expired else FORECAST_RENEWAL_RATE_WITHOUT_HISTORY)
+    renewal_income = np.zeros(day_count)
+    renewal_rates = {}
+    plan_keys = np.array([row['plan_key'] for row in expiring_rows], dtype=object)
+    renewal_days = np.fromiter((row['renewal_day'] for row in expiring_rows), dtype=np.int64, count=len(expiring_rows))
+    for plan_key in dict.fromkeys(plan_keys.tolist()):
+        plan_config, stats = DEFAULT_MEMBERSHIP_PLANS.get(plan_key, {}), renewal_stats.get(plan_key)
+        price = float(plan_config.get("precio_base_decimal") or (stats["average_price"] if stats else 0))
+        duration_days = int(plan_config.get("duracion_total_dias") or round(stats["average_duration_days"] if stats else 0))
+        rate = renewal_rates[plan_key] = stats["rate"] if stats else default_rate
+        if price <= 0 or duration_days <= 0 or rate <= 0: continue
+        first_days = renewal_days[plan_keys == plan_key]
+        chain_weights = price * rate ** np.arange(1, (day_count - 1 - int(first_days.min())) // duration_days + 2)
+        chain_weights = chain_weights[chain_weights >= price * _MIN_EXPECTED_RENEWAL_WEIGHT]
+        chain_days = first_days[:, None] + np.arange(len(chain_weights)) * duration_days
+        in_horizon = chain_days < day_count
+        renewal_income += np.bincount(chain_days[in_horizon], minlength=day_count,
+                                      weights=np.broadcast_to(chain_weights, chain_days.shape)[in_horizon])
+
+    daily_dates = [start_date_obj + timedelta(days=offset) for offset in range(day_count)]
+    daily = {"date": daily_dates, "recurring_income": recurring_income, "recurring_expense": recurring_expense,
+             "renewal_income": renewal_income, "total_income": recurring_income + renewal_income,
+             "total_expense": recurring_expense}
+    daily["net_balance"] = daily["total_income"] - daily["total_expense"]
+    daily["balance"] = float(opening_balance) + np.cumsum(daily["net_balance"])
+
+    month_labels = [day.strftime("%Y-%m") for day in daily_dates]
+    month_starts = np.array([offset for offset, label in enumerate(month_labels) if offset == 0 or label != month_labels[offset - 1]])
+    monthly = {"month": [month_labels[offset] for offset in month_starts]}
+    for column in FORECAST_COLUMNS:
+        monthly[column] = np.add.reduceat(daily[column], month_starts)
+    monthly["balance"] = daily["balance"][np.append(month_starts[1:], day_count) - 1] # Saldo al cierre de cada mes
+
+    return {"start_date": start_date_obj, "end_date": end_date_obj, "opening_balance": opening_balance,
+            "daily": daily, "monthly": monthly, "renewal_rates": renewal_rates,
+            "recurring_item_count": recurring_item_count, "expiring_membership_count": len(expiring_rows)}
+
+
 # --- Script de autocomprobación ---
 if __name__ == "__main__":
     # (El código de if __name__ == "__main__" como lo tenías, pero usando las constantes y funciones importadas directamente)
@@ -532,7 +1076,7 @@ if __name__ == "__main__":
         print(f"  Total (sin filtro): {total_count}, mostrando {len(transactions)}")
         for t in transactions:
             amount_disp = format_currency_for_display(t['amount_decimal']) # Usa la importada de utils
-            print(f"    - ID: {t['internal_transaction_id']}, Fecha: {t['transaction_date_ui']}, Desc: {t['description']}, Monto: {amount_disp}")
+            print(f"    - ID: {t['internal_transaction_id']}, Fecha: {format_date_for_ui(t['transaction_date'])}, Desc: {t['description']}, Monto: {amount_disp}")
 
     print("\n4. Resumen financiero del mes actual...")
     start_month_date_obj = date.today().replace(day=1)
@@ -544,6 +1088,14 @@ if __name__ == "__main__":
     print(f"    Gastos:   {format_currency_for_display(summary['total_expense'])}")
     print(f"    Balance:  {format_currency_for_display(summary['net_balance'])}")
 
+    mismatches = verify_financial_daily_rollup()
+    print(f"    Totales diarios: {'cuadran con el libro' if not mismatches else f'{len(mismatches)} diferencias'}")
+
+    print("\n5. Desglose por mes y categoría...")
+    grouped = get_financial_summary_grouped(["month", "category"], start_date_str=start_month_ui_str)
+    for month, category, net, count in zip(grouped['month'], grouped['category'], grouped['net_balance'], grouped['transaction_count']):
+        print(f"    {month} | {category}: {format_currency_for_display(net)} ({count} trans.)")
+
     # (El resto de pruebas de recurrentes como antes...)
     print(f"\n--- Fin de pruebas de {os.path.basename(__file__)} ---")
     print(f"--- {os.path.basename(__file__)} Self-Check ---")
@@ -568,7 +1120,7 @@ if __name__ == "__main__":
         for t in transactions:
             # --- CORRECCIÓN: Usar format_currency_for_display de utils.py (ya importada) ---
             amount_disp = format_currency_for_display(t['amount_decimal'])
-            print(f"    - ID: {t['internal_transaction_id']}, Fecha: {t['transaction_date_ui']}, Desc: {t['description']}, Monto: {amount_disp}")
+            print(f"    - ID: {t['internal_transaction_id']}, Fecha: {format_date_for_ui(t['transaction_date'])}, Desc: {t['description']}, Monto: {amount_disp}")
 
     print("\n4. Resumen financiero del mes actual...")
     # --- CORRECCIÓN: Usar UI_DISPLAY_DATE_FORMAT ---
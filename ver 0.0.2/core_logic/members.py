@@ -2,28 +2,40 @@
 # Lógica de negocio para la gestión de miembros (socios) del gimnasio.
 
 import sqlite3
+import re
+import threading
+from collections import OrderedDict
 from datetime import date, datetime # datetime no se usa directamente aquí pero es bueno tenerlo si se parsean datetimes
 from decimal import Decimal # Para manejar precios con precisión
 import os # <-- Añadido para usar os.path.basename en el if __name__
 
 # Importaciones del mismo paquete (core_logic) o de la raíz del proyecto
 try:
-    from .database import get_db_connection
+    from .database import (
+        get_db_connection, retry_on_database_locked, raise_if_database_locked, DATABASE_BUSY_WRITE_RESULT,
+        transaction, call_after_commit, is_inside_unit_of_work, is_interrupted_error,
+        subscribe_to_database_changes, get_connection_pool_generation
+    )
+    from .query_cache import cached_query, mark_tables_changed, skip_result_caching
+    from .records import Member, Membership
     from .utils import (
         generate_internal_id, sanitize_text_input, parse_string_to_date,
         calculate_member_expiry_date, format_date_for_ui, convert_date_to_db_string,
-        parse_string_to_decimal # <-- CORRECCIÓN 1: Importar parse_string_to_decimal
+        parse_string_to_decimal, # <-- CORRECCIÓN 1: Importar parse_string_to_decimal
+        normalize_text_for_search, make_spanish_sort_key, money_to_cents
     )
     from config import (
         DEFAULT_NEW_MEMBER_STATUS_ON_CREATION, MEMBER_STATUS_OPTIONS_LIST,
         DEFAULT_MEMBERSHIP_PLANS, MEMBER_PHOTOS_SUBDIR_NAME, APP_DATA_ROOT_DIR,
-        UI_DISPLAY_DATE_FORMAT # <-- CORRECCIÓN 2: Importar UI_DISPLAY_DATE_FORMAT
+        UI_DISPLAY_DATE_FORMAT, # <-- CORRECCIÓN 2: Importar UI_DISPLAY_DATE_FORMAT
+        MEMBER_LOOKUP_CACHE_MAX_ENTRIES
     )
 except ImportError as e:
     print(f"ERROR CRÍTICO (members.py): Fallo en importaciones esenciales. Error: {e}")
     raise
 
 # --- FUNCIONES CRUD PARA MIEMBROS ---
+@retry_on_database_locked(failure_result=DATABASE_BUSY_WRITE_RESULT)
 def add_new_member(
     full_name: str,
     date_of_birth_str: str | None = None,
@@ -52,23 +64,25 @@ def add_new_member(
     if initial_status not in MEMBER_STATUS_OPTIONS_LIST:
         return False, f"Estado inicial '{initial_status}' no es válido."
 
-    internal_member_id = generate_internal_id(prefix="MBR")
+    internal_member_id = generate_internal_id(prefix=MEMBER_INTERNAL_ID_PREFIX)
 
     conn = get_db_connection()
     if not conn:
         return False, "Error de conexión a la base de datos."
 
     try:
-        with conn:
+        with transaction(conn):
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT INTO members (
-                    internal_member_id, full_name, date_of_birth, gender, phone_number,
+                    internal_member_id, full_name, full_name_search_key, full_name_sort_key,
+                    date_of_birth, gender, phone_number,
                     address_line1, address_city, address_postal_code, join_date,
                     current_status, notes, photo_filename, created_at, updated_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
             """, (
                 internal_member_id, clean_full_name,
+                normalize_text_for_search(clean_full_name), make_spanish_sort_key(clean_full_name),
                 convert_date_to_db_string(dob),
                 sanitize_text_input(gender, allow_empty=True),
                 sanitize_text_input(phone_number, allow_empty=True),
@@ -80,19 +94,107 @@ def add_new_member(
                 sanitize_text_input(notes, allow_empty=True),
                 sanitize_text_input(photo_filename, allow_empty=True)
             ))
+            mark_tables_changed("members")
             return True, internal_member_id
     except sqlite3.IntegrityError:
         return False, f"Conflicto de ID interno. Intente de nuevo."
     except sqlite3.Error as e:
+        raise_if_database_locked(e)
         print(f"ERROR (members.py - add_new_member): {e}")
         return False, "Error de base de datos al añadir miembro."
     finally:
         if conn: conn.close()
 
 
-def get_member_by_internal_id(member_internal_id: str) -> dict | None:
-    # (Código sin cambios, pero asegurarse que la conexión se cierra)
+# --- CACHÉ DE SOCIOS POR internal_member_id ---
+# Una misma acción de la GUI (añadir membresía, ver historial, editar) busca varias veces el mismo socio.
+# Se guardan en memoria los últimos MEMBER_LOOKUP_CACHE_MAX_ENTRIES socios leídos (LRU) y, aparte, la
+# correspondencia internal_member_id -> id, que no cambia nunca. Los registros Member son de solo lectura,
+# así que se pueden compartir. Las escrituras de este módulo invalidan el socio tras el commit; lo leído
+# dentro de una unidad de trabajo no se guarda (podría deshacerse). Un acierto no toca SQLite (ni siquiera
+# PRAGMA data_version): los cambios de otros PCs los detecta una vez por segundo el sondeo de la GUI
+# (poll_database_changes), que avanza _member_cache_generation si tocaron 'members'. Cada entrada recuerda
+# esa generación y la del pool de conexiones (cambio de BD); si alguna se movió, se vuelve a leer.
+_member_cache: OrderedDict[str, tuple[tuple[int, int], Member]] = OrderedDict()
+_member_db_id_cache: OrderedDict[str, tuple[tuple[int, int], int]] = OrderedDict()
+_member_cache_lock = threading.Lock()
+_member_cache_stats = {"hits": 0, "misses": 0, "invalidations": 0, "evictions": 0, "external_changes": 0}
+_member_cache_external_changes = 0
+
+def _member_cache_generation() -> tuple[int, int]:
+    return get_connection_pool_generation(), _member_cache_external_changes
+
+def _on_external_members_change(changed_tables: set[str]):
+    """Suscriptor del sondeo de cambios: otro PC escribió en 'members' y lo guardado puede estar anticuado."""
+    global _member_cache_external_changes
+    with _member_cache_lock:
+        _member_cache_external_changes += 1
+        _member_cache_stats["external_changes"] += 1
+
+subscribe_to_database_changes(_on_external_members_change, ("members",))
+
+def _store_in_lru(cache: OrderedDict, key: str, value) -> int:
+    """Guarda key como la más reciente y descarta las más antiguas; devuelve cuántas se descartaron."""
+    cache[key] = value
+    cache.move_to_end(key)
+    evicted = 0
+    while len(cache) > MEMBER_LOOKUP_CACHE_MAX_ENTRIES:
+        cache.popitem(last=False); evicted += 1
+    return evicted
+
+def _cache_member(member: Member, cache_generation: tuple[int, int]):
+    if is_inside_unit_of_work(): return
+    with _member_cache_lock:
+        evicted = _store_in_lru(_member_cache, member.internal_member_id, (cache_generation, member))
+        evicted += _store_in_lru(_member_db_id_cache, member.internal_member_id, (cache_generation, member.id))
+        _member_cache_stats["evictions"] += evicted
+
+def invalidate_member_cache(member_internal_id: str | None = None):
+    """Olvida un socio (o todos si no se indica ninguno). El id interno -> id de BD se conserva."""
+    with _member_cache_lock:
+        if member_internal_id is None:
+            _member_cache_stats["invalidations"] += len(_member_cache)
+            _member_cache.clear()
+        elif _member_cache.pop(member_internal_id, None) is not None:
+            _member_cache_stats["invalidations"] += 1
+
+def clear_member_cache():
+    """Vacía por completo la caché de socios, incluida la correspondencia de ids (p. ej. al cambiar de BD)."""
+    with _member_cache_lock:
+        _member_cache.clear(); _member_db_id_cache.clear()
+
+def get_member_cache_stats() -> dict:
+    """Aciertos, fallos, invalidaciones y descartes de la caché de socios, con su tamaño actual."""
+    with _member_cache_lock:
+        stats = dict(_member_cache_stats)
+        stats["cached_members"] = len(_member_cache)
+        stats["cached_ids"] = len(_member_db_id_cache)
+    return stats
+
+def _get_member_db_id(member_internal_id: str) -> int | None:
+    """id de BD del socio; solo consulta SQLite la primera vez que se pide ese socio."""
     if not member_internal_id: return None
+    cache_generation = _member_cache_generation()
+    with _member_cache_lock:
+        cached_entry = _member_db_id_cache.get(member_internal_id)
+        if cached_entry is not None and cached_entry[0] == cache_generation:
+            _member_db_id_cache.move_to_end(member_internal_id)
+            _member_cache_stats["hits"] += 1
+            return cached_entry[1]
+    member_data = get_member_by_internal_id(member_internal_id)
+    return member_data['id'] if member_data else None
+
+def get_member_by_internal_id(member_internal_id: str) -> Member | None:
+    """Socio por su id interno; sale de la caché si ya se leyó y no se ha modificado desde entonces."""
+    if not member_internal_id: return None
+    cache_generation = _member_cache_generation() # Antes de leer: un cambio externo a mitad deja la entrada caducada
+    with _member_cache_lock:
+        cached_entry = _member_cache.get(member_internal_id)
+        if cached_entry is not None and cached_entry[0] == cache_generation:
+            _member_cache.move_to_end(member_internal_id)
+            _member_cache_stats["hits"] += 1
+            return cached_entry[1]
+        _member_cache_stats["misses"] += 1
     conn = get_db_connection()
     if not conn: return None
     try:
@@ -101,61 +203,227 @@ def get_member_by_internal_id(member_internal_id: str) -> dict | None:
             "SELECT * FROM members WHERE internal_member_id = ?",
             (member_internal_id,)
         )
-        member_data = cursor.fetchone()
-        if member_data:
-            member_dict = dict(member_data)
-            # Convertir fechas almacenadas a objetos date para la lógica
-            member_dict['date_of_birth_obj'] = parse_string_to_date(member_dict.get('date_of_birth'))
-            member_dict['join_date_obj'] = parse_string_to_date(member_dict.get('join_date'))
-            return member_dict
-        return None
+        member = Member.fetch_one(cursor) # date_of_birth_obj / join_date_obj: campos derivados del registro
+        if member is not None:
+            _cache_member(member, cache_generation)
+        return member
     except sqlite3.Error as e:
         print(f"ERROR (members.py - get_member_by_internal_id): {e}")
         return None
     finally:
         if conn: conn.close()
 
-def get_all_members_summary(active_only: bool = False, search_term: str | None = None) -> list[dict]:
-    # (Código sin cambios, pero asegurarse que la conexión se cierra)
-    conn = get_db_connection()
-    if not conn: return []
-    
-    members_list = []
-    query = "SELECT id, internal_member_id, full_name, current_status, join_date FROM members"
+# --- BÚSQUEDA DE SOCIOS (FTS5 con respaldo LIKE) ---
+MEMBER_INTERNAL_ID_PREFIX = "MBR" # Los IDs internos son "MBR-XXXXXXXXXXXX"
+# Pesos bm25 por columna de members_fts: full_name, internal_member_id, phone_number, address_city, notes.
+MEMBER_SEARCH_COLUMN_WEIGHTS = (10.0, 8.0, 6.0, 2.0, 1.0)
+_SEARCH_TOKEN_PATTERN = re.compile(r"[\w-]+")
+_MEMBER_FTS_TEXT_COLUMNS = "{full_name phone_number address_city notes}" # Filtro de columnas FTS5 sin el ID
+
+def build_member_fts_query(search_text: str | None) -> str | None:
+    """
+    Convierte lo que teclea recepción en una consulta FTS5: cada palabra como prefijo y todas obligatorias.
+    'ana per 600' -> '{...} : "ana"* {...} : "per"* "600"*'. Devuelve None si no queda ninguna palabra utilizable.
+    Las palabras sin dígitos no se buscan en internal_member_id: todos los IDs empiezan por "MBR-", así que
+    'm' o 'mb' coincidirían con todos los socios (para buscar por ID ver _member_id_search_prefix).
+    """
+    if not search_text:
+        return None
+    tokens = _SEARCH_TOKEN_PATTERN.findall(search_text)
+    return " ".join(f'"{token}"*' if any(char.isdigit() for char in token) else f'{_MEMBER_FTS_TEXT_COLUMNS} : "{token}"*'
+                    for token in tokens) or None
+
+def _member_id_search_prefix(search_term: str | None) -> str | None:
+    """El término en mayúsculas si es un ID de socio o su principio ('MBR-3E9'), si no None."""
+    member_id_prefix = search_term.strip().upper() if search_term else ""
+    if member_id_prefix.startswith(f"{MEMBER_INTERNAL_ID_PREFIX}-") and " " not in member_id_prefix:
+        return member_id_prefix
+    return None
+
+def _members_fts_exists(conn: sqlite3.Connection) -> bool:
+    """True si la BD tiene el índice members_fts (puede faltar si SQLite no incluye FTS5)."""
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'members_fts'"
+    ).fetchone() is not None
+
+def _build_member_summary_filters(
+    conn: sqlite3.Connection, active_only: bool, search_term: str | None, table_alias: str = ""
+) -> tuple[str, list]:
+    """Cláusula WHERE (o "") y parámetros comunes a los listados de socios."""
+    prefix = f"{table_alias}." if table_alias else ""
     conditions = []
     params = []
 
     if active_only:
-        conditions.append("current_status = ?")
+        conditions.append(f"{prefix}current_status = ?")
         params.append("Activo")
 
-    if search_term:
-        clean_search = f"%{sanitize_text_input(search_term)}%"
-        # Asegurarse que la tabla no necesita alias si no hay JOINS directos en ESTA query base
-        conditions.append("(full_name LIKE ? OR internal_member_id LIKE ?)")
-        params.extend([clean_search, clean_search])
+    member_id_prefix = _member_id_search_prefix(search_term)
+    if member_id_prefix:
+        # Un ID de socio o su principio (lo que se teclea con el lector o copiando): rango sobre el índice
+        # UNIQUE de internal_member_id. En FTS, "MBR" y los primeros dígitos coinciden con casi todos.
+        conditions.append(f"{prefix}internal_member_id >= ? AND {prefix}internal_member_id < ?")
+        params.extend([member_id_prefix, member_id_prefix + "\U0010ffff"])
+    elif search_term:
+        fts_query = build_member_fts_query(search_term)
+        if fts_query and _members_fts_exists(conn):
+            conditions.append(f"{prefix}id IN (SELECT rowid FROM members_fts WHERE members_fts MATCH ?)")
+            params.append(fts_query)
+        else:
+            # Sin FTS5: comparar contra la clave normalizada ('jose munoz' encuentra a 'José Muñoz').
+            conditions.append(f"({prefix}full_name_search_key LIKE ? OR {prefix}internal_member_id LIKE ?)")
+            params.extend([f"%{normalize_text_for_search(search_term)}%", f"%{sanitize_text_input(search_term)}%"])
+
+    where_clause = " WHERE " + " AND ".join(conditions) if conditions else ""
+    return where_clause, params
+
+@cached_query("members")
+def search_members(search_text: str, active_only: bool = False, limit: int = 100) -> list[Member]:
+    """
+    Búsqueda de socios por prefijo en nombre, ID interno, teléfono, ciudad y notas, ordenada por relevancia
+    (bm25, el nombre pesa más). Cada resultado incluye 'search_rank' (menor = más relevante).
+    Sin FTS5 recurre a LIKE sobre las mismas columnas, ordenado por nombre y con search_rank None.
+    """
+    conn = get_db_connection()
+    if not conn: skip_result_caching(); return []
 
-    if conditions:
-        query += " WHERE " + " AND ".join(conditions)
-    
-    query += " ORDER BY full_name"
+    fts_query = build_member_fts_query(search_text)
+    if not fts_query:
+        return []
 
+    status_condition = " AND m.current_status = ?" if active_only else ""
+    status_params = ["Activo"] if active_only else []
     try:
+        cursor = conn.cursor()
+        if _members_fts_exists(conn):
+            weights = ", ".join(str(weight) for weight in MEMBER_SEARCH_COLUMN_WEIGHTS)
+            cursor.execute(f"""
+                SELECT m.id, m.internal_member_id, m.full_name, m.current_status, m.join_date,
+                       m.phone_number, m.address_city, bm25(members_fts, {weights}) AS search_rank
+                FROM members_fts
+                JOIN members m ON m.id = members_fts.rowid
+                WHERE members_fts MATCH ?{status_condition}
+                ORDER BY search_rank, m.full_name_sort_key
+                LIMIT ?
+            """, tuple([fts_query] + status_params + [limit]))
+        else:
+            like_term = f"%{sanitize_text_input(search_text)}%"
+            normalized_like_term = f"%{normalize_text_for_search(search_text)}%"
+            cursor.execute(f"""
+                SELECT m.id, m.internal_member_id, m.full_name, m.current_status, m.join_date,
+                       m.phone_number, m.address_city, NULL AS search_rank
+                FROM members m
+                WHERE (m.full_name_search_key LIKE ? OR m.internal_member_id LIKE ? OR m.phone_number LIKE ?
+                       OR m.address_city LIKE ? OR m.notes LIKE ?){status_condition}
+                ORDER BY m.full_name_sort_key
+                LIMIT ?
+            """, tuple([normalized_like_term] + [like_term] * 4 + status_params + [limit]))
+        return Member.fetch_all(cursor)
+    except sqlite3.Error as e:
+        print(f"ERROR (members.py - search_members): {e}")
+        skip_result_caching()
+        return []
+    finally:
+        if conn: conn.close()
+
+@cached_query("members")
+def get_all_members_summary(active_only: bool = False, search_term: str | None = None) -> list[Member]:
+    # (Código sin cambios, pero asegurarse que la conexión se cierra)
+    conn = get_db_connection()
+    if not conn: skip_result_caching(); return []
+    
+    try:
+        where_clause, params = _build_member_summary_filters(conn, active_only, search_term)
+        query = "SELECT id, internal_member_id, full_name, current_status, join_date FROM members"
+        query += where_clause
+        query += " ORDER BY full_name_sort_key" # Orden alfabético español (tildes, ñ) servido por índice
+
         cursor = conn.cursor()
         cursor.execute(query, tuple(params))
-        for row in cursor.fetchall():
-            member_dict = dict(row)
-            join_date_obj = parse_string_to_date(row['join_date'])
-            member_dict['join_date_ui'] = format_date_for_ui(join_date_obj) # Usar función de utils
-            member_dict['join_date_obj'] = join_date_obj
-            members_list.append(member_dict)
-        return members_list
+        return Member.fetch_all(cursor) # join_date_ui se formatea solo si se lee (filas visibles)
     except sqlite3.Error as e:
         print(f"ERROR (members.py - get_all_members_summary): {e}")
+        skip_result_caching()
         return []
     finally:
         if conn: conn.close()
 
+@cached_query("members", "member_memberships", depends_on_today=True)
+def get_members_summary_with_active_membership(
+    active_only: bool = False, search_term: str | None = None, limit: int | None = None, offset: int = 0
+) -> list[Member]:
+    """
+    Listado de socios (mismos filtros que get_all_members_summary) junto con su membresía activa
+    (mismo criterio que get_member_active_membership), en UNA sola consulta.
+    Sustituye a llamar a get_member_active_membership() por cada socio.
+    Claves añadidas por socio: active_membership_id, active_plan_key, active_plan_name,
+    active_start_date(_obj), active_expiry_date(_obj) (None si no tiene membresía vigente).
+    Con `limit`/`offset` devuelve solo esa ventana del orden alfabético (listas virtuales de la GUI): la
+    membresía activa se busca solo para esos socios. Si el término es un ID ('MBR-...') se ordenan por ID.
+    """
+    conn = get_db_connection()
+    if not conn: skip_result_caching(); return []
+
+    try:
+        # Buscando por ID se ordena por ID: el índice UNIQUE sirve el rango, el orden y el LIMIT a la vez.
+        order_key = "internal_member_id" if _member_id_search_prefix(search_term) else "full_name_sort_key"
+        order_column = f"m.{order_key}"
+        if limit is None and not offset:
+            members_source = "members m"
+            where_clause, params = _build_member_summary_filters(conn, active_only, search_term, table_alias="m")
+        else:
+            # La ventana se recorta antes del JOIN: el OFFSET salta entradas del índice, no subconsultas de membresía.
+            window_where, params = _build_member_summary_filters(conn, active_only, search_term, table_alias="w")
+            members_source = f"""(
+                SELECT w.id, w.internal_member_id, w.full_name, w.current_status, w.join_date, w.full_name_sort_key
+                FROM members w{window_where}
+                ORDER BY w.{order_key} LIMIT ? OFFSET ?
+            ) m"""
+            where_clause = ""
+            params.extend([int(limit) if limit is not None else -1, int(offset)])
+        query = f"""
+            SELECT m.id, m.internal_member_id, m.full_name, m.current_status, m.join_date,
+                   mm.id AS active_membership_id, mm.plan_key AS active_plan_key,
+                   mm.plan_name_at_purchase AS active_plan_name,
+                   mm.start_date AS active_start_date, mm.expiry_date AS active_expiry_date
+            FROM {members_source}
+            LEFT JOIN member_memberships mm ON mm.id = (
+                SELECT mm_sub.id FROM member_memberships mm_sub
+                WHERE mm_sub.member_id = m.id AND mm_sub.expiry_date >= date('now', '-1 day')
+                ORDER BY mm_sub.is_current DESC, mm_sub.start_date DESC, mm_sub.id DESC LIMIT 1
+            ){where_clause}
+            ORDER BY {order_column}
+        """
+
+        cursor = conn.cursor()
+        cursor.execute(query, tuple(params))
+        return Member.fetch_all(cursor)
+    except sqlite3.Error as e:
+        if not is_interrupted_error(e): # Interrumpida a propósito: la GUI ya lanzó una búsqueda más reciente
+            print(f"ERROR (members.py - get_members_summary_with_active_membership): {e}")
+        skip_result_caching()
+        return []
+    finally:
+        if conn: conn.close()
+
+@cached_query("members")
+def count_members_summary(active_only: bool = False, search_term: str | None = None) -> int:
+    """Número de socios del listado con esos filtros (tamaño de la lista virtual de la GUI)."""
+    conn = get_db_connection()
+    if not conn: skip_result_caching(); return 0
+
+    try:
+        where_clause, params = _build_member_summary_filters(conn, active_only, search_term)
+        return conn.execute("SELECT COUNT(*) FROM members" + where_clause, tuple(params)).fetchone()[0]
+    except sqlite3.Error as e:
+        if not is_interrupted_error(e):
+            print(f"ERROR (members.py - count_members_summary): {e}")
+        skip_result_caching()
+        return 0
+    finally:
+        if conn: conn.close()
+
+@retry_on_database_locked(failure_result=DATABASE_BUSY_WRITE_RESULT)
 def update_member_details(
     member_internal_id: str,
     full_name: str | None = None,
@@ -187,6 +455,11 @@ def update_member_details(
         if clean_name != current_member_data.get('full_name'):
             updates.append("full_name = ?")
             params.append(clean_name)
+            # Mantener sincronizadas las claves precalculadas de búsqueda y orden.
+            updates.append("full_name_search_key = ?")
+            params.append(normalize_text_for_search(clean_name))
+            updates.append("full_name_sort_key = ?")
+            params.append(make_spanish_sort_key(clean_name))
 
     if date_of_birth_str is not None: # Se pasa un string (de UI o test)
         dob_obj = parse_string_to_date(date_of_birth_str, permissive_formats=True) # convierte a objeto date
@@ -229,15 +502,19 @@ def update_member_details(
     if not conn: return False, "Error de conexión a BD."
 
     try:
-        with conn:
+        with transaction(conn):
             cursor = conn.cursor()
             query = f"UPDATE members SET {', '.join(updates)} WHERE internal_member_id = ?"
             final_params = tuple(params + [member_internal_id])
             cursor.execute(query, final_params)
+            mark_tables_changed("members")
             if cursor.rowcount == 0:
                 return False, "No se actualizó ninguna fila (ID o sin cambios)."
+            invalidate_member_cache(member_internal_id) # Ya mismo y de nuevo tras el commit (otro hilo pudo releerlo)
+            call_after_commit(lambda: invalidate_member_cache(member_internal_id))
             return True, "Detalles del miembro actualizados."
     except sqlite3.Error as e:
+        raise_if_database_locked(e)
         print(f"ERROR (members.py - update_member_details): {e}")
         return False, "Error de BD al actualizar miembro."
     finally:
@@ -245,6 +522,7 @@ def update_member_details(
 
 
 # --- FUNCIONES DE GESTIÓN DE MEMBRESÍAS DEL MIEMBRO ---
+@retry_on_database_locked(failure_result=DATABASE_BUSY_WRITE_RESULT)
 def add_membership_to_member(
     member_internal_id: str,
     plan_key: str,
@@ -286,7 +564,7 @@ def add_membership_to_member(
     if not conn: return False, "Error de conexión a BD."
 
     try:
-        with conn:
+        with transaction(conn):
             cursor = conn.cursor()
             cursor.execute("UPDATE member_memberships SET is_current = 0 WHERE member_id = ?", (member_db_id,))
 
@@ -296,7 +574,7 @@ def add_membership_to_member(
                     sessions_total, sessions_remaining, payment_transaction_id, is_current, notes, created_at
                 ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 1, ?, CURRENT_TIMESTAMP)
             """, (
-                member_db_id, plan_key, plan_name_at_purchase, str(price_paid_decimal), 
+                member_db_id, plan_key, plan_name_at_purchase, money_to_cents(price_paid_decimal), 
                 convert_date_to_db_string(start_date_obj),
                 convert_date_to_db_string(expiry_date_obj),
                 sessions_total, sessions_remaining,
@@ -304,6 +582,7 @@ def add_membership_to_member(
                 sanitize_text_input(notes, allow_empty=True)
             ))
             new_membership_id = cursor.lastrowid
+            mark_tables_changed("member_memberships")
             
             # Actualizar estado general del miembro si es necesario (y la nueva membresía es válida hoy)
             if expiry_date_obj >= date.today() and start_date_obj <= date.today():
@@ -316,74 +595,49 @@ def add_membership_to_member(
 
             return True, str(new_membership_id)
     except sqlite3.Error as e:
+        raise_if_database_locked(e)
         print(f"ERROR (members.py - add_membership_to_member): {e}")
         return False, "Error de BD al añadir membresía."
     finally:
         if conn: conn.close()
 
 
-def get_member_active_membership(member_internal_id: str) -> dict | None:
-    # (Código sin cambios funcionales, pero asegurarse que la conexión se cierra)
-    member_data = get_member_by_internal_id(member_internal_id)
-    if not member_data: return None
-    member_db_id = member_data['id']
-
+def get_member_active_membership(member_internal_id: str) -> Membership | None:
+    """
+    Membresía activa de un socio en una sola consulta: entre las vigentes (hoy puede ser el último día),
+    primero la marcada como is_current y, si no hay ninguna, la de inicio más reciente.
+    """
+    if not member_internal_id: return None
     conn = get_db_connection()
     if not conn: return None
     try:
         cursor = conn.cursor()
-        # Prioridad a la marcada como is_current = 1 y vigente
         cursor.execute("""
-            SELECT * FROM member_memberships
-            WHERE member_id = ? AND is_current = 1 AND expiry_date >= date('now', '-1 day') -- Permite que hoy sea el ultimo dia
-            ORDER BY start_date DESC LIMIT 1 
-        """, (member_db_id,)) # Ajustar 'now' si se quiere precisión de tiempo
-        active_mem = cursor.fetchone()
-        
-        if not active_mem: # Fallback: si ninguna está marcada como is_current, buscar la más reciente vigente
-            cursor.execute("""
-                SELECT * FROM member_memberships
-                WHERE member_id = ? AND expiry_date >= date('now', '-1 day') 
-                ORDER BY start_date DESC LIMIT 1 
-            """, (member_db_id,))
-            active_mem = cursor.fetchone()
-
-        if active_mem:
-            mem_dict = dict(active_mem)
-            # Convertir a objetos date para la lógica
-            mem_dict['start_date_obj'] = parse_string_to_date(mem_dict['start_date'])
-            mem_dict['expiry_date_obj'] = parse_string_to_date(mem_dict['expiry_date'])
-            mem_dict['price_paid_decimal'] = Decimal(str(mem_dict['price_paid']))
-            return mem_dict
-        return None
+            SELECT mm.* FROM member_memberships mm
+            WHERE mm.member_id = (SELECT id FROM members WHERE internal_member_id = ?)
+              AND mm.expiry_date >= date('now', '-1 day') -- Permite que hoy sea el ultimo dia
+            ORDER BY mm.is_current DESC, mm.start_date DESC, mm.id DESC LIMIT 1
+        """, (member_internal_id,))
+        return Membership.fetch_one(cursor)
     except sqlite3.Error as e:
         print(f"ERROR (members.py - get_member_active_membership): {e}")
         return None
     finally:
         if conn: conn.close()
 
-def get_all_memberships_for_member(member_internal_id: str) -> list[dict]:
-    # (Código sin cambios funcionales, pero asegurarse que la conexión se cierra)
-    member_data = get_member_by_internal_id(member_internal_id)
-    if not member_data: return []
-    member_db_id = member_data['id']
+def get_all_memberships_for_member(member_internal_id: str) -> list[Membership]:
+    member_db_id = _get_member_db_id(member_internal_id)
+    if member_db_id is None: return []
 
     conn = get_db_connection()
     if not conn: return []
-    memberships_list = []
     try:
         cursor = conn.cursor()
         cursor.execute(
             "SELECT * FROM member_memberships WHERE member_id = ? ORDER BY start_date DESC, id DESC",
             (member_db_id,)
         )
-        for row in cursor.fetchall():
-            mem_dict = dict(row)
-            mem_dict['start_date_obj'] = parse_string_to_date(mem_dict['start_date'])
-            mem_dict['expiry_date_obj'] = parse_string_to_date(mem_dict['expiry_date'])
-            mem_dict['price_paid_decimal'] = Decimal(str(mem_dict['price_paid']))
-            memberships_list.append(mem_dict)
-        return memberships_list
+        return Membership.fetch_all(cursor)
     except sqlite3.Error as e:
         print(f"ERROR (members.py - get_all_memberships_for_member): {e}")
         return []
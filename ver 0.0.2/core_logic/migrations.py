@@ -0,0 +1,520 @@
+# gimnasio_mgmt_gui/core_logic/migrations.py
+# Migraciones versionadas del esquema de la base de datos.
+# La versión aplicada se guarda en PRAGMA user_version (cabecera del archivo .db), así que
+# comprobar si el esquema está al día cuesta una sola lectura y ninguna sentencia DDL.
+#
+# Para cambiar el esquema: añadir una función _migration_NNNN_xxx(conn) al final y registrarla en
+# MIGRATIONS con el siguiente número. Nunca modificar una migración ya publicada.
+
+import sqlite3
+from contextlib import contextmanager
+
+from .utils import normalize_text_for_search, make_spanish_sort_key, MONEY_SQL_TYPE
+
+
+# --- UTILIDADES ---
+def is_fts5_available(conn: sqlite3.Connection) -> bool:
+    """True si la biblioteca SQLite enlazada incluye el módulo FTS5."""
+    try:
+        return bool(conn.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')").fetchone()[0])
+    except sqlite3.Error:
+        return False
+
+
+@contextmanager
+def timestamp_triggers_suspended(conn: sqlite3.Connection, table_name: str):
+    """
+    Quita los triggers de updated_at de la tabla (migración 1) mientras dura el bloque y los recrea con su SQL
+    original al salir. Para los rellenos de columnas nuevas: no son ediciones y no deben reescribir la fecha de
+    última modificación de cada fila. Se usa dentro de la transacción de la migración.
+    """
+    suspended_triggers = conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = ? AND name LIKE 'trigger_update_%'",
+        (table_name,)
+    ).fetchall()
+    for trigger_name, _ in suspended_triggers:
+        conn.execute(f"DROP TRIGGER {trigger_name}")
+    try:
+        yield
+    finally:
+        for _, trigger_sql in suspended_triggers:
+            conn.execute(trigger_sql)
+
+
+# --- MIGRACIONES ---
+def _migration_0001_initial_schema(conn: sqlite3.Connection):
+    """Esquema original de la 0.0.2. Usa IF NOT EXISTS para adoptar las BD ya existentes (user_version = 0)."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS system_users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            role TEXT NOT NULL,
+            is_active INTEGER DEFAULT 1,
+            last_login_at TIMESTAMP,
+            failed_login_attempts INTEGER DEFAULT 0,
+            account_locked_until TIMESTAMP,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS members (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            internal_member_id TEXT UNIQUE NOT NULL,
+            full_name TEXT NOT NULL,
+            date_of_birth DATE,
+            gender TEXT,
+            phone_number TEXT,
+            address_line1 TEXT,
+            address_city TEXT,
+            address_postal_code TEXT,
+            join_date DATE NOT NULL,
+            current_status TEXT NOT NULL,
+            notes TEXT,
+            photo_filename TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS member_memberships (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            member_id INTEGER NOT NULL,
+            plan_key TEXT NOT NULL,
+            plan_name_at_purchase TEXT NOT NULL,
+            price_paid DECIMAL(10, 2) NOT NULL,
+            start_date DATE NOT NULL,
+            expiry_date DATE NOT NULL,
+            sessions_total INTEGER,
+            sessions_remaining INTEGER,
+            payment_transaction_id INTEGER,
+            is_current INTEGER DEFAULT 0,
+            notes TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (member_id) REFERENCES members(id) ON DELETE CASCADE,
+            FOREIGN KEY (payment_transaction_id) REFERENCES financial_transactions(id) ON DELETE SET NULL
+        )
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS member_attendance (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            member_id INTEGER NOT NULL,
+            membership_id INTEGER,
+            check_in_datetime TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            check_out_datetime TIMESTAMP,
+            attended_activity_name TEXT,
+            notes TEXT,
+            FOREIGN KEY (member_id) REFERENCES members(id) ON DELETE CASCADE,
+            FOREIGN KEY (membership_id) REFERENCES member_memberships(id) ON DELETE SET NULL
+        )
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS financial_transactions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            internal_transaction_id TEXT UNIQUE NOT NULL,
+            transaction_type TEXT NOT NULL CHECK(transaction_type IN ('income', 'expense')),
+            transaction_date DATE NOT NULL,
+            description TEXT NOT NULL,
+            category TEXT NOT NULL,
+            amount DECIMAL(10, 2) NOT NULL,
+            payment_method TEXT,
+            related_member_id INTEGER,
+            recorded_by_user_id INTEGER,
+            reference_document_number TEXT,
+            notes TEXT,
+            is_recurring_source INTEGER DEFAULT 0,
+            source_recurring_id INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (related_member_id) REFERENCES members(id) ON DELETE SET NULL,
+            FOREIGN KEY (recorded_by_user_id) REFERENCES system_users(id) ON DELETE SET NULL,
+            FOREIGN KEY (source_recurring_id) REFERENCES recurring_financial_items(id) ON DELETE SET NULL
+        )
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS recurring_financial_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            item_type TEXT NOT NULL CHECK(item_type IN ('income', 'expense')),
+            description TEXT NOT NULL,
+            default_amount DECIMAL(10, 2) NOT NULL,
+            category TEXT NOT NULL,
+            frequency TEXT NOT NULL,
+            day_of_month_to_process INTEGER,
+            day_of_week_to_process INTEGER,
+            start_date DATE NOT NULL,
+            end_date DATE,
+            next_due_date DATE NOT NULL,
+            is_active INTEGER DEFAULT 1,
+            auto_generate_transaction INTEGER DEFAULT 0,
+            related_member_id INTEGER,
+            notes TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (related_member_id) REFERENCES members(id) ON DELETE SET NULL
+        )
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS application_settings (
+            setting_key TEXT PRIMARY KEY NOT NULL,
+            setting_value TEXT,
+            value_data_type TEXT DEFAULT 'string' CHECK(value_data_type IN ('string', 'integer', 'float', 'boolean', 'json')),
+            description TEXT,
+            is_user_configurable INTEGER DEFAULT 1,
+            last_updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    tables_with_auto_update_timestamp = {
+        "system_users": ("id", "updated_at"),
+        "members": ("id", "updated_at"),
+        "financial_transactions": ("id", "updated_at"),
+        "recurring_financial_items": ("id", "updated_at"),
+        "application_settings": ("setting_key", "last_updated_at")
+    }
+
+    for table, (pk_col, ts_col) in tables_with_auto_update_timestamp.items():
+        trigger_name = f"trigger_update_{table}_{ts_col}"
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {trigger_name}
+            AFTER UPDATE ON {table}
+            FOR EACH ROW
+            BEGIN
+                UPDATE {table}
+                SET {ts_col} = CURRENT_TIMESTAMP
+                WHERE {pk_col} = OLD.{pk_col};
+            END;
+        """)
+
+
+def _migration_0002_hot_query_indexes(conn: sqlite3.Connection):
+    """
+    Índices para los accesos frecuentes de core_logic (ver benchmarks/check_query_plans.py)
+    y para las claves foráneas hijas, que SQLite consulta en cada borrado del padre.
+    """
+    index_definitions = [
+        # Listado de socios ordenado por nombre, opcionalmente filtrado por estado.
+        "CREATE INDEX IF NOT EXISTS idx_members_full_name ON members(full_name)",
+        "CREATE INDEX IF NOT EXISTS idx_members_status_full_name ON members(current_status, full_name)",
+        # Membresía activa de un socio e historial de membresías.
+        "CREATE INDEX IF NOT EXISTS idx_member_memberships_member_current ON member_memberships(member_id, is_current, expiry_date)",
+        "CREATE INDEX IF NOT EXISTS idx_member_memberships_member_start ON member_memberships(member_id, start_date)",
+        "CREATE INDEX IF NOT EXISTS idx_member_memberships_payment ON member_memberships(payment_transaction_id)",
+        # Asistencias por socio (y FK a la membresía).
+        "CREATE INDEX IF NOT EXISTS idx_member_attendance_member_checkin ON member_attendance(member_id, check_in_datetime)",
+        "CREATE INDEX IF NOT EXISTS idx_member_attendance_membership ON member_attendance(membership_id)",
+        # Listado de movimientos por fecha (el rowid/id va implícito al final del índice).
+        "CREATE INDEX IF NOT EXISTS idx_financial_transactions_date ON financial_transactions(transaction_date)",
+        # Índice de cobertura para los totales por tipo y rango de fechas (SUM(amount) sin tocar la tabla).
+        "CREATE INDEX IF NOT EXISTS idx_financial_transactions_type_date_amount ON financial_transactions(transaction_type, transaction_date, amount)",
+        "CREATE INDEX IF NOT EXISTS idx_financial_transactions_member ON financial_transactions(related_member_id)",
+        "CREATE INDEX IF NOT EXISTS idx_financial_transactions_recorded_by ON financial_transactions(recorded_by_user_id)",
+        "CREATE INDEX IF NOT EXISTS idx_financial_transactions_source_recurring ON financial_transactions(source_recurring_id)",
+        # Ítems recurrentes pendientes de procesar.
+        "CREATE INDEX IF NOT EXISTS idx_recurring_items_active_due ON recurring_financial_items(is_active, next_due_date)",
+        "CREATE INDEX IF NOT EXISTS idx_recurring_items_member ON recurring_financial_items(related_member_id)",
+    ]
+    for index_sql in index_definitions:
+        conn.execute(index_sql)
+
+
+def _migration_0003_members_full_text_search(conn: sqlite3.Connection):
+    """
+    Índice FTS5 de socios (nombre, ID interno, teléfono, ciudad, notas) sincronizado por triggers.
+    Si esta compilación de SQLite no trae FTS5 se omite: la búsqueda sigue funcionando con LIKE.
+    """
+    if not is_fts5_available(conn):
+        print("ADVERTENCIA (migrations.py): SQLite sin FTS5. La búsqueda de socios usará LIKE.")
+        return
+
+    # remove_diacritics 2: 'jose' encuentra 'José'. tokenchars '-': el ID 'MBR-3E99...' es un solo token.
+    # prefix '2 3': índices auxiliares para que las búsquedas por prefijo cortas no recorran todo el índice.
+    conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS members_fts USING fts5(
+            full_name, internal_member_id, phone_number, address_city, notes,
+            content='members', content_rowid='id',
+            tokenize="unicode61 remove_diacritics 2 tokenchars '-'",
+            prefix='2 3'
+        )
+    """)
+    indexed_columns = "full_name, internal_member_id, phone_number, address_city, notes"
+    new_values = "new.full_name, new.internal_member_id, new.phone_number, new.address_city, new.notes"
+    old_values = "old.full_name, old.internal_member_id, old.phone_number, old.address_city, old.notes"
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trigger_members_fts_insert AFTER INSERT ON members BEGIN
+            INSERT INTO members_fts(rowid, {indexed_columns}) VALUES (new.id, {new_values});
+        END;
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trigger_members_fts_delete AFTER DELETE ON members BEGIN
+            INSERT INTO members_fts(members_fts, rowid, {indexed_columns}) VALUES ('delete', old.id, {old_values});
+        END;
+    """)
+    # Solo las columnas indexadas: el trigger de updated_at no provoca reindexados.
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trigger_members_fts_update AFTER UPDATE OF {indexed_columns} ON members BEGIN
+            INSERT INTO members_fts(members_fts, rowid, {indexed_columns}) VALUES ('delete', old.id, {old_values});
+            INSERT INTO members_fts(rowid, {indexed_columns}) VALUES (new.id, {new_values});
+        END;
+    """)
+    # Indexar los socios ya existentes.
+    conn.execute("INSERT INTO members_fts(members_fts) VALUES ('rebuild')")
+
+
+def _migration_0004_members_normalized_name_keys(conn: sqlite3.Connection):
+    """
+    Columnas precalculadas con el nombre normalizado (búsqueda sin tildes/mayúsculas) y la clave de
+    orden alfabético español, rellenadas para los socios existentes e indexadas.
+    A partir de aquí las mantienen add_new_member/update_member_details.
+    """
+    existing_columns = {row[1] for row in conn.execute("PRAGMA table_info(members)")}
+    if "full_name_search_key" not in existing_columns:
+        conn.execute("ALTER TABLE members ADD COLUMN full_name_search_key TEXT NOT NULL DEFAULT ''")
+    if "full_name_sort_key" not in existing_columns:
+        conn.execute("ALTER TABLE members ADD COLUMN full_name_sort_key TEXT NOT NULL DEFAULT ''")
+
+    # Rellenar en SQL con las mismas funciones Python que usa la aplicación (una sola pasada).
+    conn.create_function("gym_search_key", 1, normalize_text_for_search, deterministic=True)
+    conn.create_function("gym_sort_key", 1, make_spanish_sort_key, deterministic=True)
+    with timestamp_triggers_suspended(conn, "members"): # Rellenar no es editar: updated_at no cambia
+        conn.execute("UPDATE members SET full_name_search_key = gym_search_key(full_name), full_name_sort_key = gym_sort_key(full_name)")
+
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_members_search_key ON members(full_name_search_key)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_members_sort_key ON members(full_name_sort_key)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_members_status_sort_key ON members(current_status, full_name_sort_key)")
+    # Los listados ya no ordenan por full_name: estos índices solo encarecerían las escrituras.
+    conn.execute("DROP INDEX IF EXISTS idx_members_full_name")
+    conn.execute("DROP INDEX IF EXISTS idx_members_status_full_name")
+
+
+def _migration_0005_transactions_keyset_index(conn: sqlite3.Connection):
+    """
+    Índice para paginar por (transaction_date, id) filtrando por tipo: con el id (rowid) implícito
+    justo detrás de la fecha, el orden sale del índice sin ordenar en memoria.
+    """
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_financial_transactions_type_date ON financial_transactions(transaction_type, transaction_date)")
+
+
+def _migration_0006_financial_summary_covering_index(conn: sqlite3.Connection):
+    """
+    Los resúmenes se calculan en una sola pasada con agregación condicional (ingresos y gastos a la vez).
+    Este índice lleva la fecha delante y todas las columnas agrupables detrás, así que cualquier resumen por
+    rango de fechas se resuelve sin leer la tabla. Sustituye al de (tipo, fecha, importe), que solo servía
+    para las dos sumas separadas por tipo.
+    """
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_financial_transactions_summary_cover ON financial_transactions("
+        "transaction_date, transaction_type, amount, category, payment_method, related_member_id)"
+    )
+    conn.execute("DROP INDEX IF EXISTS idx_financial_transactions_type_date_amount")
+
+
+# Una fila por (día, tipo, categoría, método de pago). Los NULL se guardan como '' para que formen parte
+# de la clave primaria (en SQLite dos NULL no colisionan y el UPSERT de los triggers no los agruparía).
+FINANCIAL_DAILY_ROLLUP_KEY_COLUMNS = "transaction_date, transaction_type, category, payment_method"
+
+def fill_financial_daily_rollup(conn: sqlite3.Connection):
+    """Recalcula financial_daily_rollup entera desde financial_transactions (sin abrir transacción propia)."""
+    conn.execute("DELETE FROM financial_daily_rollup")
+    conn.execute(f"""
+        INSERT INTO financial_daily_rollup ({FINANCIAL_DAILY_ROLLUP_KEY_COLUMNS}, amount_total, transaction_count)
+        SELECT transaction_date, transaction_type, IFNULL(category, ''), IFNULL(payment_method, ''), SUM(amount), COUNT(*)
+        FROM financial_transactions
+        GROUP BY transaction_date, transaction_type, IFNULL(category, ''), IFNULL(payment_method, '')
+    """)
+
+
+def _create_financial_daily_rollup_triggers(conn: sqlite3.Connection):
+    """Triggers que mantienen financial_daily_rollup al insertar, borrar o modificar movimientos."""
+    new_key = "new.transaction_date, new.transaction_type, IFNULL(new.category, ''), IFNULL(new.payment_method, '')"
+    old_key_match = ("transaction_date = old.transaction_date AND transaction_type = old.transaction_type"
+                     " AND category = IFNULL(old.category, '') AND payment_method = IFNULL(old.payment_method, '')")
+    add_new_row = f"""
+            INSERT INTO financial_daily_rollup ({FINANCIAL_DAILY_ROLLUP_KEY_COLUMNS}, amount_total, transaction_count)
+            VALUES ({new_key}, new.amount, 1)
+            ON CONFLICT ({FINANCIAL_DAILY_ROLLUP_KEY_COLUMNS}) DO UPDATE SET
+                amount_total = amount_total + excluded.amount_total,
+                transaction_count = transaction_count + 1;"""
+    remove_old_row = f"""
+            UPDATE financial_daily_rollup SET amount_total = amount_total - old.amount, transaction_count = transaction_count - 1
+            WHERE {old_key_match};
+            DELETE FROM financial_daily_rollup WHERE {old_key_match} AND transaction_count <= 0;"""
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trigger_financial_daily_rollup_insert AFTER INSERT ON financial_transactions BEGIN
+            {add_new_row}
+        END;
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trigger_financial_daily_rollup_delete AFTER DELETE ON financial_transactions BEGIN
+            {remove_old_row}
+        END;
+    """)
+    # Solo las columnas que forman parte del agregado (el trigger de updated_at no lo toca).
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trigger_financial_daily_rollup_update
+        AFTER UPDATE OF transaction_date, transaction_type, category, payment_method, amount ON financial_transactions BEGIN
+            {remove_old_row}
+            {add_new_row}
+        END;
+    """)
+
+
+def _migration_0007_financial_daily_rollup(conn: sqlite3.Connection):
+    """
+    Totales diarios materializados para que los resúmenes por rango de fechas no dependan del tamaño
+    del libro de transacciones. Los triggers los mantienen al insertar, borrar o modificar movimientos.
+    """
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS financial_daily_rollup (
+            transaction_date DATE NOT NULL,
+            transaction_type TEXT NOT NULL,
+            category TEXT NOT NULL DEFAULT '',
+            payment_method TEXT NOT NULL DEFAULT '',
+            amount_total REAL NOT NULL DEFAULT 0,
+            transaction_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY ({FINANCIAL_DAILY_ROLLUP_KEY_COLUMNS})
+        ) WITHOUT ROWID
+    """)
+    _create_financial_daily_rollup_triggers(conn)
+    fill_financial_daily_rollup(conn)
+
+
+# Columnas de importes que pasan de DECIMAL(10, 2) (REAL en SQLite) a céntimos enteros: (tabla, columna).
+MONEY_COLUMNS = (
+    ("financial_transactions", "amount"),
+    ("recurring_financial_items", "default_amount"),
+    ("member_memberships", "price_paid"),
+    ("financial_daily_rollup", "amount_total"),
+)
+
+def _migration_0008_money_as_integer_cents(conn: sqlite3.Connection):
+    """
+    Importes en céntimos enteros (tipo declarado MONEY_CENTS INTEGER). SQLite no permite cambiar el tipo de
+    una columna: se añade una nueva, se rellena redondeando, se borra la antigua y se renombra la nueva.
+    Antes hay que quitar el índice y los triggers que usan 'amount' (DROP COLUMN no lo permite) y después
+    se recrean igual. El rollup se recalcula desde el libro ya convertido.
+    """
+    conn.execute("DROP INDEX IF EXISTS idx_financial_transactions_summary_cover")
+    for trigger_name in ("trigger_financial_daily_rollup_insert", "trigger_financial_daily_rollup_delete",
+                         "trigger_financial_daily_rollup_update"):
+        conn.execute(f"DROP TRIGGER IF EXISTS {trigger_name}")
+
+    for table_name, column_name in MONEY_COLUMNS:
+        cents_column = f"{column_name}_cents"
+        conn.execute(f"ALTER TABLE {table_name} ADD COLUMN {cents_column} {MONEY_SQL_TYPE} INTEGER NOT NULL DEFAULT 0")
+        with timestamp_triggers_suspended(conn, table_name): # La conversión no cuenta como edición de la fila
+            conn.execute(f"UPDATE {table_name} SET {cents_column} = CAST(ROUND({column_name} * 100) AS INTEGER)")
+        conn.execute(f"ALTER TABLE {table_name} DROP COLUMN {column_name}")
+        conn.execute(f"ALTER TABLE {table_name} RENAME COLUMN {cents_column} TO {column_name}")
+
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_financial_transactions_summary_cover ON financial_transactions("
+        "transaction_date, transaction_type, amount, category, payment_method, related_member_id)"
+    )
+    _create_financial_daily_rollup_triggers(conn)
+    fill_financial_daily_rollup(conn)
+
+
+def _migration_0009_memberships_expiry_index(conn: sqlite3.Connection):
+    """
+    Membresías por fecha de caducidad (previsión de renovaciones y tasa histórica de renovación por plan)
+    sin recorrer la tabla entera. Es de cobertura: ambas consultas se resuelven sin leer las filas de la tabla.
+    """
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_member_memberships_expiry ON member_memberships("
+        "expiry_date, plan_key, member_id, start_date, price_paid, is_current)"
+    )
+
+
+# Tablas cuyos cambios anota data_change_log (lo que otros PCs necesitan saber para refrescar sus pantallas).
+CHANGE_LOG_TABLES = (
+    "system_users", "members", "member_memberships", "member_attendance",
+    "financial_transactions", "recurring_financial_items",
+)
+
+def _migration_0010_data_change_log(conn: sqlite3.Connection):
+    """
+    Un contador por tabla que los triggers incrementan en cada INSERT, UPDATE o DELETE. Cuando
+    PRAGMA data_version indica que otra conexión escribió, comparar estos contadores dice qué tablas
+    cambiaron sin tener que recargarlo todo (ver database.poll_database_changes).
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS data_change_log (
+            table_name TEXT PRIMARY KEY,
+            change_count INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    """)
+    conn.executemany("INSERT OR IGNORE INTO data_change_log (table_name) VALUES (?)",
+                     [(table_name,) for table_name in CHANGE_LOG_TABLES])
+    for table_name in CHANGE_LOG_TABLES:
+        for operation in ("INSERT", "UPDATE", "DELETE"):
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trigger_data_change_log_{table_name}_{operation.lower()}
+                AFTER {operation} ON {table_name} BEGIN
+                    UPDATE data_change_log SET change_count = change_count + 1 WHERE table_name = '{table_name}';
+                END;
+            """)
+
+
+# (versión, descripción, función) en orden estrictamente creciente.
+MIGRATIONS = [
+    (1, "Esquema inicial (tablas y triggers de updated_at)", _migration_0001_initial_schema),
+    (2, "Índices para las consultas frecuentes", _migration_0002_hot_query_indexes),
+    (3, "Búsqueda de socios con FTS5", _migration_0003_members_full_text_search),
+    (4, "Claves normalizadas de búsqueda y orden del nombre de socio", _migration_0004_members_normalized_name_keys),
+    (5, "Índice para la paginación por cursor de transacciones", _migration_0005_transactions_keyset_index),
+    (6, "Índice de cobertura para los resúmenes financieros agrupados", _migration_0006_financial_summary_covering_index),
+    (7, "Totales financieros diarios materializados (financial_daily_rollup)", _migration_0007_financial_daily_rollup),
+    (8, "Importes en céntimos enteros", _migration_0008_money_as_integer_cents),
+    (9, "Índice de membresías por fecha de caducidad", _migration_0009_memberships_expiry_index),
+    (10, "Registro de cambios por tabla (data_change_log)", _migration_0010_data_change_log),
+]
+
+LATEST_SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+# --- MOTOR DE MIGRACIONES ---
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """Versión del esquema aplicada en la BD (0 = BD nueva o anterior al sistema de migraciones)."""
+    return conn.execute("PRAGMA user_version;").fetchone()[0]
+
+
+def apply_pending_migrations(conn: sqlite3.Connection) -> tuple[bool, str]:
+    """
+    Aplica, en orden, las migraciones con versión mayor que la actual.
+    Cada migración se ejecuta en su propia transacción junto con la actualización de user_version,
+    de modo que un fallo deja la BD en la última versión completada.
+    """
+    current_version = get_schema_version(conn)
+    if current_version > LATEST_SCHEMA_VERSION:
+        return True, (f"La BD está en la versión {current_version}, más reciente que la de la aplicación "
+                      f"({LATEST_SCHEMA_VERSION}). Actualice la aplicación.")
+
+    applied = []
+    for version, description, migration_func in MIGRATIONS:
+        if version <= current_version:
+            continue
+        conn.execute("BEGIN IMMEDIATE;")
+        try:
+            # Releer dentro del bloqueo: otro PC puede haber aplicado la migración mientras esperábamos.
+            if get_schema_version(conn) >= version:
+                conn.commit()
+                continue
+            migration_func(conn)
+            conn.execute(f"PRAGMA user_version = {int(version)};")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        print(f"INFO (migrations.py): Migración {version} aplicada: {description}.")
+        applied.append(version)
+
+    if not applied:
+        return True, f"Esquema ya actualizado (versión {get_schema_version(conn)})."
+    return True, f"Migraciones aplicadas: {', '.join(str(v) for v in applied)}. Versión actual: {LATEST_SCHEMA_VERSION}."
@@ -0,0 +1,207 @@
+# gimnasio_mgmt_gui/core_logic/query_cache.py
+# Caché de resultados de las consultas de lectura más repetidas de core_logic (listados de socios,
+# resúmenes financieros, ítems recurrentes, usuarios del sistema).
+#
+# Cada tabla tiene un contador de generación. Las escrituras de core_logic llaman a
+# mark_tables_changed(...) dentro de su transacción y el contador de esas tablas avanza (al escribir y
+# otra vez tras el commit, para que ningún otro hilo se quede con lo leído entre medias). Un resultado
+# guardado se reutiliza mientras no se mueva la generación de ninguna de las tablas de las que depende.
+#
+# Los cambios hechos desde otro PC (u otra conexión) no pasan por aquí: se detectan con
+# PRAGMA data_version, que SQLite cambia cuando otra conexión confirma una escritura. Como no dice qué
+# tablas cambiaron, avanza la generación externa, de la que dependen todos los resultados.
+
+import functools
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import date
+
+try:
+    from .database import get_db_connection, is_inside_unit_of_work, call_after_commit
+    from config import QUERY_RESULT_CACHE_MAX_ENTRIES, QUERY_RESULT_CACHE_MAX_ROWS
+except ImportError as e:
+    print(f"ERROR CRÍTICO (query_cache.py): Fallo en importaciones esenciales. Error: {e}")
+    raise
+
+_cache_lock = threading.Lock()
+_table_generations: dict[str, int] = {}
+_external_generation = 0
+# (función, argumentos) -> (generación externa, generaciones de sus tablas, filas, resultado)
+_cached_results: OrderedDict[tuple, tuple] = OrderedDict()
+_cached_row_count = 0
+_cache_stats = {"hits": 0, "misses": 0, "stale": 0, "evictions": 0, "external_changes": 0, "skipped": 0}
+_thread_state = threading.local() # skip_caching: la lectura en curso falló y su resultado no se guarda
+
+
+# --- GENERACIONES ---
+def _bump_generations(table_names: tuple[str, ...]):
+    with _cache_lock:
+        for table_name in table_names:
+            _table_generations[table_name] = _table_generations.get(table_name, 0) + 1
+
+def mark_tables_changed(*table_names: str):
+    """
+    Las escrituras de core_logic la llaman con las tablas que modifican. Invalida ya mismo los resultados
+    que dependen de ellas y otra vez tras el commit de la unidad de trabajo abierta (si la hay).
+    """
+    _bump_generations(table_names)
+    call_after_commit(lambda: _bump_generations(table_names))
+
+def get_external_generation() -> int:
+    """
+    Generación de los cambios hechos fuera de este proceso (u otra conexión): consulta PRAGMA data_version
+    en la conexión del hilo y la avanza si cambió desde la última vez. Una conexión nueva (primer uso del
+    hilo o cambio de BD) también la avanza: no se sabe qué pasó antes de abrirla.
+    """
+    global _external_generation
+    conn = get_db_connection()
+    if not conn:
+        return _external_generation
+    try:
+        data_version = conn.execute("PRAGMA data_version;").fetchone()[0]
+    except sqlite3.Error as e:
+        print(f"ERROR (query_cache.py - get_external_generation): {e}")
+        data_version = None
+    finally:
+        conn.close()
+    if data_version is None or data_version != conn.last_seen_data_version:
+        conn.last_seen_data_version = data_version
+        with _cache_lock:
+            _external_generation += 1
+            _cache_stats["external_changes"] += 1
+    return _external_generation
+
+def _current_generations(table_names: tuple[str, ...]) -> tuple[int, ...]:
+    return tuple(_table_generations.get(table_name, 0) for table_name in table_names)
+
+
+# --- RESULTADOS ---
+def _freeze_argument(value):
+    """Argumento hashable para la clave (las listas de dimensiones llegan como list)."""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze_argument(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze_argument(item)) for key, item in value.items()))
+    return value
+
+def _copy_result(result):
+    """Copia superficial: quien llama puede ordenar o recortar su lista sin tocar la guardada."""
+    if isinstance(result, list):
+        return list(result)
+    if isinstance(result, dict):
+        return {key: list(value) if isinstance(value, list) else value for key, value in result.items()}
+    return result
+
+def _result_row_count(result) -> int:
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, dict):
+        return max((len(value) for value in result.values() if isinstance(value, list)), default=1)
+    return 1
+
+def skip_result_caching():
+    """
+    Las funciones con @cached_query la llaman cuando la lectura falla (sin conexión, error de BD, consulta
+    interrumpida): devuelven su valor vacío de siempre, pero no se guarda. Si la llamó una función cacheada
+    usada dentro de otra, tampoco se guarda el resultado de la de fuera.
+    """
+    _thread_state.skip_caching = True
+
+def _store_result(key: tuple, entry: tuple):
+    global _cached_row_count
+    with _cache_lock:
+        previous = _cached_results.pop(key, None)
+        if previous is not None:
+            _cached_row_count -= previous[2]
+        _cached_results[key] = entry
+        _cached_row_count += entry[2]
+        while _cached_results and (len(_cached_results) > QUERY_RESULT_CACHE_MAX_ENTRIES
+                                   or _cached_row_count > QUERY_RESULT_CACHE_MAX_ROWS):
+            _, evicted = _cached_results.popitem(last=False)
+            _cached_row_count -= evicted[2]
+            _cache_stats["evictions"] += 1
+
+def cached_query(*table_names: str, depends_on_today: bool = False):
+    """
+    Decorador para funciones de lectura de core_logic: guarda el resultado por (función, argumentos) y lo
+    devuelve mientras no cambien las tablas indicadas ni la BD desde fuera. Con depends_on_today=True la
+    fecha de hoy forma parte de la clave (consultas con date('now')). No se guarda lo leído dentro de una
+    unidad de trabajo ni el resultado de una lectura fallida (la función llama a skip_result_caching()):
+    un resultado vacío puede ser un error y no se distingue por su valor.
+    """
+    def decorator(func):
+        function_name = f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if is_inside_unit_of_work():
+                return func(*args, **kwargs)
+            key = (function_name, _freeze_argument(args), _freeze_argument(kwargs),
+                   date.today() if depends_on_today else None)
+            external_generation = get_external_generation()
+            with _cache_lock:
+                generations = _current_generations(table_names)
+                entry = _cached_results.get(key)
+                if entry is not None and entry[0] == external_generation and entry[1] == generations:
+                    _cached_results.move_to_end(key)
+                    _cache_stats["hits"] += 1
+                    return _copy_result(entry[3])
+                _cache_stats["stale" if entry is not None else "misses"] += 1
+            outer_skip_caching = getattr(_thread_state, "skip_caching", False)
+            _thread_state.skip_caching = False
+            try:
+                result = func(*args, **kwargs)
+            finally:
+                read_failed = _thread_state.skip_caching
+                _thread_state.skip_caching = outer_skip_caching or read_failed
+            if read_failed:
+                with _cache_lock:
+                    _cache_stats["skipped"] += 1
+            else:
+                # Generaciones de ANTES de consultar: si alguien escribe mientras tanto, el resultado ya nace caducado.
+                _store_result(key, (external_generation, generations, _result_row_count(result), _copy_result(result)))
+            return result
+        wrapper.cached_table_names = table_names
+        return wrapper
+    return decorator
+
+def clear_query_cache():
+    """Descarta todos los resultados guardados."""
+    global _cached_row_count
+    with _cache_lock:
+        _cached_results.clear()
+        _cached_row_count = 0
+
+def get_query_cache_stats() -> dict:
+    """Aciertos, fallos, resultados caducados, descartes, cambios externos y tamaño actual."""
+    with _cache_lock:
+        stats = dict(_cache_stats)
+        stats["entries"] = len(_cached_results)
+        stats["rows"] = _cached_row_count
+        stats["table_generations"] = dict(_table_generations)
+    return stats
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+    from .database import set_database_path, create_or_verify_tables
+    set_database_path(os.path.join(tempfile.mkdtemp(prefix="gym_query_cache_"), "gym.db"))
+    create_or_verify_tables()
+
+    calls = []
+    @cached_query("members")
+    def list_member_names():
+        calls.append(1)
+        return [row[0] for row in get_db_connection().execute("SELECT full_name FROM members")]
+
+    conn = get_db_connection()
+    conn.execute("INSERT INTO members (internal_member_id, full_name, join_date, current_status) VALUES ('MBR-1', 'Ana', '2024-01-01', 'Activo')"); conn.commit()
+    print(list_member_names(), list_member_names(), "consultas:", len(calls))
+    mark_tables_changed("members")
+    print(list_member_names(), "tras mark_tables_changed:", len(calls))
+    other_conn = sqlite3.connect(conn.execute("PRAGMA database_list").fetchone()[2]) # Simula otro PC
+    other_conn.execute("UPDATE members SET full_name = 'Ana (otro PC)'"); other_conn.commit(); other_conn.close()
+    print(list_member_names(), "tras escritura externa:", len(calls))
+    print(get_query_cache_stats())
@@ -0,0 +1,271 @@
+# gimnasio_mgmt_gui/core_logic/records.py
+# Registros compactos para los listados de core_logic (socios, membresías, transacciones, ítems
+# recurrentes y usuarios del sistema).
+#
+# Cada registro guarda solo la tupla de valores de la fila y una referencia al índice de columnas,
+# compartido por todas las filas de la misma consulta: sin dict por fila ni claves repetidas.
+# Los campos derivados (*_obj, *_decimal, *_ui) se calculan al leerlos, no al cargar la fila.
+#
+# Compatibilidad: los registros son Mapping de solo lectura, así que el código que trataba las filas
+# como dict (registro['clave'], registro.get('clave'), dict(registro)) sigue funcionando sin cambios.
+
+import sqlite3
+from collections.abc import Mapping
+from datetime import date, datetime
+from decimal import Decimal
+
+from .utils import format_date_for_ui, format_datetime_for_ui
+
+
+class _DerivedField(property):
+    """Propiedad calculada a partir de una columna; solo existe como clave si la consulta trae esa columna."""
+    def __init__(self, source_column: str, compute=None):
+        super().__init__(lambda record: record._derive(source_column, compute))
+        self.source_column = source_column
+
+def _alias(column_name: str) -> _DerivedField:
+    """Campo derivado que solo renombra una columna (claves antiguas como join_date_obj o amount_decimal)."""
+    return _DerivedField(column_name)
+
+def _date_for_ui(column_name: str) -> _DerivedField:
+    """Fecha de la columna formateada para la UI; se calcula solo si alguien la lee."""
+    return _DerivedField(column_name, format_date_for_ui)
+
+def _datetime_for_ui(column_name: str) -> _DerivedField:
+    return _DerivedField(column_name, format_datetime_for_ui)
+
+
+class RowRecord(Mapping):
+    """
+    Fila de resultado de solo lectura. Acceso por atributo (registro.full_name) o como dict
+    (registro['full_name']). Las columnas declaradas en la clase que la consulta no seleccionó
+    valen None como atributo y no aparecen como clave, igual que en el dict(row) anterior.
+    """
+    __slots__ = ("_values", "_columns")
+
+    _FIELD_NAMES: frozenset = frozenset()   # Columnas anotadas en la clase (y sus bases)
+    _DERIVED_FIELDS: dict = {}              # Campo derivado -> columna de la que sale
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        field_names, derived_fields = set(), {}
+        for klass in reversed(cls.__mro__):
+            field_names.update(getattr(klass, "__annotations__", {}))
+            derived_fields.update((name, attr.source_column) for name, attr in vars(klass).items()
+                                  if isinstance(attr, _DerivedField))
+        cls._FIELD_NAMES = frozenset(name for name in field_names if not name.startswith("_"))
+        cls._DERIVED_FIELDS = derived_fields
+
+    def __init__(self, values: tuple, columns: dict[str, int]):
+        self._values = values
+        self._columns = columns
+
+    @classmethod
+    def fetch_all(cls, cursor: sqlite3.Cursor) -> list:
+        """Lee todas las filas pendientes del cursor como registros de esta clase."""
+        cursor.row_factory = None # Tuplas simples: sqlite3.Row añadiría un objeto más por fila
+        columns = {description[0]: position for position, description in enumerate(cursor.description)}
+        return [cls(values, columns) for values in cursor.fetchall()]
+
+    @classmethod
+    def fetch_one(cls, cursor: sqlite3.Cursor):
+        """Primera fila pendiente del cursor como registro, o None si no hay ninguna."""
+        cursor.row_factory = None
+        values = cursor.fetchone()
+        if values is None:
+            return None
+        return cls(values, {description[0]: position for position, description in enumerate(cursor.description)})
+
+    def _derive(self, column_name: str, compute):
+        position = self._columns.get(column_name)
+        value = None if position is None else self._values[position]
+        return value if compute is None else compute(value)
+
+    def _derived_keys(self):
+        return [name for name, source in self._DERIVED_FIELDS.items() if source in self._columns]
+
+    def __getattr__(self, name: str):
+        # Solo se llama si el atributo no es un slot ni una propiedad de la clase.
+        if name.startswith("_"):
+            raise AttributeError(name)
+        position = self._columns.get(name)
+        if position is not None:
+            return self._values[position]
+        if name in self._FIELD_NAMES:
+            return None
+        raise AttributeError(f"'{type(self).__name__}' no tiene el campo '{name}'")
+
+    # --- Compatibilidad con dict ---
+    def __getitem__(self, key: str):
+        position = self._columns.get(key)
+        if position is not None:
+            return self._values[position]
+        if self._DERIVED_FIELDS.get(key) in self._columns:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def get(self, key: str, default=None):
+        position = self._columns.get(key)
+        if position is not None:
+            return self._values[position]
+        if self._DERIVED_FIELDS.get(key) in self._columns:
+            return getattr(self, key)
+        return default
+
+    def __contains__(self, key) -> bool:
+        return key in self._columns or self._DERIVED_FIELDS.get(key) in self._columns
+
+    def __iter__(self):
+        yield from self._columns
+        yield from self._derived_keys()
+
+    def __len__(self) -> int:
+        return len(self._columns) + len(self._derived_keys())
+
+    def to_dict(self) -> dict:
+        """Copia como dict mutable (incluye los campos derivados)."""
+        return dict(self.items())
+
+    def __repr__(self) -> str:
+        columns = ", ".join(f"{name}={self._values[position]!r}" for name, position in self._columns.items())
+        return f"{type(self).__name__}({columns})"
+
+
+class Member(RowRecord):
+    """Socio: fila completa de members, el resumen de los listados o el resumen con su membresía activa."""
+    __slots__ = ()
+    id: int
+    internal_member_id: str
+    full_name: str
+    date_of_birth: date | None
+    gender: str | None
+    phone_number: str | None
+    address_line1: str | None
+    address_city: str | None
+    address_postal_code: str | None
+    join_date: date
+    current_status: str
+    notes: str | None
+    photo_filename: str | None
+    full_name_search_key: str
+    full_name_sort_key: str
+    created_at: datetime
+    updated_at: datetime
+    # Solo en get_members_summary_with_active_membership
+    active_membership_id: int | None
+    active_plan_key: str | None
+    active_plan_name: str | None
+    active_start_date: date | None
+    active_expiry_date: date | None
+    # Solo en search_members (menor = más relevante)
+    search_rank: float | None
+
+    date_of_birth_obj = _alias("date_of_birth")
+    join_date_obj = _alias("join_date")
+    join_date_ui = _date_for_ui("join_date")
+    active_start_date_obj = _alias("active_start_date")
+    active_expiry_date_obj = _alias("active_expiry_date")
+
+
+class Membership(RowRecord):
+    """Membresía de un socio (fila de member_memberships)."""
+    __slots__ = ()
+    id: int
+    member_id: int
+    plan_key: str
+    plan_name_at_purchase: str
+    start_date: date
+    expiry_date: date
+    price_paid: Decimal
+    payment_transaction_id: int | None
+    sessions_total: int | None
+    sessions_remaining: int | None
+    is_current: int
+    notes: str | None
+    created_at: datetime
+
+    start_date_obj = _alias("start_date")
+    expiry_date_obj = _alias("expiry_date")
+    price_paid_decimal = _alias("price_paid")
+
+
+class Transaction(RowRecord):
+    """Movimiento del libro financiero con el nombre del socio y del usuario que lo registró."""
+    __slots__ = ()
+    id: int
+    internal_transaction_id: str
+    transaction_type: str
+    transaction_date: date
+    description: str
+    category: str
+    amount: Decimal
+    payment_method: str | None
+    related_member_id: int | None
+    recorded_by_user_id: int | None
+    reference_document_number: str | None
+    is_recurring_source: int
+    source_recurring_id: int | None
+    notes: str | None
+    created_at: datetime
+    updated_at: datetime
+    # Columnas unidas en los listados
+    member_name: str | None
+    recorded_by_username: str | None
+
+    transaction_date_obj = _alias("transaction_date")
+    transaction_date_ui = _date_for_ui("transaction_date")
+    amount_decimal = _alias("amount")
+
+
+class RecurringItem(RowRecord):
+    """Ingreso o gasto recurrente (fila de recurring_financial_items)."""
+    __slots__ = ()
+    id: int
+    item_type: str
+    description: str
+    default_amount: Decimal
+    category: str
+    frequency: str
+    day_of_month_to_process: int | None
+    day_of_week_to_process: int | None
+    start_date: date
+    next_due_date: date
+    end_date: date | None
+    related_member_id: int | None
+    is_active: int
+    auto_generate_transaction: int
+    notes: str | None
+    created_at: datetime
+    updated_at: datetime
+
+    default_amount_decimal = _alias("default_amount")
+    start_date_obj = _alias("start_date")
+    next_due_date_obj = _alias("next_due_date")
+    end_date_obj = _alias("end_date")
+    next_due_date_ui = _date_for_ui("next_due_date")
+
+
+class SystemUser(RowRecord):
+    """Usuario del sistema, sin el hash de la contraseña."""
+    __slots__ = ()
+    id: int
+    username: str
+    role: str
+    is_active: int
+    last_login_at: datetime | None
+    created_at: datetime
+    updated_at: datetime
+
+    last_login_at_ui = _datetime_for_ui("last_login_at")
+
+
+if __name__ == "__main__":
+    from . import database # Registra los conversores DATE / MONEY_CENTS
+    conn = sqlite3.connect(":memory:", detect_types=sqlite3.PARSE_DECLTYPES)
+    conn.execute("CREATE TABLE members (id INTEGER PRIMARY KEY, full_name TEXT, join_date DATE)")
+    conn.execute("INSERT INTO members (full_name, join_date) VALUES ('Ana Díaz', '2024-03-04')")
+    member = Member.fetch_one(conn.execute("SELECT id, full_name, join_date FROM members"))
+    print(member)
+    print("Atributo:", member.full_name, "| Clave:", member['join_date_obj'], "| UI:", member.join_date_ui)
+    print("No seleccionada:", member.phone_number, member.get('phone_number', '-'), 'phone_number' in member)
+    print("dict():", dict(member))
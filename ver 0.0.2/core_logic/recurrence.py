@@ -0,0 +1,180 @@
+# gimnasio_mgmt_gui/core_logic/recurrence.py
+# Calendario de los ítems financieros recurrentes: todas las frecuencias de config.VALID_FREQUENCIES.
+#
+# Las fechas se calculan siempre a partir de la fecha de inicio del ítem (ocurrencia n = inicio + n
+# periodos), nunca sumando un periodo a la fecha anterior: así un "día 31" mensual no se queda en el
+# 28 después de febrero y los periodos no acumulan desfase.
+#
+# Reglas:
+#   - daily / weekly / bi-weekly: pasos de 1, 7 y 14 días. Con day_of_week (0 = lunes ... 6 = domingo)
+#     la primera ocurrencia es el primer día de esa semana a partir del inicio; sin él, el propio inicio.
+#   - monthly / quarterly / semi-annually / annually: pasos de 1, 3, 6 y 12 meses el día day_of_month
+#     (o el día de la fecha de inicio), recortado al último día del mes cuando ese mes es más corto.
+#     La primera ocurrencia es la primera de esas fechas que no es anterior al inicio.
+#
+# Cada definición (frecuencia, inicio, día del mes, día de la semana) tiene un calendario memorizado
+# que va guardando las fechas ya calculadas: la previsión y el proceso por lotes piden ventanas de
+# fechas y nunca recalculan un tramo que ya se calculó para otro uso.
+
+import bisect
+import calendar
+import threading
+from datetime import date, timedelta
+from functools import lru_cache
+
+try:
+    from config import VALID_FREQUENCIES
+except ImportError as e:
+    print(f"ERROR CRÍTICO (recurrence.py): No se pudo importar config. Error: {e}")
+    raise
+
+DAY_STEP_FREQUENCIES = {'daily': 1, 'weekly': 7, 'bi-weekly': 14}
+MONTH_STEP_FREQUENCIES = {'monthly': 1, 'quarterly': 3, 'semi-annually': 6, 'annually': 12}
+_WEEKLY_FREQUENCIES = ('weekly', 'bi-weekly')
+_RECURRENCE_CACHE_MAX_SCHEDULES = 4096  # Definiciones distintas memorizadas (LRU)
+
+
+class RecurrenceSchedule:
+    """
+    Fechas de una definición de recurrencia, calculadas bajo demanda y memorizadas en orden.
+    Es compartido entre hilos (lo devuelve la caché): las ampliaciones se hacen con un lock.
+    """
+    __slots__ = ("frequency", "start_date", "_day_step", "_month_step", "_anchor_day", "_first_month_index",
+                 "_dates", "_lock")
+
+    def __init__(self, frequency: str, start_date: date, day_of_month: int | None, day_of_week: int | None):
+        self.frequency = frequency
+        self.start_date = start_date
+        self._day_step = DAY_STEP_FREQUENCIES.get(frequency)
+        self._month_step = MONTH_STEP_FREQUENCIES.get(frequency)
+        self._dates: list[date] = []
+        self._lock = threading.Lock()
+        if self._day_step:
+            first_date = start_date
+            if frequency in _WEEKLY_FREQUENCIES and day_of_week is not None:
+                first_date += timedelta(days=(day_of_week - start_date.weekday()) % 7)
+            self._anchor_day = first_date.toordinal()
+        else:
+            self._anchor_day = day_of_month if day_of_month else start_date.day
+            month_index = start_date.year * 12 + start_date.month - 1
+            if self._month_date(month_index) < start_date: # El día pedido de ese mes ya había pasado
+                month_index += self._month_step
+            self._first_month_index = month_index
+
+    def _month_date(self, month_index: int) -> date:
+        year, month = divmod(month_index, 12)
+        return date(year, month + 1, min(self._anchor_day, calendar.monthrange(year, month + 1)[1]))
+
+    def occurrence(self, position: int) -> date:
+        """Ocurrencia número `position` (0 = la primera), calculada desde el inicio."""
+        if self._day_step:
+            return date.fromordinal(self._anchor_day + position * self._day_step)
+        return self._month_date(self._first_month_index + position * self._month_step)
+
+    def _extend_through(self, last_date: date) -> list[date]:
+        """Amplía las fechas memorizadas hasta pasar last_date y devuelve la lista (compartida)."""
+        dates = self._dates
+        if dates and dates[-1] > last_date:
+            return dates
+        with self._lock:
+            position = len(dates)
+            try:
+                while not dates or dates[-1] <= last_date:
+                    dates.append(self.occurrence(position)); position += 1
+            except (ValueError, OverflowError): # Más allá de date.max: no hay más ocurrencias
+                pass
+        return dates
+
+    def between(self, window_start: date, window_end: date) -> list[date]:
+        """Ocurrencias dentro de [window_start, window_end], ambos incluidos."""
+        if window_end < window_start:
+            return []
+        dates = self._extend_through(window_end)
+        return dates[bisect.bisect_left(dates, window_start):bisect.bisect_right(dates, window_end)]
+
+    def next_after(self, after_date: date) -> date | None:
+        """Primera ocurrencia estrictamente posterior a after_date."""
+        dates = self._extend_through(after_date)
+        position = bisect.bisect_right(dates, after_date)
+        return dates[position] if position < len(dates) else None
+
+    def first_on_or_after(self, from_date: date) -> date | None:
+        """Primera ocurrencia igual o posterior a from_date."""
+        return self.next_after(from_date - timedelta(days=1)) if from_date > date.min else self.occurrence(0)
+
+
+@lru_cache(maxsize=_RECURRENCE_CACHE_MAX_SCHEDULES)
+def _cached_schedule(frequency: str, start_date: date, day_of_month: int | None, day_of_week: int | None) -> RecurrenceSchedule:
+    return RecurrenceSchedule(frequency, start_date, day_of_month, day_of_week)
+
+
+def get_recurrence_schedule(
+    frequency: str, start_date: date, day_of_month: int | None = None, day_of_week: int | None = None
+) -> RecurrenceSchedule | None:
+    """
+    Calendario memorizado de una definición de recurrencia. None si la frecuencia no es válida o los
+    días indicados están fuera de rango. Solo se tienen en cuenta los ajustes que afectan a la frecuencia
+    (day_of_month en las mensuales y superiores, day_of_week en las semanales), para que dos ítems
+    equivalentes compartan calendario.
+    """
+    if frequency not in VALID_FREQUENCIES or not isinstance(start_date, date):
+        print(f"ADVERTENCIA (recurrence.py): Frecuencia '{frequency}' o fecha de inicio '{start_date}' no válida.")
+        return None
+    if frequency in MONTH_STEP_FREQUENCIES:
+        if day_of_month is not None and not 1 <= day_of_month <= 31: return None
+        day_of_week = None
+    else:
+        if frequency in _WEEKLY_FREQUENCIES and day_of_week is not None and not 0 <= day_of_week <= 6: return None
+        day_of_month = None
+        if frequency not in _WEEKLY_FREQUENCIES: day_of_week = None
+    return _cached_schedule(frequency, start_date, day_of_month or None, day_of_week)
+
+
+def expand_occurrences(
+    frequency: str, start_date: date, window_start: date, window_end: date,
+    day_of_month: int | None = None, day_of_week: int | None = None
+) -> list[date]:
+    """Todas las fechas de la recurrencia entre window_start y window_end (incluidos), en una llamada."""
+    schedule = get_recurrence_schedule(frequency, start_date, day_of_month, day_of_week)
+    return schedule.between(window_start, window_end) if schedule else []
+
+
+def next_occurrence_after(
+    frequency: str, start_date: date, after_date: date,
+    day_of_month: int | None = None, day_of_week: int | None = None
+) -> date | None:
+    """Primera fecha de la recurrencia posterior a after_date (la primera de todas si after_date es anterior al inicio)."""
+    schedule = get_recurrence_schedule(frequency, start_date, day_of_month, day_of_week)
+    return schedule.next_after(after_date) if schedule else None
+
+
+def first_occurrence_on_or_after(
+    frequency: str, start_date: date, from_date: date | None = None,
+    day_of_month: int | None = None, day_of_week: int | None = None
+) -> date | None:
+    """Primera fecha de la recurrencia igual o posterior a from_date (por defecto, el inicio)."""
+    schedule = get_recurrence_schedule(frequency, start_date, day_of_month, day_of_week)
+    return schedule.first_on_or_after(from_date or start_date) if schedule else None
+
+
+def clear_recurrence_cache():
+    """Olvida los calendarios memorizados (p. ej. en pruebas o tras editar muchos ítems)."""
+    _cached_schedule.cache_clear()
+
+
+def get_recurrence_cache_info():
+    """Estadísticas de la caché de calendarios (aciertos, fallos, tamaño)."""
+    return _cached_schedule.cache_info()
+
+
+if __name__ == "__main__":
+    print("--- Probando recurrence.py ---")
+    start = date(2024, 1, 31)
+    print("Mensual día 31:", [d.isoformat() for d in expand_occurrences('monthly', start, start, date(2024, 6, 30))])
+    print("Trimestral:", [d.isoformat() for d in expand_occurrences('quarterly', start, start, date(2025, 1, 31))])
+    print("Anual 29/02:", [d.isoformat() for d in expand_occurrences('annually', date(2024, 2, 29), date(2024, 1, 1), date(2028, 12, 31))])
+    print("Quincenal (viernes):", [d.isoformat() for d in expand_occurrences('bi-weekly', date(2024, 1, 1), date(2024, 1, 1), date(2024, 2, 29), day_of_week=4)])
+    print("Siguiente diaria tras 2024-03-10:", next_occurrence_after('daily', start, date(2024, 3, 10)))
+    print("Primera mensual día 15 desde 2024-01-31:", first_occurrence_on_or_after('monthly', start, day_of_month=15))
+    print("Frecuencia no válida:", expand_occurrences('hourly', start, start, date(2024, 2, 1)))
+    print("Caché:", get_recurrence_cache_info())
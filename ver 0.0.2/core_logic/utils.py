@@ -2,11 +2,11 @@
 # Módulo de funciones de utilidad generales para la aplicación GymManager Pro.
 
 import hashlib
-import uuid
 from datetime import datetime, date, timedelta
 import re # Para expresiones regulares (validación de formatos)
 import os # Para operaciones del sistema de archivos (ej. asegurar directorios)
-from decimal import Decimal, InvalidOperation # Para manejo preciso de moneda
+import unicodedata # Para quitar tildes en las claves de búsqueda/orden
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP # Para manejo preciso de moneda
 
 # --- Importación de Configuraciones Globales ---
 # utils.py está en core_logic/, config.py está en la raíz (gimnasio_mgmt_gui/).
@@ -67,10 +67,21 @@ def generate_internal_id(prefix: str = "GID", length: int = 12) -> str:
     if not isinstance(length, int) or length <= 0:
         length = 8 # Longitud por defecto para la parte única
 
+    import uuid # Aquí y no arriba: importa platform y alarga el arranque de la GUI
     # UUID4.hex es 32 caracteres. Tomamos una porción.
     unique_part = str(uuid.uuid4().hex).upper()[:length]
     return f"{prefix.upper()}-{unique_part}"
 
+def generate_internal_ids(prefix: str, count: int, length: int = 12) -> list[str]:
+    """
+    Igual que generate_internal_id pero para `count` IDs a la vez (altas por lotes): una sola lectura
+    de os.urandom para todos en lugar de un uuid4 por ID.
+    """
+    prefix = (prefix if prefix and isinstance(prefix, str) else "ID").upper()
+    random_hex = os.urandom((length + 1) // 2 * count).hex().upper()
+    step = (length + 1) // 2 * 2
+    return [f"{prefix}-{random_hex[i:i + length]}" for i in range(0, step * count, step)]
+
 
 # --- FUNCIONES DE MANEJO DE FECHAS Y HORAS ---
 
@@ -122,14 +133,27 @@ def convert_datetime_to_db_string(datetime_obj: datetime | None) -> str | None:
     except (AttributeError, ValueError):
         return None
 
-def parse_string_to_date(date_str: str | None, permissive_formats: bool = True) -> date | None:
+def parse_string_to_date(date_str: str | date | None, permissive_formats: bool = True) -> date | None:
     """
     Convierte una cadena de fecha a un objeto date.
     Prueba con el formato de almacenamiento DB y luego con el formato de UI si es permisivo.
+    Los valores que ya son date/datetime (columnas DATE leídas de la BD) se devuelven sin reprocesar.
     """
+    if isinstance(date_str, datetime):
+        return date_str.date()
+    if isinstance(date_str, date):
+        return date_str
     if not date_str or not isinstance(date_str, str):
         return None
 
+    date_str = date_str.strip()
+    # Camino rápido: la BD guarda AAAA-MM-DD y fromisoformat es mucho más barato que strptime.
+    if len(date_str) == 10 and date_str[4] == "-":
+        try:
+            return date.fromisoformat(date_str)
+        except ValueError:
+            pass
+
     formats_to_attempt = [DB_STORAGE_DATE_FORMAT]
     if permissive_formats:
         formats_to_attempt.append(UI_DISPLAY_DATE_FORMAT)
@@ -138,11 +162,28 @@ def parse_string_to_date(date_str: str | None, permissive_formats: bool = True)
 
     for fmt in formats_to_attempt:
         try:
-            return datetime.strptime(date_str.strip(), fmt).date()
+            return datetime.strptime(date_str, fmt).date()
         except ValueError:
             continue # Intentar el siguiente formato
     return None # Ningún formato coincidió
 
+def parse_string_to_datetime(datetime_str: str | datetime | None) -> datetime | None:
+    """
+    Convierte una fecha-hora ISO ('AAAA-MM-DD HH:MM:SS' de CURRENT_TIMESTAMP o 'AAAA-MM-DDTHH:MM:SS.ffffff'
+    de isoformat()) a datetime. Los datetime se devuelven tal cual.
+    """
+    if isinstance(datetime_str, datetime):
+        return datetime_str
+    if not datetime_str or not isinstance(datetime_str, str):
+        return None
+    try:
+        return datetime.fromisoformat(datetime_str.strip())
+    except ValueError:
+        try:
+            return datetime.strptime(datetime_str.strip(), DB_STORAGE_DATETIME_FORMAT)
+        except ValueError:
+            return None
+
 def calculate_member_expiry_date(start_date: date, plan_duration_days: int) -> date:
     """Calcula la fecha de expiración de una membresía."""
     if not isinstance(start_date, date):
@@ -190,6 +231,30 @@ def sanitize_text_input(text: str | None, allow_empty: bool = False) -> str | No
         return None
     return cleaned_text
 
+def normalize_text_for_search(text: str | None) -> str:
+    """
+    Clave de búsqueda: sin tildes ni diéresis, ñ -> n, minúsculas y espacios simples.
+    '  José MUÑOZ ' -> 'jose munoz' (así 'jose munoz' tecleado en recepción encuentra al socio).
+    """
+    if not text:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", str(text).casefold())
+    without_accents = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(without_accents.split())
+
+# Sustituto de la ñ en la clave de orden: 'n{' queda entre cualquier 'nz...' y la 'o' ('{' va tras 'z' en ASCII).
+_SPANISH_SORT_ENYE_REPLACEMENT = "n{"
+
+def make_spanish_sort_key(text: str | None) -> str:
+    """
+    Clave de orden alfabético español: como normalize_text_for_search, pero la ñ se ordena
+    como letra propia entre la n y la o (Peña va después de Penalva y antes de Peón).
+    """
+    if not text:
+        return ""
+    composed = unicodedata.normalize("NFC", str(text).casefold()).replace("ñ", "\uffff")
+    return normalize_text_for_search(composed).replace("\uffff", _SPANISH_SORT_ENYE_REPLACEMENT)
+
 def is_valid_system_username(username: str) -> bool:
     """Valida formato de nombre de usuario del sistema (longitud, caracteres)."""
     if not username or not isinstance(username, str):
@@ -266,6 +331,21 @@ def parse_string_to_decimal(value_str: str | None, default_if_error: Decimal | N
         return default_if_error
 
 
+# Tipo declarado de las columnas de importes: céntimos enteros. Las columnas se declaran "MONEY_CENTS INTEGER":
+# la afinidad INTEGER la da la palabra INTEGER (el nombre MONEY_CENTS no contiene "INT") y el conversor que
+# registra core_logic.database se elige por la primera palabra, MONEY_CENTS, y los devuelve como Decimal.
+MONEY_SQL_TYPE = "MONEY_CENTS"
+
+def money_to_cents(amount: Decimal | int | float | str) -> int:
+    """Importe en unidades de moneda -> céntimos enteros (redondeo comercial a 2 decimales)."""
+    amount_decimal = amount if isinstance(amount, Decimal) else Decimal(str(amount))
+    return int(amount_decimal.scaleb(2).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+def cents_to_money(cents: int) -> Decimal:
+    """Céntimos enteros -> Decimal con 2 decimales (ej. 3507 -> Decimal('35.07'))."""
+    return Decimal(cents).scaleb(-2)
+
+
 # --- FUNCIONES DE GESTIÓN DE DIRECTORIOS ---
 
 def ensure_directory_exists(dir_path: str) -> bool:
@@ -11,22 +11,36 @@ try:
     from config import (
         CURRENCY_DISPLAY_SYMBOL, DEFAULT_INCOME_CATEGORIES_LIST,
         DEFAULT_EXPENSE_CATEGORIES_LIST, VALID_FREQUENCIES, UI_DISPLAY_DATE_FORMAT,
-        UI_DEFAULT_FONT_FAMILY, UI_DEFAULT_FONT_SIZE_NORMAL, UI_DEFAULT_FONT_SIZE_LARGE, UI_DEFAULT_FONT_SIZE_MEDIUM # Si TransactionFormDialog los usa directamente
+        UI_DEFAULT_FONT_FAMILY, UI_DEFAULT_FONT_SIZE_NORMAL, UI_DEFAULT_FONT_SIZE_LARGE, UI_DEFAULT_FONT_SIZE_MEDIUM, # Si TransactionFormDialog los usa directamente
+        FORECAST_DEFAULT_MONTHS
     )
     from core_logic.finances import (
-        record_financial_transaction, get_financial_transactions, get_financial_summary,
+        record_financial_transaction, get_financial_transactions_window, count_financial_transactions,
+        get_financial_summary_grouped,
         add_recurring_financial_item, get_pending_recurring_items_to_process,
-        process_single_recurring_item, # get_all_recurring_items (necesitarás esta)
+        process_due_recurring_items, get_cash_flow_forecast, get_all_recurring_items,
         # update_recurring_item, delete_recurring_item (necesitarás estas)
     )
     from core_logic.utils import (
         sanitize_text_input, parse_string_to_date, format_date_for_ui,
         format_currency_for_display, parse_string_to_decimal, convert_date_to_db_string
     )
+    from core_logic.database import subscribe_to_database_changes, unsubscribe_from_database_changes
+    from gui_frames.virtual_treeview import VirtualTreeview
+    from gui_frames.treeview_sync import TreeviewSync, coalesce_reloads
 except ImportError as e:
     messagebox.showerror("Error de Carga (FinanceManagement)", f"Componentes no cargados.\nError: {e}")
     raise
 
+# Etiqueta en la GUI -> dimensión de get_financial_summary_grouped para el desglose del resumen.
+SUMMARY_BREAKDOWN_OPTIONS = {
+    "Mes": "month", "Semana": "week", "Día": "day", "Año": "year",
+    "Categoría": "category", "Método de pago": "payment_method", "Socio": "member",
+}
+
+# Horizontes ofrecidos en la pestaña de previsión (meses).
+FORECAST_MONTH_OPTIONS = (3, 6, 12, 24, 36)
+
 class FinanceManagementFrame(ttk.Frame):
     def __init__(self, parent, controller):
         super().__init__(parent, style="TFrame")
@@ -37,43 +51,66 @@ class FinanceManagementFrame(ttk.Frame):
         self.filter_end_date_var = tk.StringVar()
         self.filter_type_var = tk.StringVar(value="Todos")
         self.filter_category_var = tk.StringVar()
-        self.current_page = 1
-        self.items_per_page = 25
         self.total_transaction_count = 0
         self.selected_recurring_item_id = None # Para el treeview de recurrentes
+        self.forecast_loaded = False # La previsión se calcula al abrir su pestaña por primera vez
 
         # Los métodos se definirán ANTES de create_widgets si se usan en commands
         self.create_widgets() 
         # self.grid_widgets() ahora se maneja dentro de __init__ o al final de create_widgets
         self.notebook.pack(fill="both", expand=True, padx=5, pady=5) # Empaquetar notebook
         self.load_initial_data() # Llamada después de que todos los widgets estén creados
+        subscribe_to_database_changes(self.on_database_changed, ("financial_transactions", "recurring_financial_items", "member_memberships"))
+
+    def destroy(self):
+        unsubscribe_from_database_changes(self.on_database_changed)
+        super().destroy()
+
+    def on_database_changed(self, changed_tables: set[str]):
+        # Solo lo que depende de las tablas que cambió otro PC; los filtros y la página actual se mantienen.
+        if self.controller.current_frame is not self: return # Al volver a mostrarse ya recarga (on_show_frame)
+        if "financial_transactions" in changed_tables:
+            self.load_transactions_list(keep_position=True, force_count_refresh=True); self.load_financial_summary()
+        if "recurring_financial_items" in changed_tables: self.load_recurring_items_list()
+        self.forecast_loaded = False # La previsión depende de las tres tablas
+        self.on_notebook_tab_changed()
 
 
     # --- Definición de Métodos ANTES de que se usen en 'command' dentro de create_widgets ---
 
     def apply_transaction_filters(self):
-        self.current_page = 1
         self.load_transactions_list()
 
-    def load_transactions_list(self):
-        # (Código de load_transactions_list como lo tenías)
-        for item in self.transactions_tree.get_children(): self.transactions_tree.delete(item)
+    def get_transaction_filter_params(self) -> tuple:
         start_str = sanitize_text_input(self.filter_start_date_var.get())
         end_str = sanitize_text_input(self.filter_end_date_var.get())
         type_val = self.filter_type_var.get(); type_param = "income" if type_val=="Ingresos" else "expense" if type_val=="Gastos" else None
         cat_val = sanitize_text_input(self.filter_category_var.get())
-        offset = (self.current_page - 1) * self.items_per_page
-        trans, total = get_financial_transactions(start_str, end_str, type_param, cat_val, self.items_per_page, offset)
-        self.total_transaction_count = total
-        for t in trans:
-            amt_disp = format_currency_for_display(t.get('amount_decimal'))
-            date_disp = t.get('transaction_date_ui', format_date_for_ui(parse_string_to_date(t.get('transaction_date'))))
-            values = (t.get('internal_transaction_id', 'N/A'), date_disp,
-                      t.get('transaction_type', '').capitalize(), t.get('description', ''),
-                      t.get('category', ''), amt_disp, t.get('payment_method', ''), 
-                      t.get('recorded_by_username', 'Sistema'))
-            self.transactions_tree.insert("", "end", values=values, iid=t.get('id'))
-        self.update_pagination_controls()
+        return start_str, end_str, type_param, cat_val
+
+    @coalesce_reloads
+    def load_transactions_list(self, keep_position: bool = False, force_count_refresh: bool = False):
+        # Lista virtual sobre todo el filtro (las más recientes primero): el total (cacheado en core_logic)
+        # da el tamaño de la barra y las filas se piden por bloques al desplazarse. Al bajar, cada bloque
+        # salta por índice desde la última fila del anterior; el OFFSET solo se recorre al arrastrar la barra.
+        filter_params = self.get_transaction_filter_params()
+        self.transactions_tree.set_row_source(
+            lambda offset, limit, previous_row: get_financial_transactions_window(
+                *filter_params, offset=offset, limit=limit,
+                after_position=(previous_row['transaction_date'], previous_row['id']) if previous_row else None),
+            lambda: count_financial_transactions(*filter_params, force_refresh=force_count_refresh),
+            on_loaded=self.on_transaction_count_loaded, keep_position=keep_position,
+            busy_message="Cargando transacciones...")
+
+    def on_transaction_count_loaded(self, total_count: int):
+        self.total_transaction_count = total_count
+        self.lbl_transactions_info.config(text=f"{total_count} transacción(es)")
+
+    def format_transaction_row(self, t) -> tuple:
+        return (t.get('internal_transaction_id', 'N/A'), format_date_for_ui(t.get('transaction_date')),
+                t.get('transaction_type', '').capitalize(), t.get('description', ''),
+                t.get('category', ''), format_currency_for_display(t.get('amount_decimal')), t.get('payment_method', ''),
+                t.get('recorded_by_username', 'Sistema'))
 
     def open_transaction_form_dialog(self, is_income: bool, transaction_id_to_edit: int | None = None):
         # (Código de open_transaction_form_dialog como lo tenías)
@@ -82,33 +119,39 @@ class FinanceManagementFrame(ttk.Frame):
         
         dialog = TransactionFormDialog(self, self.controller, title=title, is_income=is_income, transaction_id=transaction_id_to_edit)
         if dialog.result and dialog.result.get("success"):
-            self.load_transactions_list()
+            self.load_transactions_list(keep_position=bool(transaction_id_to_edit)) # Las nuevas salen arriba
             self.load_financial_summary()
             action = "actualizada" if transaction_id_to_edit else "registrada"
             messagebox.showinfo(f"Transacción {action.capitalize()}", f"Transacción {action} exitosamente.", parent=self)
 
-    def prev_page(self):
-        if self.current_page > 1:
-            self.current_page -= 1
-            self.load_transactions_list()
-
-    def next_page(self):
-        total_pages = (self.total_transaction_count + self.items_per_page - 1) // self.items_per_page
-        if self.current_page < total_pages:
-            self.current_page += 1
-            self.load_transactions_list()
-
+    @coalesce_reloads
     def load_financial_summary(self):
-        # (Código de load_financial_summary como lo tenías)
+        # Una sola consulta: el desglose elegido y, sumando sus filas, los totales del periodo.
         start_str = sanitize_text_input(self.summary_start_date_var.get())
         end_str = sanitize_text_input(self.summary_end_date_var.get())
-        summary = get_financial_summary(start_date_str=start_str, end_date_str=end_str)
-        self.lbl_total_income.config(text=format_currency_for_display(summary.get('total_income')))
-        self.lbl_total_expense.config(text=format_currency_for_display(summary.get('total_expense')))
-        net_bal = summary.get('net_balance', Decimal(0))
+        dimension = SUMMARY_BREAKDOWN_OPTIONS.get(self.summary_breakdown_var.get(), "month")
+        self.controller.task_runner.submit(get_financial_summary_grouped, [dimension], start_date_str=start_str,
+                                           end_date_str=end_str, owner=self, key="financial_summary",
+                                           on_success=lambda summary: self.fill_financial_summary(summary, dimension))
+
+    def fill_financial_summary(self, summary: dict, dimension: str):
+        total_income = sum(summary['total_income'], Decimal(0)); total_expense = sum(summary['total_expense'], Decimal(0))
+        net_bal = total_income - total_expense
+        self.lbl_total_income.config(text=format_currency_for_display(total_income))
+        self.lbl_total_expense.config(text=format_currency_for_display(total_expense))
         self.lbl_net_balance.config(text=format_currency_for_display(net_bal),
                                     foreground="green" if net_bal >= 0 else "red")
 
+        # Un item por grupo (iid = dimensión + clave del grupo): al recargar solo cambian los grupos con movimientos.
+        group_labels = summary['member_name'] if dimension == "member" else summary[dimension]
+        group_keys = summary['member_internal_id'] if dimension == "member" else group_labels
+        self.summary_breakdown_sync.sync((f"{dimension}:{group_keys[index]}", (
+                group_label or "(Sin asignar)",
+                format_currency_for_display(summary['total_income'][index]),
+                format_currency_for_display(summary['total_expense'][index]),
+                format_currency_for_display(summary['net_balance'][index]),
+                summary['transaction_count'][index])) for index, group_label in enumerate(group_labels))
+
 
     def open_recurring_item_form_dialog(self, item_id_to_edit: int | None = None):
         # (Código de open_recurring_item_form_dialog como lo tenías,
@@ -129,8 +172,7 @@ class FinanceManagementFrame(ttk.Frame):
         if not selected_items:
             messagebox.showwarning("Selección Requerida", "Seleccione un ítem recurrente para editar.", parent=self)
             return
-        item_id = self.recurring_tree.item(selected_items[0], "values")[0] # Asume que el ID es la primera columna
-        self.open_recurring_item_form_dialog(item_id_to_edit=int(item_id))
+        self.open_recurring_item_form_dialog(item_id_to_edit=int(selected_items[0])) # El iid es el ID del ítem
 
 
     def delete_selected_recurring_item(self):
@@ -140,9 +182,9 @@ class FinanceManagementFrame(ttk.Frame):
             messagebox.showwarning("Selección Requerida", "Seleccione un ítem recurrente para eliminar.", parent=self)
             return
         
-        item_values = self.recurring_tree.item(selected_items[0], "values")
-        item_id_to_delete = item_values[0]
-        item_desc = item_values[2] # Asumir que descripción es la tercera columna
+        item_id_to_delete = selected_items[0]
+        selected_item = self.recurring_tree.get_row(item_id_to_delete)
+        item_desc = selected_item.get('description') if selected_item else ""
         
         if messagebox.askyesno("Confirmar Eliminación",
                              f"¿Está seguro de eliminar el ítem recurrente:\n'{item_desc}' (ID: {item_id_to_delete})?",
@@ -157,43 +199,88 @@ class FinanceManagementFrame(ttk.Frame):
             print(f"INFO: Lógica para eliminar ítem recurrente ID {item_id_to_delete} no implementada aún.")
             messagebox.showinfo("Próximamente", "Eliminación de ítems recurrentes no implementada.", parent=self)
 
+    @coalesce_reloads
     def load_recurring_items_list(self):
-        # (Código de load_recurring_items_list como lo tenías)
-        for item in self.recurring_tree.get_children(): self.recurring_tree.delete(item)
-        
-        from core_logic.finances import get_all_recurring_items # Necesitarás esta función
-        recurring_items_data = get_all_recurring_items() if 'get_all_recurring_items' in globals() else [] # Check si existe
-
-        for item_data in recurring_items_data:
-            values = (
-                item_data.get('id'), item_data.get('item_type', '').capitalize(), 
-                item_data.get('description'), format_currency_for_display(Decimal(str(item_data.get('default_amount','0')))),
-                item_data.get('category'), item_data.get('frequency'),
-                format_date_for_ui(parse_string_to_date(item_data.get('next_due_date'))),
-                "Sí" if item_data.get('is_active') else "No"
-            )
-            self.recurring_tree.insert("", "end", values=values, iid=item_data.get('id'))
+        self.controller.task_runner.submit(get_all_recurring_items, owner=self, key="recurring_items",
+                                           on_success=self.fill_recurring_items_list)
+
+    def fill_recurring_items_list(self, recurring_items_data: list):
+        self.recurring_tree.set_rows(recurring_items_data)
         self.on_recurring_item_selected() # Para deshabilitar botones si no hay selección
 
+    def format_recurring_item_row(self, item_data) -> tuple:
+        return (
+            item_data.get('id'), item_data.get('item_type', '').capitalize(),
+            item_data.get('description'), format_currency_for_display(item_data.get('default_amount_decimal')),
+            item_data.get('category'), item_data.get('frequency'),
+            format_date_for_ui(item_data.get('next_due_date')),
+            "Sí" if item_data.get('is_active') else "No"
+        )
+
 
     def process_due_recurring_items(self):
-        # (Código de process_due_recurring_items como lo tenías)
-        pending_items = get_pending_recurring_items_to_process()
+        # Un solo lote en core_logic: todos los periodos atrasados de todos los ítems, en una transacción.
+        # Tanto la consulta de pendientes como el lote van en segundo plano (a fin de mes pueden ser miles).
+        self.btn_process_recurring.config(state="disabled")
+        self.controller.task_runner.submit(get_pending_recurring_items_to_process, owner=self, key="process_recurring",
+                                           busy_message="Buscando ítems recurrentes pendientes...",
+                                           on_success=self.confirm_process_due_recurring_items,
+                                           on_error=self.on_process_recurring_error)
+
+    def confirm_process_due_recurring_items(self, pending_items: list):
         if not pending_items:
+            self.btn_process_recurring.config(state="normal")
             messagebox.showinfo("Proceso Completado", "No hay ítems recurrentes pendientes.", parent=self); return
-        if not messagebox.askyesno("Confirmar Proceso", f"{len(pending_items)} ítem(s) para procesar. Continuar?", parent=self): return
-        
-        proc_count, err_count = 0, 0
+        if not messagebox.askyesno("Confirmar Proceso", f"{len(pending_items)} ítem(s) con periodos vencidos (se generarán todos los atrasados). Continuar?", parent=self):
+            self.btn_process_recurring.config(state="normal"); return
+
         user_id = self.controller.current_user_info.get('id') if self.controller.current_user_info else None
-        for item in pending_items:
-            item_id = item['id']
-            success, msg = process_single_recurring_item(item_id, recorded_by_user_id=user_id)
-            if success: proc_count += 1; print(f"INFO (FinanceFrame): {msg}")
-            else: err_count += 1; print(f"ERROR (FinanceFrame): {msg}"); messagebox.showwarning("Error Procesando",f"Ítem ID {item_id}.\n{msg}", parent=self)
-        
-        msg_sum = f"Proceso completado.\nProcesados: {proc_count}\nErrores: {err_count}"
-        messagebox.showinfo("Resultado", msg_sum, parent=self)
-        self.load_transactions_list(); self.load_recurring_items_list(); self.load_financial_summary()
+        self.controller.task_runner.submit(process_due_recurring_items, recorded_by_user_id=user_id, # De core_logic.finances (función del módulo, no este método)
+                                           owner=self, key="process_recurring", busy_message="Procesando ítems recurrentes...",
+                                           on_success=self.on_due_recurring_items_processed, on_error=self.on_process_recurring_error)
+
+    def on_due_recurring_items_processed(self, result: tuple[bool, str]):
+        success, msg = result
+        self.btn_process_recurring.config(state="normal")
+        if success: print(f"INFO (FinanceFrame): {msg}"); messagebox.showinfo("Resultado", f"Proceso completado.\n{msg}", parent=self)
+        else: print(f"ERROR (FinanceFrame): {msg}"); messagebox.showwarning("Error Procesando", msg, parent=self)
+        # Se juntan en un ciclo de Tk y cada lista conserva su posición y selección (refresco por diferencias).
+        self.load_transactions_list(keep_position=True); self.load_recurring_items_list(); self.load_financial_summary()
+
+    def on_process_recurring_error(self, error: BaseException):
+        print(f"ERROR (FinanceFrame): Fallo inesperado procesando recurrentes: {error!r}")
+        self.btn_process_recurring.config(state="normal")
+        messagebox.showerror("Error Procesando", f"Error inesperado: {error}", parent=self)
+
+
+    def load_cash_flow_forecast(self):
+        # Previsión por meses: recurrentes + renovaciones esperadas de membresías (core_logic.finances).
+        self.forecast_loaded = True # Evita lanzarla otra vez mientras se calcula
+        self.controller.task_runner.submit(get_cash_flow_forecast, int(self.forecast_months_var.get() or FORECAST_DEFAULT_MONTHS),
+                                           owner=self, key="cash_flow_forecast", busy_message="Calculando previsión...",
+                                           on_success=self.fill_cash_flow_forecast)
+
+    def fill_cash_flow_forecast(self, forecast: dict | None):
+        if forecast is None:
+            self.forecast_sync.clear(); self.forecast_loaded = False
+            self.lbl_forecast_info.config(text="No se pudo calcular la previsión (¿NumPy instalado?).", foreground="red"); return
+        monthly = forecast["monthly"]
+        self.forecast_sync.sync((month_label, ( # Un item por mes: al recalcular solo cambian los meses distintos
+                month_label, format_currency_for_display(round(monthly["recurring_income"][index], 2)),
+                format_currency_for_display(round(monthly["renewal_income"][index], 2)),
+                format_currency_for_display(round(monthly["total_expense"][index], 2)),
+                format_currency_for_display(round(monthly["net_balance"][index], 2)),
+                format_currency_for_display(round(monthly["balance"][index], 2)))) for index, month_label in enumerate(monthly["month"]))
+        closing_balance = round(float(monthly["balance"][-1]), 2) if monthly["month"] else forecast["opening_balance"]
+        self.lbl_forecast_info.config(foreground="", text=(
+            f"Del {format_date_for_ui(forecast['start_date'])} al {format_date_for_ui(forecast['end_date'])} | "
+            f"Saldo actual: {format_currency_for_display(forecast['opening_balance'])} | "
+            f"Saldo previsto: {format_currency_for_display(closing_balance)} | "
+            f"{forecast['recurring_item_count']} recurrentes, {forecast['expiring_membership_count']} membresías por renovar"))
+
+    def on_notebook_tab_changed(self, event=None):
+        if not self.forecast_loaded and self.notebook.select() == str(self.tab_forecast):
+            self.load_cash_flow_forecast()
 
 
     def create_widgets(self): # Definición movida ANTES de __init__ para Pylance (no, __init__ es el constructor)
@@ -212,6 +299,11 @@ class FinanceManagementFrame(ttk.Frame):
         self.notebook.add(self.tab_recurring, text="Ingresos/Gastos Recurrentes")
         self.create_recurring_items_tab_widgets(self.tab_recurring) # Usa los métodos definidos arriba
 
+        self.tab_forecast = ttk.Frame(self.notebook, style="TFrame", padding=10)
+        self.notebook.add(self.tab_forecast, text="Previsión de Tesorería")
+        self.create_forecast_tab_widgets(self.tab_forecast)
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_notebook_tab_changed)
+
 
     def grid_widgets(self): 
         # Esta función puede eliminarse si el notebook se empaqueta en __init__
@@ -234,14 +326,11 @@ class FinanceManagementFrame(ttk.Frame):
         
         tree_frame=ttk.Frame(parent_tab,style="TFrame");tree_frame.grid(row=1,column=0,sticky="nsew");tree_frame.columnconfigure(0,weight=1);tree_frame.rowconfigure(0,weight=1)
         cols=("id_trans","date","type","desc","category","amount","method","user");names=("ID Trans.","Fecha","Tipo","Descripción","Categoría","Monto","Método Pago","Registrado Por")
-        self.transactions_tree=ttk.Treeview(tree_frame,columns=cols,show="headings",selectmode="browse");
+        self.transactions_tree=VirtualTreeview(tree_frame,columns=cols,show="headings",selectmode="browse",task_runner=self.controller.task_runner,format_row=self.format_transaction_row,row_id=lambda t: t.get('id'))
         for c,n in zip(cols,names): w=120;a="w"; (w:=100,a:="center") if c=="id_trans" else (w:=90,a:="center") if c=="date" else (w:=70,a:="center") if c=="type" else (w:=250) if c=="desc" else (w:=100,a:="e") if c=="amount" else (w:=100,a:="center") if c=="user" else w;self.transactions_tree.heading(c,text=n,anchor=a);self.transactions_tree.column(c,width=w,stretch=tk.YES,anchor=a)
-        self.transactions_tree.grid(row=0,column=0,sticky="nsew");s=ttk.Scrollbar(tree_frame,orient="vertical",command=self.transactions_tree.yview);self.transactions_tree.configure(yscrollcommand=s.set);s.grid(row=0,column=1,sticky="ns")
+        self.transactions_tree.grid(row=0,column=0,sticky="nsew") # Lista virtual con su propia barra
         
-        self.pagination_frame=ttk.Frame(parent_tab,style="TFrame");self.pagination_frame.grid(row=2,column=0,sticky="ew",pady=(5,0))
-        self.lbl_page_info=ttk.Label(self.pagination_frame,text="");self.lbl_page_info.pack(side="left",padx=10)
-        self.btn_prev_page = ttk.Button(self.pagination_frame, text="<< Anterior", command=self.prev_page, state="disabled"); self.btn_prev_page.pack(side="left", padx=5) # OK
-        self.btn_next_page = ttk.Button(self.pagination_frame, text="Siguiente >>", command=self.next_page, state="disabled"); self.btn_next_page.pack(side="left", padx=5) # OK
+        self.lbl_transactions_info=ttk.Label(parent_tab,text="");self.lbl_transactions_info.grid(row=2,column=0,sticky="w",padx=10,pady=(5,0))
 
     def create_summary_tab_widgets(self, parent_tab):
         # (Código como antes, pero command=self.load_financial_summary ya definido)
@@ -259,6 +348,16 @@ class FinanceManagementFrame(ttk.Frame):
         ttk.Separator(summary_display_frame,orient="horizontal").grid(row=2,column=0,columnspan=2,sticky="ew",pady=10)
         ttk.Label(summary_display_frame,text="Balance Neto:",font=font_label).grid(row=3,column=0,padx=10,pady=8,sticky="w");self.lbl_net_balance=ttk.Label(summary_display_frame,text="0.00 "+CURRENCY_DISPLAY_SYMBOL,font=font_value,foreground="navy");self.lbl_net_balance.grid(row=3,column=1,padx=10,pady=8,sticky="e")
 
+        breakdown_frame=ttk.Labelframe(summary_content_frame,text="Desglose",style="TLabelframe",padding=10);breakdown_frame.pack(pady=10,fill="both",expand=True)
+        self.summary_breakdown_var=tk.StringVar(value="Mes")
+        ttk.Label(breakdown_frame,text="Agrupar por:").grid(row=0,column=0,padx=5,pady=5,sticky="w")
+        breakdown_combo=ttk.Combobox(breakdown_frame,textvariable=self.summary_breakdown_var,values=list(SUMMARY_BREAKDOWN_OPTIONS),state="readonly",width=18);breakdown_combo.grid(row=0,column=1,padx=5,pady=5,sticky="w")
+        breakdown_combo.bind("<<ComboboxSelected>>",lambda e:self.load_financial_summary())
+        cols=("group","income","expense","net","count");self.summary_breakdown_tree=ttk.Treeview(breakdown_frame,columns=cols,show="headings",height=8);self.summary_breakdown_sync=TreeviewSync(self.summary_breakdown_tree)
+        for c,t,w,a in [("group","Grupo",180,"w"),("income","Ingresos",110,"e"),("expense","Gastos",110,"e"),("net","Balance",110,"e"),("count","Nº Trans.",80,"center")]: self.summary_breakdown_tree.heading(c,text=t);self.summary_breakdown_tree.column(c,width=w,anchor=a)
+        self.summary_breakdown_tree.grid(row=1,column=0,columnspan=2,sticky="nsew");breakdown_frame.columnconfigure(1,weight=1);breakdown_frame.rowconfigure(1,weight=1)
+        breakdown_scroll=ttk.Scrollbar(breakdown_frame,orient="vertical",command=self.summary_breakdown_tree.yview);breakdown_scroll.grid(row=1,column=2,sticky="ns");self.summary_breakdown_tree.configure(yscrollcommand=breakdown_scroll.set)
+
     def create_recurring_items_tab_widgets(self, parent_tab):
         # (Código como antes, pero los 'command' ahora refieren a métodos ya definidos)
         parent_tab.columnconfigure(0,weight=1);parent_tab.rowconfigure(1,weight=1)
@@ -268,19 +367,34 @@ class FinanceManagementFrame(ttk.Frame):
         self.btn_del_rec=ttk.Button(action_frame,text="Eliminar Seleccionado",command=self.delete_selected_recurring_item,state="disabled");self.btn_del_rec.pack(side="left",padx=5,pady=5) # OK
         ttk.Button(action_frame,text="Refrescar Recurrentes",command=self.load_recurring_items_list).pack(side="left",padx=5,pady=5) # OK
         ttk.Separator(action_frame,orient="vertical").pack(side="left",fill="y",padx=15,pady=5)
-        ttk.Button(action_frame,text="Procesar Pendientes HOY",command=self.process_due_recurring_items).pack(side="left",padx=5,pady=5) # OK
+        self.btn_process_recurring=ttk.Button(action_frame,text="Procesar Pendientes HOY",command=self.process_due_recurring_items);self.btn_process_recurring.pack(side="left",padx=5,pady=5) # OK
 
         tree_frame_rec=ttk.Frame(parent_tab,style="TFrame");tree_frame_rec.grid(row=1,column=0,sticky="nsew");tree_frame_rec.columnconfigure(0,weight=1);tree_frame_rec.rowconfigure(0,weight=1)
         rec_cols=("id_rec","type","desc","amount","category","freq","next_due","active");rec_names=("ID","Tipo","Descripción","Monto Def.","Categoría","Frecuencia","Próx. Venc.","Activo")
-        self.recurring_tree=ttk.Treeview(tree_frame_rec,columns=rec_cols,show="headings",selectmode="browse");
+        self.recurring_tree=VirtualTreeview(tree_frame_rec,columns=rec_cols,show="headings",selectmode="browse",format_row=self.format_recurring_item_row,row_id=lambda item: item.get('id'))
         for c,n in zip(rec_cols,rec_names):w=100;a="w";(w:=50,a:="center")if c=="id_rec"else(w:=70,a:="center")if c=="type"else(w:=200)if c=="desc"else(w:=100,a:="e")if c=="amount"else(w:=70,a:="center")if c=="active"else w;self.recurring_tree.heading(c,text=n,anchor=a);self.recurring_tree.column(c,width=w,stretch=tk.YES,anchor=a)
-        self.recurring_tree.grid(row=0,column=0,sticky="nsew");s_rec=ttk.Scrollbar(tree_frame_rec,orient="vertical",command=self.recurring_tree.yview);self.recurring_tree.configure(yscrollcommand=s_rec.set);s_rec.grid(row=0,column=1,sticky="ns")
+        self.recurring_tree.grid(row=0,column=0,sticky="nsew")
         self.recurring_tree.bind("<<TreeviewSelect>>", self.on_recurring_item_selected)
 
 
+    def create_forecast_tab_widgets(self, parent_tab):
+        parent_tab.columnconfigure(0,weight=1);parent_tab.rowconfigure(2,weight=1)
+        action_frame=ttk.Frame(parent_tab,style="TFrame",padding=(0,0,0,10));action_frame.grid(row=0,column=0,sticky="ew")
+        self.forecast_months_var=tk.StringVar(value=str(FORECAST_DEFAULT_MONTHS))
+        ttk.Label(action_frame,text="Meses:").pack(side="left",padx=(0,2),pady=5)
+        ttk.Combobox(action_frame,textvariable=self.forecast_months_var,values=[str(m) for m in FORECAST_MONTH_OPTIONS],state="readonly",width=5).pack(side="left",padx=(0,10),pady=5)
+        ttk.Button(action_frame,text="Calcular Previsión",command=self.load_cash_flow_forecast).pack(side="left",padx=5,pady=5)
+        self.lbl_forecast_info=ttk.Label(parent_tab,text="",style="TLabel");self.lbl_forecast_info.grid(row=1,column=0,sticky="w",pady=(0,5))
+
+        tree_frame_fc=ttk.Frame(parent_tab,style="TFrame");tree_frame_fc.grid(row=2,column=0,sticky="nsew");tree_frame_fc.columnconfigure(0,weight=1);tree_frame_fc.rowconfigure(0,weight=1)
+        fc_cols=("month","recurring_income","renewal_income","expense","net","balance")
+        self.forecast_tree=ttk.Treeview(tree_frame_fc,columns=fc_cols,show="headings",selectmode="browse");self.forecast_sync=TreeviewSync(self.forecast_tree)
+        for c,t,w,a in [("month","Mes",90,"center"),("recurring_income","Ingresos Recurrentes",140,"e"),("renewal_income","Renovaciones Esperadas",150,"e"),("expense","Gastos",120,"e"),("net","Neto",120,"e"),("balance","Saldo Previsto",130,"e")]: self.forecast_tree.heading(c,text=t,anchor=a);self.forecast_tree.column(c,width=w,stretch=tk.YES,anchor=a)
+        self.forecast_tree.grid(row=0,column=0,sticky="nsew");s_fc=ttk.Scrollbar(tree_frame_fc,orient="vertical",command=self.forecast_tree.yview);self.forecast_tree.configure(yscrollcommand=s_fc.set);s_fc.grid(row=0,column=1,sticky="ns")
+
+
     # --- El método load_initial_data() debe estar definido ANTES de que __init__ lo llame ---
     def load_initial_data(self):
-        self.current_page = 1
         today = date.today()
         first_day_month = today.replace(day=1)
         self.filter_start_date_var.set(format_date_for_ui(first_day_month))
@@ -289,25 +403,15 @@ class FinanceManagementFrame(ttk.Frame):
         self.load_transactions_list()
         self.load_financial_summary()
         self.load_recurring_items_list()
-
-    def update_pagination_controls(self):
-        # (Código como antes)
-        total_pages = (self.total_transaction_count + self.items_per_page -1) // self.items_per_page
-        if total_pages == 0: total_pages = 1
-        self.lbl_page_info.config(text=f"Pág {self.current_page}/{total_pages} ({self.total_transaction_count} trans.)")
-        self.btn_prev_page.config(state="normal" if self.current_page > 1 else "disabled")
-        self.btn_next_page.config(state="normal" if self.current_page < total_pages else "disabled")
+        self.forecast_loaded = False # Se recalcula al volver a abrir la pestaña de previsión
+        self.on_notebook_tab_changed()
 
     def on_recurring_item_selected(self, event=None):
         selected_items = self.recurring_tree.selection()
         state_to_set = "normal" if selected_items else "disabled"
         if hasattr(self, 'btn_edit_rec'): self.btn_edit_rec.config(state=state_to_set)
         if hasattr(self, 'btn_del_rec'): self.btn_del_rec.config(state=state_to_set)
-        if selected_items:
-            item_values = self.recurring_tree.item(selected_items[0], "values")
-            self.selected_recurring_item_id = item_values[0] if item_values else None
-        else:
-            self.selected_recurring_item_id = None
+        self.selected_recurring_item_id = selected_items[0] if selected_items else None
             
     def on_show_frame(self, data_to_pass: dict | None = None):
         self.load_initial_data()
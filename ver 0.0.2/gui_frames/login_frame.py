@@ -9,6 +9,7 @@ from datetime import datetime # <-- CORRECCIÓN: Importar la clase datetime del
 try:
     from config import APP_NAME
     from core_logic.auth import attempt_user_login
+    from core_logic.utils import parse_string_to_datetime, format_datetime_for_ui
     # from .base_frame import BaseFrame # Opcional
 except ImportError as e:
     messagebox.showerror("Error de Carga (LoginFrame)", f"No se pudieron cargar componentes.\nError: {e}")
@@ -33,6 +34,7 @@ class LoginFrame(ttk.Frame):
         self.center_frame.rowconfigure(0, weight=1)
 
         self.username_entry.focus_set()
+        self.update_startup_state()
 
     def create_widgets(self):
         # (El método create_widgets como lo tenías)
@@ -63,7 +65,17 @@ class LoginFrame(ttk.Frame):
         self.center_frame.columnconfigure(1, weight=1)
 
 
+    def update_startup_state(self):
+        """Mientras main_gui prepara la BD en segundo plano se puede escribir, pero no entrar todavía."""
+        if getattr(self.controller, "startup_ready", True):
+            self.login_button.config(state="normal")
+            if self.status_label.cget("text") == "Preparando la aplicación...": self.status_label.config(text="", foreground="")
+        else:
+            self.login_button.config(state="disabled")
+            self.show_status_message("Preparando la aplicación...", is_error=False, color="gray")
+
     def handle_login_attempt(self, event=None):
+        if not getattr(self.controller, "startup_ready", True): return # Botón deshabilitado; Intro en la contraseña
         username = self.username_var.get()
         password = self.password_var.get()
 
@@ -73,31 +85,30 @@ class LoginFrame(ttk.Frame):
 
         self.login_button.config(state="disabled")
         self.show_status_message("Verificando...", is_error=False, color="blue") # Mensaje más genérico
-        self.update_idletasks()
 
-        user_info = attempt_user_login(username, password) # De core_logic.auth
+        # El hash de la contraseña y la BD se consultan en segundo plano; la ventana sigue respondiendo.
+        self.controller.task_runner.submit(attempt_user_login, username, password, owner=self, key="login", # De core_logic.auth
+                                           on_success=self.on_login_result, on_error=self.on_login_error)
+
+    def on_login_error(self, error: BaseException):
+        print(f"ERROR (LoginFrame): Fallo inesperado al iniciar sesión: {error!r}")
+        self.login_button.config(state="normal")
+        self.show_status_message("Error inesperado al iniciar sesión. Consulte la consola.", is_error=True)
 
+    def on_login_result(self, user_info: dict | None):
         self.login_button.config(state="normal")
 
         if user_info:
             if "error" in user_info:
                 error_type = user_info["error"]
                 if error_type == "account_locked":
-                    unlock_time_str = user_info.get("unlock_time", "desconocido")
+                    unlock_time_raw = user_info.get("unlock_time") # datetime (o texto ISO)
                     unlock_time_ui = "pronto" # Fallback
-                    if unlock_time_str != "desconocido":
-                        try:
-                            # --- CORRECCIÓN: Usar datetime.fromisoformat (clase.metodo) ---
-                            unlock_dt = datetime.fromisoformat(unlock_time_str)
-                            # Para formatear, sería mejor usar una función de utils si la tuviéramos
-                            # o asegurar que UI_DISPLAY_DATETIME_FORMAT esté importado
-                            try:
-                                from config import UI_DISPLAY_DATETIME_FORMAT
-                                unlock_time_ui = unlock_dt.strftime(UI_DISPLAY_DATETIME_FORMAT)
-                            except ImportError: # Si no se pudo importar UI_DISPLAY_DATETIME_FORMAT
-                                unlock_time_ui = unlock_dt.strftime("%H:%M:%S del %d/%m/%Y") # Fallback de formato
-                        except ValueError: # Si unlock_time_str no es un ISO format válido
-                            print(f"ADVERTENCIA (LoginFrame): Formato de unlock_time_str no es ISO: {unlock_time_str}")
+                    unlock_dt = parse_string_to_datetime(unlock_time_raw)
+                    if unlock_dt:
+                        unlock_time_ui = format_datetime_for_ui(unlock_dt)
+                    elif unlock_time_raw:
+                        print(f"ADVERTENCIA (LoginFrame): Formato de unlock_time no es ISO: {unlock_time_raw}")
                     self.show_status_message(f"Cuenta bloqueada. Intente tras las {unlock_time_ui}.", is_error=True)
                 elif error_type == "account_inactive":
                     self.show_status_message("Su cuenta está inactiva.", is_error=True)
@@ -131,11 +142,14 @@ class LoginFrame(ttk.Frame):
     def on_show_frame(self, data_to_pass: dict | None = None):
         # (Sin cambios funcionales)
         self.clear_login_fields()
+        self.update_startup_state()
         self.username_entry.focus_set()
 
 
 # --- Para probar este frame de forma aislada (si fuera necesario) ---
 if __name__ == "__main__":
+    from gui_frames.task_runner import TaskRunner
+
     class MockController(tk.Tk):
         # (MockController como antes)
         def __init__(self):
@@ -146,6 +160,7 @@ if __name__ == "__main__":
             self.style.configure("Header.TLabel", font=("Arial", 18, "bold"))
             self.style.configure("Error.TLabel", foreground="red"); self.style.configure("Success.TLabel", foreground="green")
             self.style.configure("TEntry", font=("Arial", 10)) # Para que lookup no falle
+            self.task_runner = TaskRunner(self)
         def user_logged_in(self, user_info): print("Mock Login OK:", user_info); messagebox.showinfo("Login Test", "Login OK (simulado)!"); self.destroy()
 
     original_attempt_user_login = None
@@ -158,7 +173,7 @@ if __name__ == "__main__":
             return {"id": 1, "username": "testuser", "role": "Data Manager", "is_active": True}
         elif username == "lock" and password == "lock":
             # --- CORRECCIÓN: Usar datetime.now (clase.metodo) ---
-            return {"error": "account_locked", "unlock_time": datetime.now().isoformat()}
+            return {"error": "account_locked", "unlock_time": datetime.now()}
         return None
 
     attempt_user_login = mock_attempt_user_login
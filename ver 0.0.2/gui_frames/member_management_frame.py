@@ -3,7 +3,6 @@
 #IGNORE CALL 280
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-from PIL import Image, ImageTk # Requiere: pip install Pillow
 import os
 import shutil
 from datetime import date, datetime # <-- CORRECCIÓN: Importar 'date' y 'datetime'
@@ -27,13 +26,17 @@ try:
     from config import (
         MEMBER_STATUS_OPTIONS_LIST, DEFAULT_MEMBERSHIP_PLANS, APP_DATA_ROOT_DIR,
         MEMBER_PHOTOS_SUBDIR_NAME, CURRENCY_DISPLAY_SYMBOL,
-        DEFAULT_NEW_MEMBER_STATUS_ON_CREATION #Añadir si se usa explícitamente o para claridad
+        DEFAULT_NEW_MEMBER_STATUS_ON_CREATION, #Añadir si se usa explícitamente o para claridad
+        MEMBER_SEARCH_DEBOUNCE_MS
     )
     from core_logic.members import (
         add_new_member, get_all_members_summary, get_member_by_internal_id,
         update_member_details, add_membership_to_member,
-        get_all_memberships_for_member, get_member_active_membership
+        get_all_memberships_for_member, get_members_summary_with_active_membership, count_members_summary
     )
+    from core_logic.database import subscribe_to_database_changes, unsubscribe_from_database_changes
+    from gui_frames.virtual_treeview import VirtualTreeview
+    from gui_frames.treeview_sync import coalesce_reloads
     from core_logic.utils import (
         sanitize_text_input, parse_string_to_date, format_date_for_ui,
         calculate_age, generate_internal_id, ensure_directory_exists,
@@ -51,12 +54,23 @@ class MemberManagementFrame(ttk.Frame):
         self.controller = controller
 
         self.selected_member_internal_id = None
+        self.search_after_id = None # Búsqueda programada mientras se teclea (debounce)
         self.member_photo_path = None # Ruta de la foto original si se está editando y no se cambia
         self.temp_photo_path_for_dialog = None # Ruta de la foto seleccionada en el diálogo, antes de guardar
 
         self.create_widgets()
         self.grid_widgets()
         self.load_member_list()
+        subscribe_to_database_changes(self.on_database_changed, ("members", "member_memberships"))
+
+    def destroy(self):
+        unsubscribe_from_database_changes(self.on_database_changed)
+        super().destroy()
+
+    def on_database_changed(self, changed_tables: set[str]):
+        # Otro PC dio de alta/editó un socio o vendió una membresía: recargar la lista conservando la selección.
+        if self.controller.current_frame is not self: return # Al volver a mostrarse ya recarga (on_show_frame)
+        self.load_member_list(select_member_id=self.selected_member_internal_id, keep_position=True)
 
     def create_widgets(self):
         # (Sin cambios en create_widgets respecto al último código, a menos que los errores sean aquí)
@@ -64,9 +78,11 @@ class MemberManagementFrame(ttk.Frame):
         self.top_action_frame = ttk.Frame(self, style="TFrame", padding=10)
         
         self.search_var = tk.StringVar()
+        self.search_var.trace_add("write", self.on_search_text_changed)
         self.search_label = ttk.Label(self.top_action_frame, text="Buscar Miembro (Nombre/ID):")
         self.search_entry = ttk.Entry(self.top_action_frame, textvariable=self.search_var, width=30)
         self.search_entry.bind("<Return>", lambda e: self.load_member_list())
+        self.lbl_search_info = ttk.Label(self.top_action_frame, text="", foreground="gray")
         self.btn_search = ttk.Button(self.top_action_frame, text="Buscar", command=self.load_member_list)
         self.btn_clear_search = ttk.Button(self.top_action_frame, text="Limpiar", command=self.clear_search_and_reload)
 
@@ -77,8 +93,11 @@ class MemberManagementFrame(ttk.Frame):
         self.tree_columns = ("internal_id", "full_name", "status", "join_date", "active_plan")
         self.tree_column_names = ("ID Miembro", "Nombre Completo", "Estado", "Fecha Ingreso", "Plan Activo")
         
-        self.members_treeview = ttk.Treeview(
-            self.member_list_frame, columns=self.tree_columns, show="headings", selectmode="browse"
+        # Lista virtual: solo se crean los items de Tk de las filas visibles y los socios se piden por bloques.
+        self.members_treeview = VirtualTreeview(
+            self.member_list_frame, columns=self.tree_columns, show="headings", selectmode="browse",
+            task_runner=self.controller.task_runner, format_row=self.format_member_row,
+            row_id=lambda member_item: member_item.get('internal_member_id')
         )
         for col, name in zip(self.tree_columns, self.tree_column_names):
             width = 180; anchor = "w"
@@ -91,13 +110,10 @@ class MemberManagementFrame(ttk.Frame):
         self.members_treeview.bind("<<TreeviewSelect>>", self.on_member_selected)
         self.members_treeview.bind("<Double-1>", self.on_member_double_click)
 
-        self.tree_scrollbar_y = ttk.Scrollbar(self.member_list_frame, orient="vertical", command=self.members_treeview.yview)
-        self.members_treeview.configure(yscrollcommand=self.tree_scrollbar_y.set)
-
         self.member_actions_frame = ttk.Frame(self, style="TFrame", padding=10)
         self.btn_view_details = ttk.Button(self.member_actions_frame, text="Ver/Editar Detalles", command=self.open_member_form_dialog_for_edit, state="disabled")
         self.btn_manage_memberships = ttk.Button(self.member_actions_frame, text="Gestionar Membresías", command=self.open_membership_management_dialog, state="disabled")
-        self.btn_back_to_main = ttk.Button(slef.top_action_frame, text="Menu Principal", command=self.return_to_main_menu)
+        self.btn_back_to_main = ttk.Button(self.top_action_frame, text="Menu Principal", command=self.return_to_main_menu)
         
     def grid_widgets(self):
         # (Sin cambios)
@@ -112,12 +128,13 @@ class MemberManagementFrame(ttk.Frame):
         self.btn_clear_search.pack(side="left", padx=(0,20), pady=5)
         self.btn_add_member.pack(side="left", padx=5, pady=5)
         self.btn_refresh_list.pack(side="left", padx=5, pady=5)
+        self.btn_back_to_main.pack(side="right", padx=5, pady=5)
+        self.lbl_search_info.pack(side="left", padx=10, pady=5)
         
         self.member_list_frame.grid(row=1, column=0, sticky="nsew")
         self.member_list_frame.columnconfigure(0, weight=1)
         self.member_list_frame.rowconfigure(0, weight=1)
-        self.members_treeview.grid(row=0, column=0, sticky="nsew")
-        self.tree_scrollbar_y.grid(row=0, column=1, sticky="ns")
+        self.members_treeview.grid(row=0, column=0, sticky="nsew") # Incluye su barra de desplazamiento
 
         self.member_actions_frame.grid(row=2, column=0, sticky="ew")
         self.btn_view_details.pack(side="left", padx=5, pady=5)
@@ -129,33 +146,43 @@ class MemberManagementFrame(ttk.Frame):
         self.temp_photo_path_for_dialog = None
 
         # Limpiar cualquier foto temporal si está en uso
-        self.controller.show_frame("MainMenuFrame")
-
-    def load_member_list(self, event=None):
-        for item in self.members_treeview.get_children():
-            self.members_treeview.delete(item)
-        
-        search_term = sanitize_text_input(self.search_var.get())
-        members_data = get_all_members_summary(search_term=search_term if search_term else None)
-
-        for member_item in members_data:
-            internal_id = member_item.get('internal_member_id', 'N/A')
-            # ... (resto como antes)
-            plan_display = "Ninguno"
-            # Línea 132 (del error) dentro de esta lógica para obtener el plan activo
-            # El error "`date` no está definido" sucedería si `date.today()` se usa aquí sin importar `date`.
-            active_plan_info = get_member_active_membership(internal_id)
-            if active_plan_info:
-                expiry_dt_obj = active_plan_info.get('expiry_date_obj') # Asumimos que get_member_active_membership devuelve esto
-                if expiry_dt_obj and expiry_dt_obj >= date.today(): # Uso de 'date'
-                     plan_display = f"{active_plan_info['plan_name_at_purchase']} (Exp: {format_date_for_ui(expiry_dt_obj)})"
-                else:
-                    plan_display = f"{active_plan_info['plan_name_at_purchase']} (Expirado)"
-            # ...
-            values = (internal_id, member_item.get('full_name', 'N/A'), member_item.get('current_status', 'N/A'), 
-                      member_item.get('join_date_ui', 'N/A'), plan_display)
-            self.members_treeview.insert("", "end", values=values, iid=internal_id)
-        self.deselect_member()
+        self.controller.show_frame_by_name("MainMenuFrame")
+
+    def on_search_text_changed(self, *trace_args):
+        # Búsqueda mientras se teclea: cada pulsación reinicia la espera, así que al escribir seguido solo se busca al
+        # parar. Si una búsqueda ya lanzada sigue en curso cuando llega la siguiente, se interrumpe (TaskRunner).
+        if self.search_after_id: self.after_cancel(self.search_after_id)
+        self.search_after_id = self.after(MEMBER_SEARCH_DEBOUNCE_MS, self.load_member_list)
+
+    @coalesce_reloads
+    def load_member_list(self, event=None, select_member_id: str | None = None, keep_position: bool = False):
+        if self.search_after_id: self.after_cancel(self.search_after_id); self.search_after_id = None
+        search_term = sanitize_text_input(self.search_var.get()) or None
+        # Una consulta por bloque de socios visibles (con su membresía activa) más el recuento, en segundo
+        # plano e interrumpibles: una búsqueda nueva corta las anteriores (Connection.interrupt).
+        self.members_treeview.set_row_source(
+            lambda offset, limit, previous_row: get_members_summary_with_active_membership(
+                search_term=search_term, limit=limit, offset=offset),
+            lambda: count_members_summary(search_term=search_term),
+            on_loaded=self.on_member_count_loaded, keep_position=keep_position, busy_message="Cargando socios...")
+        if select_member_id: self.members_treeview.selection_set(select_member_id) # Se marca al llegar su bloque
+        else: self.members_treeview.selection_clear()
+
+    def on_member_count_loaded(self, total_members: int):
+        self.lbl_search_info.config(text=f"{total_members} socio(s)")
+
+    def format_member_row(self, member_item) -> tuple:
+        # Solo para las filas visibles: el formateo de fechas y planes no depende del tamaño del listado.
+        plan_display = "Ninguno"
+        if member_item.get('active_membership_id'):
+            expiry_dt_obj = member_item.get('active_expiry_date_obj')
+            if expiry_dt_obj and expiry_dt_obj >= date.today():
+                plan_display = f"{member_item['active_plan_name']} (Exp: {format_date_for_ui(expiry_dt_obj)})"
+            else:
+                plan_display = f"{member_item['active_plan_name']} (Expirado)"
+        return (member_item.get('internal_member_id', 'N/A'), member_item.get('full_name', 'N/A'),
+                member_item.get('current_status', 'N/A'), format_date_for_ui(member_item.get('join_date')) or 'N/A',
+                plan_display)
 
     # (Métodos on_member_selected, on_member_double_click, deselect_member sin cambios)
     def on_member_selected(self, event=None):
@@ -191,7 +218,8 @@ class MemberManagementFrame(ttk.Frame):
         dialog = MemberFormDialog(self, controller=self.controller, title=title, member_internal_id=member_id_to_edit)
         
         if dialog.result and dialog.result.get("success", False):
-            self.load_member_list() 
+            # El socio editado (o el nuevo) queda seleccionado; al editar, la lista no se mueve.
+            self.load_member_list(select_member_id=member_id_to_edit or dialog.result.get("id"), keep_position=for_editing)
             action_msg = "actualizado" if for_editing else "registrado"
             messagebox.showinfo(f"Miembro {action_msg.capitalize()}",
                                 f"Miembro '{dialog.result.get('full_name', 'N/A')}' {action_msg} exitosamente.", parent=self)
@@ -208,7 +236,7 @@ class MemberManagementFrame(ttk.Frame):
         
         dialog = MembershipManagementDialog(self, controller=self.controller, member_internal_id=self.selected_member_internal_id)
         if dialog.result and dialog.result.get("data_changed", False):
-             self.load_member_list()
+             self.load_member_list(select_member_id=self.selected_member_internal_id, keep_position=True)
 
     def on_show_frame(self, data_to_pass: dict | None = None):
         self.load_member_list()
@@ -218,7 +246,7 @@ class MemberManagementFrame(ttk.Frame):
         self.search_entry.focus_set()
 
     def clear_search_and_reload(self): # Definición si no estaba antes
-        self.search_var.set("")
+        self.search_var.set("") # La traza programa la recarga; se lanza ya
         self.load_member_list()
 
 # --- CLASES DE DIÁLOGO ---
@@ -430,6 +458,13 @@ class MemberFormDialog(tk.Toplevel):
              self.photo_label.config(text="Foto Eliminada")
 
     def display_photo_in_dialog(self, filepath):
+        try: # Pillow se carga la primera vez que se muestra una foto, no al arrancar la aplicación
+            from PIL import Image, ImageTk # Requiere: pip install Pillow
+        except ImportError:
+            print("ERROR (member_management_frame.py - display_photo_in_dialog): Pillow no está instalado (pip install Pillow).")
+            if hasattr(self, 'photo_label'): self.photo_label.config(image='', text="Sin vista previa\n(falta Pillow)")
+            self._photo_ref_dialog = None
+            return
         try:
             img = Image.open(filepath)
             # Escalar manteniendo aspecto para caber en aprox 150x150 (o tamaño del label)
@@ -674,17 +709,16 @@ class MembershipManagementDialog(tk.Toplevel):
         
         hist_cols = ("id", "plan_name", "price", "start", "expiry", "sessions", "status_plan") # Cambiado nombre col status
         hist_names = ("ID Memb.", "Nombre Plan", "Pagado", "Inicio", "Expira", "Sesiones", "Estado")
-        self.history_tree = ttk.Treeview(main_frame, columns=hist_cols, show="headings", selectmode="browse")
+        self.history_tree = VirtualTreeview(main_frame, columns=hist_cols, show="headings", selectmode="browse",
+                                            format_row=self.format_membership_row, row_id=lambda mem: mem.get('id'),
+                                            empty_values=("", "Sin membresías", "", "", "", "", ""))
         for col, name in zip(hist_cols, hist_names):
              width = 100; anchor="w"
              if col == "plan_name": width = 180
              elif col == "id": width = 70; anchor="center"
              self.history_tree.heading(col, text=name, anchor=anchor)
              self.history_tree.column(col, width=width, stretch=tk.YES, anchor=anchor)
-        self.history_tree.grid(row=0, column=0, sticky="nsew", pady=(0,10))
-        scrollbar = ttk.Scrollbar(main_frame, orient="vertical", command=self.history_tree.yview)
-        self.history_tree.configure(yscrollcommand=scrollbar.set)
-        scrollbar.grid(row=0, column=1, sticky="ns", pady=(0,10))
+        self.history_tree.grid(row=0, column=0, columnspan=2, sticky="nsew", pady=(0,10))
 
         add_form_frame = ttk.Labelframe(main_frame, text="Añadir Nueva Membresía", style="TLabelframe", padding=10)
         add_form_frame.grid(row=1, column=0, columnspan=2, sticky="ew", pady=5)
@@ -717,36 +751,26 @@ class MembershipManagementDialog(tk.Toplevel):
 
 
     def load_member_memberships_in_dialog(self): # Renombrar
-        for item in self.history_tree.get_children():
-            self.history_tree.delete(item)
-        
-        memberships = get_all_memberships_for_member(self.member_internal_id)
-        if not memberships:
-            self.history_tree.insert("", "end", values=("", "Sin membresías", "", "", "", "", ""))
-            return
-            
-        today = date.today() # Uso de 'date'
-        for mem in memberships:
-            # (Resto como antes, asegurando que las conversiones de Decimal y Date se hacen)
-            # Línea 510 y 514 (de error) estaban aquí o cerca.
-            price_paid_decimal = mem.get('price_paid_decimal', Decimal('0')) # Ya debería ser Decimal
-            expiry_dt_obj = mem.get('expiry_date_obj') # Ya debería ser objeto date
-            
-            status_plan_str = "Expirado"
-            if expiry_dt_obj and expiry_dt_obj >= today: # Uso de 'date'
-                status_plan_str = "Activo" if mem.get('is_current') else "Futuro"
-            elif expiry_dt_obj and expiry_dt_obj < today and mem.get('is_current'):
-                 status_plan_str = "Expirado (Error estado)"
-
-
-            values = (
-                mem.get('id'), mem.get('plan_name_at_purchase'), format_currency_for_display(price_paid_decimal),
-                format_date_for_ui(mem.get('start_date_obj')), format_date_for_ui(expiry_dt_obj),
-                f"{mem.get('sessions_remaining', 'N/A')} / {mem.get('sessions_total', 'N/A')}" if mem.get('sessions_total') is not None else "N/A",
-                status_plan_str
-            )
-            self.history_tree.insert("", "end", values=values)
+        self.history_tree.set_rows(get_all_memberships_for_member(self.member_internal_id))
 
+    def format_membership_row(self, mem) -> tuple:
+        today = date.today() # Uso de 'date'
+        # (Resto como antes, asegurando que las conversiones de Decimal y Date se hacen)
+        price_paid_decimal = mem.get('price_paid_decimal', Decimal('0')) # Ya debería ser Decimal
+        expiry_dt_obj = mem.get('expiry_date_obj') # Ya debería ser objeto date
+
+        status_plan_str = "Expirado"
+        if expiry_dt_obj and expiry_dt_obj >= today: # Uso de 'date'
+            status_plan_str = "Activo" if mem.get('is_current') else "Futuro"
+        elif expiry_dt_obj and expiry_dt_obj < today and mem.get('is_current'):
+             status_plan_str = "Expirado (Error estado)"
+
+        return (
+            mem.get('id'), mem.get('plan_name_at_purchase'), format_currency_for_display(price_paid_decimal),
+            format_date_for_ui(mem.get('start_date_obj')), format_date_for_ui(expiry_dt_obj),
+            f"{mem.get('sessions_remaining', 'N/A')} / {mem.get('sessions_total', 'N/A')}" if mem.get('sessions_total') is not None else "N/A",
+            status_plan_str
+        )
 
     def save_new_membership_for_member(self): # Renombrar
         selected_plan_display_name = self.selected_plan_key_var.get()
@@ -0,0 +1,93 @@
+# gimnasio_mgmt_gui/gui_frames/startup.py
+# Arranque en dos fases para que la ventana de login aparezca cuanto antes:
+#   1. main_gui solo importa lo necesario para pintar el login (tkinter, config, TaskRunner, login_frame).
+#   2. Con el login ya en pantalla, run_application_setup() (directorios, migraciones de la BD y superusuario)
+#      se ejecuta en el TaskRunner; el botón de entrar se habilita al terminar. Después, los módulos de los
+#      demás frames se importan de uno en uno cuando Tk está ocioso (preload_next_frame_module), para que
+#      abrir Socios o Finanzas la primera vez no tenga que esperar a la importación.
+# Las importaciones de los frames van en el hilo de Tk (por tramos cortos) y no en el pool: un módulo que
+# muestre un messagebox al importarse desde otro hilo bloquearía a Tk si este espera a la misma importación.
+# Los módulos pesados que solo usa una función (Pillow para las fotos, NumPy para la previsión) se importan
+# dentro de esa función. benchmarks/bench_startup.py mide el arranque y falla si se pasa del presupuesto.
+
+import importlib
+import time
+
+# Orden en que se precargan (los más usados tras iniciar sesión primero).
+STARTUP_PRELOAD_FRAME_MODULES = (
+    "gui_frames.main_menu_frame",
+    "gui_frames.member_management_frame",
+    "gui_frames.finance_management_frame",
+    "gui_frames.user_management_frame",
+)
+
+
+def run_application_setup() -> tuple[bool, str]:
+    """
+    Tareas de preparación críticas, sin Tk (se ejecuta en un hilo del TaskRunner con su propia conexión).
+    Devuelve (True, "") o (False, mensaje para el usuario).
+    """
+    from core_logic.utils import setup_app_data_directories
+    from core_logic.database import create_or_verify_tables
+    from core_logic.auth import initialize_superuser_account
+    print_prefix_setup = "INFO (startup.py - Setup):"
+
+    # 1. Asegurar directorios de datos de la aplicación
+    print(f"{print_prefix_setup} Verificando/Creando directorios de datos...")
+    if not setup_app_data_directories():
+        return False, ("No se pudieron crear los directorios necesarios para la aplicación.\n"
+                       "Verifique los permisos de escritura en la carpeta del proyecto.")
+
+    # 2. Inicializar la base de datos (aplicar migraciones pendientes; sin DDL si ya está al día)
+    print(f"{print_prefix_setup} Verificando/Creando tablas de la base de datos...")
+    if not create_or_verify_tables():
+        return False, ("No se pudo inicializar la base de datos (crear/verificar tablas).\n"
+                       "Verifique la consola para más detalles.")
+
+    # 3. Inicializar la cuenta de superusuario
+    print(f"{print_prefix_setup} Verificando/Creando cuenta de superusuario...")
+    initialize_superuser_account()
+    print(f"{print_prefix_setup} Configuración inicial completada exitosamente.")
+    return True, ""
+
+
+def preload_next_frame_module(pending_modules: list[str]) -> bool:
+    """
+    Importa el siguiente módulo pendiente (lo quita de la lista). Devuelve False cuando ya no quedan.
+    Un fallo solo se informa: al abrir ese frame, main_gui vuelve a intentarlo y muestra el error.
+    """
+    if not pending_modules: return False
+    module_name = pending_modules.pop(0)
+    try:
+        importlib.import_module(module_name)
+    except Exception as e:
+        print(f"ERROR (startup.py - preload_next_frame_module): No se pudo precargar '{module_name}': {e}")
+    return bool(pending_modules)
+
+
+class StartupTimeline:
+    """Momentos del arranque en ms desde que se crea la aplicación (los lee bench_startup.py)."""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.marks: dict[str, float] = {}
+
+    def mark(self, step: str) -> float:
+        elapsed_ms = (time.perf_counter() - self.started_at) * 1000
+        self.marks.setdefault(step, elapsed_ms)
+        return elapsed_ms
+
+    def __contains__(self, step: str) -> bool:
+        return step in self.marks
+
+    def summary(self) -> str:
+        return ", ".join(f"{step} {elapsed_ms:,.0f} ms" for step, elapsed_ms in self.marks.items())
+
+
+if __name__ == "__main__":
+    timeline = StartupTimeline()
+    pending = list(STARTUP_PRELOAD_FRAME_MODULES)
+    while preload_next_frame_module(pending):
+        pass
+    timeline.mark("frames importados")
+    print(f"  {timeline.summary()}")
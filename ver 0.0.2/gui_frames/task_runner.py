@@ -0,0 +1,229 @@
+# gimnasio_mgmt_gui/gui_frames/task_runner.py
+# Ejecución en segundo plano de las llamadas a core_logic para que el bucle de Tk nunca se quede
+# esperando a la BD (Windows muestra "No responde" en cuanto la ventana deja de procesar eventos).
+#
+# Uso desde un frame (el controlador GymManagerApp crea un único TaskRunner en self.task_runner):
+#     self.controller.task_runner.submit(get_members_summary_with_active_membership, term,
+#                                        owner=self, key="member_list", on_success=self.fill_member_tree)
+#
+# - La función se ejecuta en un hilo del pool; cada hilo usa su propia conexión persistente de
+#   core_logic.database (get_db_connection ya es por hilo), así que core_logic no cambia.
+# - on_success / on_error se ejecutan SIEMPRE en el hilo de Tk: los resultados vuelven por una cola
+#   que se vacía con after() mientras haya tareas pendientes (Tk no admite llamadas desde otros hilos).
+# - Una tarea nueva con la misma (owner, key) cancela la anterior: si aún no empezó no llega a
+#   ejecutarse y, si ya estaba en marcha, su resultado se descarta. Tampoco se entregan resultados a
+#   un owner ya destruido.
+# - Con interruptible=True (solo para LECTURAS), cancelar una tarea en marcha además interrumpe su
+#   consulta con Connection.interrupt() en la conexión del hilo que la ejecuta, que queda libre enseguida.
+
+import queue
+import threading
+import itertools
+
+try:
+    from config import TASK_RUNNER_MAX_WORKERS, TASK_RUNNER_POLL_INTERVAL_MS
+except ImportError as e:
+    print(f"ADVERTENCIA (task_runner.py): No se pudo importar config. Usando valores por defecto. Error: {e}")
+    TASK_RUNNER_MAX_WORKERS = 3
+    TASK_RUNNER_POLL_INTERVAL_MS = 15
+
+from core_logic.database import get_db_connection
+
+# Protege TaskHandle.connection: interrupt() solo se llama mientras la función de ESA tarea sigue en
+# marcha, nunca cuando el hilo ya empezó otra tarea con la misma conexión.
+_interrupt_lock = threading.Lock()
+
+
+class TaskHandle:
+    """Una tarea enviada al TaskRunner. cancel() evita que se entregue su resultado."""
+    __slots__ = ("task_id", "name", "owner", "key", "busy_message", "on_success", "on_error", "future", "cancelled",
+                 "connection")
+
+    def __init__(self, task_id: int, name: str, owner, key, busy_message, on_success, on_error):
+        self.task_id = task_id
+        self.name = name
+        self.owner = owner
+        self.key = key
+        self.busy_message = busy_message
+        self.on_success = on_success
+        self.on_error = on_error
+        self.future = None
+        self.cancelled = False
+        self.connection = None # Conexión del hilo mientras ejecuta una tarea interrumpible
+
+    def cancel(self):
+        self.cancelled = True
+        if self.future is not None:
+            self.future.cancel() # Solo surte efecto si aún no empezó; si no, se descarta el resultado
+        with _interrupt_lock:
+            if self.connection is not None:
+                self.connection.interrupt()
+
+    @property
+    def done(self) -> bool:
+        return self.future is not None and self.future.done()
+
+
+class TaskRunner:
+    """
+    Pool de hilos para las llamadas a core_logic, con entrega de resultados en el hilo de Tk,
+    cancelación por clave y aviso de "ocupado" a los interesados (la barra de estado de la ventana).
+    """
+
+    def __init__(self, tk_root, max_workers: int = TASK_RUNNER_MAX_WORKERS):
+        self.tk_root = tk_root
+        self._max_workers = max_workers
+        self._executor = None # Se crea con la primera tarea (concurrent.futures no retrasa la ventana de login)
+        self._completed: queue.SimpleQueue = queue.SimpleQueue() # Handles terminados (desde los hilos del pool)
+        self._active: dict[int, TaskHandle] = {} # Solo se toca desde el hilo de Tk
+        self._latest_by_key: dict[tuple, TaskHandle] = {}
+        self._task_ids = itertools.count(1)
+        self._busy_listeners = []
+        self._poll_after_id = None
+        self._is_shut_down = False
+
+    # --- ENVÍO Y CANCELACIÓN ---
+    def submit(self, func, *args, owner=None, key: str | None = None, on_success=None, on_error=None,
+               busy_message: str | None = None, interruptible: bool = False, **kwargs) -> TaskHandle | None:
+        """
+        Ejecuta func(*args, **kwargs) en segundo plano. on_success(resultado) u on_error(excepción) se
+        llaman después en el hilo de Tk. `busy_message` se muestra en la barra de estado mientras dure.
+        interruptible=True permite cortar la consulta en curso al cancelarla (nunca en escrituras).
+        Devuelve None si el runner ya se cerró.
+        """
+        if self._is_shut_down:
+            return None
+        full_key = (str(owner), key) if key is not None else None
+        if full_key is not None and full_key in self._latest_by_key:
+            self._latest_by_key.pop(full_key).cancel()
+        handle = TaskHandle(next(self._task_ids), getattr(func, "__name__", repr(func)), owner, full_key,
+                            busy_message, on_success, on_error)
+        if full_key is not None:
+            self._latest_by_key[full_key] = handle
+        self._active[handle.task_id] = handle
+        executor = self._get_executor()
+        if interruptible:
+            handle.future = executor.submit(self._run_interruptible, handle, func, args, kwargs)
+        else:
+            handle.future = executor.submit(func, *args, **kwargs)
+        handle.future.add_done_callback(lambda _future, h=handle: self._completed.put(h))
+        self._notify_busy_listeners()
+        self._schedule_poll()
+        return handle
+
+    def _get_executor(self):
+        if self._executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="gym_task")
+        return self._executor
+
+    @staticmethod
+    def _run_interruptible(handle: TaskHandle, func, args, kwargs):
+        """En el hilo del pool: deja a mano la conexión del hilo para que cancel() pueda interrumpirla."""
+        conn = get_db_connection()
+        with _interrupt_lock:
+            if handle.cancelled: return None
+            handle.connection = conn
+        try:
+            return func(*args, **kwargs)
+        finally:
+            with _interrupt_lock:
+                handle.connection = None
+
+    def cancel(self, owner=None, key: str | None = None):
+        """Cancela la tarea (owner, key), todas las de `owner` si key es None, o todas si ambos lo son."""
+        for handle in list(self._active.values()):
+            if (owner is None or handle.owner is owner) and (key is None or handle.key == (str(owner), key)):
+                handle.cancel()
+
+    # --- ENTREGA DE RESULTADOS (hilo de Tk) ---
+    def _schedule_poll(self):
+        if self._poll_after_id is None and not self._is_shut_down:
+            self._poll_after_id = self.tk_root.after(TASK_RUNNER_POLL_INTERVAL_MS, self._drain_completed)
+
+    def _drain_completed(self):
+        self._poll_after_id = None
+        delivered_any = False
+        while True:
+            try:
+                handle = self._completed.get_nowait()
+            except queue.Empty:
+                break
+            self._active.pop(handle.task_id, None)
+            if handle.key is not None and self._latest_by_key.get(handle.key) is handle:
+                del self._latest_by_key[handle.key]
+            self._deliver(handle); delivered_any = True
+        if delivered_any:
+            self._notify_busy_listeners()
+        if self._active:
+            self._schedule_poll()
+
+    def _deliver(self, handle: TaskHandle):
+        if handle.cancelled or handle.future.cancelled():
+            return
+        if handle.owner is not None:
+            try:
+                if not handle.owner.winfo_exists(): return
+            except Exception: # El widget ya no existe en Tcl
+                return
+        error = handle.future.exception()
+        try:
+            if error is None:
+                if handle.on_success: handle.on_success(handle.future.result())
+            elif handle.on_error:
+                handle.on_error(error)
+            else:
+                print(f"ERROR (task_runner.py - {handle.name}): {error!r}")
+        except Exception as e: # Un fallo al pintar un resultado no debe dejar la cola sin vaciar
+            print(f"ERROR (task_runner.py - {handle.name}): Fallo al entregar el resultado: {e!r}")
+
+    # --- INDICADOR DE OCUPADO ---
+    def add_busy_listener(self, callback):
+        """callback(tareas_activas: int, mensaje: str | None) cada vez que cambia el número de tareas."""
+        self._busy_listeners.append(callback)
+
+    def _notify_busy_listeners(self):
+        active_handles = [h for h in self._active.values() if not h.cancelled]
+        message = next((h.busy_message for h in reversed(active_handles) if h.busy_message), None)
+        for callback in self._busy_listeners:
+            try:
+                callback(len(active_handles), message)
+            except Exception as e:
+                print(f"ERROR (task_runner.py - _notify_busy_listeners): {e!r}")
+
+    @property
+    def active_task_count(self) -> int:
+        return sum(1 for h in self._active.values() if not h.cancelled)
+
+    # --- CIERRE ---
+    def shutdown(self):
+        """Cancela lo pendiente y espera a que terminen las tareas en marcha (p. ej. un proceso por lotes)."""
+        self._is_shut_down = True
+        for handle in self._active.values():
+            handle.cancel()
+        if self._poll_after_id is not None:
+            try:
+                self.tk_root.after_cancel(self._poll_after_id)
+            except Exception: # La ventana ya se destruyó
+                pass
+            self._poll_after_id = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+if __name__ == "__main__":
+    import time
+    import tkinter as tk
+
+    root = tk.Tk(); root.withdraw()
+    runner = TaskRunner(root)
+    runner.add_busy_listener(lambda count, message: print(f"  ocupado: {count} tarea(s) {message or ''}"))
+
+    def slow_square(value):
+        time.sleep(0.2); return value * value
+
+    runner.submit(slow_square, 3, key="demo", on_success=lambda r: print("  descartado (cancelado):", r))
+    runner.submit(slow_square, 4, key="demo", busy_message="Calculando...", on_success=lambda r: print("  resultado:", r))
+    runner.submit(lambda: 1 / 0, on_error=lambda e: print("  error entregado en el hilo de Tk:", repr(e)))
+    root.after(1000, root.quit); root.mainloop()
+    runner.shutdown(); root.destroy()
@@ -0,0 +1,148 @@
+# gimnasio_mgmt_gui/gui_frames/treeview_sync.py
+# Refresco incremental de los Treeview: en vez de borrar todos los items y volver a insertarlos (parpadeo,
+# se pierden selección y desplazamiento, y una fila cambiada cuesta O(n) llamadas a Tk), se comparan las
+# filas nuevas con los items actuales por iid y solo se insertan, actualizan, mueven o borran las que cambian.
+#
+# Uso:
+#     self.users_sync = TreeviewSync(self.users_treeview)
+#     self.users_sync.sync((user['username'], self.format_user_row(user)) for user in users_data)
+#
+# Y en los frames, para que varias recargas seguidas (aviso de otro PC + recarga tras guardar, o un proceso
+# que recarga varias listas) lancen una sola consulta:
+#     @coalesce_reloads
+#     def load_user_list(self, select_username=None): ...
+
+import functools
+from bisect import bisect_left
+
+import tkinter as tk
+
+
+class TreeviewSync:
+    """
+    Reconciliador de los items de primer nivel de un Treeview. Guarda el orden y los valores que pintó
+    (así no pregunta a Tk por cada item); todo lo que se pinte en ese Treeview debe pasar por sync().
+    """
+
+    def __init__(self, tree, parent: str = ""):
+        self.tree = tree
+        self.parent = parent
+        self._order: list[str] | None = None # iid de los items en pantalla, en orden (None: aún sin leer)
+        self._values: dict[str, tuple] = {}
+
+    def sync(self, rows) -> int:
+        """
+        Deja el Treeview con `rows` ((iid, valores) en orden) y devuelve las operaciones de Tk hechas.
+        Un iid repetido se pinta una sola vez (la primera). Los items que siguen en pantalla conservan
+        su selección y el desplazamiento no se mueve.
+        """
+        if self._order is None: # Lo que ya hubiera en el Treeview: se reutiliza y sus valores se reescriben
+            self._order = list(self.tree.get_children(self.parent))
+        desired: dict[str, tuple] = {}
+        for iid, values in rows:
+            iid = str(iid)
+            if iid not in desired: desired[iid] = tuple(values)
+        operations = 0
+
+        stale = [iid for iid in self._order if iid not in desired]
+        if stale:
+            self.tree.delete(*stale); operations += 1
+            for iid in stale: self._values.pop(iid, None)
+            self._order = [iid for iid in self._order if iid in desired]
+
+        # Los items que ya estaban y forman la subsecuencia creciente más larga de sus posiciones no se
+        # tocan; el resto se descuelgan (una sola llamada) y se vuelven a colgar en su sitio.
+        old_positions = {iid: position for position, iid in enumerate(self._order)}
+        kept = [iid for iid in desired if iid in old_positions]
+        stable = _longest_increasing_subsequence(kept, old_positions)
+        moving = [iid for iid in kept if iid not in stable]
+        if moving:
+            self.tree.detach(*moving); operations += 1
+            self._order = [iid for iid in self._order if iid in stable]
+
+        for index, (iid, values) in enumerate(desired.items()):
+            if index < len(self._order) and self._order[index] == iid: # Ya está en su sitio
+                if self._values.get(iid) != values:
+                    self.tree.item(iid, values=values); operations += 1
+            elif iid in old_positions: # Descolgado arriba: se mueve a su posición
+                self.tree.move(iid, self.parent, index); operations += 1
+                if self._values.get(iid) != values:
+                    self.tree.item(iid, values=values); operations += 1
+                self._order.insert(index, iid)
+            else:
+                self.tree.insert(self.parent, index, iid=iid, values=values); operations += 1
+                self._order.insert(index, iid)
+            self._values[iid] = values
+        return operations
+
+    def clear(self) -> int:
+        return self.sync(())
+
+    @property
+    def iids(self) -> list[str]:
+        return list(self._order or ())
+
+
+def _longest_increasing_subsequence(iids: list[str], positions: dict[str, int]) -> set[str]:
+    """iid de la subsecuencia más larga cuyas posiciones antiguas van en orden (los que no hace falta mover)."""
+    tails: list[int] = [] # Posición final más baja de cada longitud
+    tail_indexes: list[int] = []
+    previous: list[int] = [-1] * len(iids)
+    for index, iid in enumerate(iids):
+        position = positions[iid]
+        length = bisect_left(tails, position)
+        if length == len(tails):
+            tails.append(position); tail_indexes.append(index)
+        else:
+            tails[length] = position; tail_indexes[length] = index
+        previous[index] = tail_indexes[length - 1] if length else -1
+    stable = set()
+    index = tail_indexes[-1] if tail_indexes else -1
+    while index != -1:
+        stable.add(iids[index]); index = previous[index]
+    return stable
+
+
+def coalesce_reloads(method):
+    """
+    Decorador para los load_* de los frames: las llamadas que llegan antes de que Tk quede ocioso se
+    juntan en una sola ejecución (after_idle), con los argumentos posicionales de la última y la unión de
+    los argumentos por nombre (los de la última mandan), p. ej. select_member_id de una y keep_position de otra.
+    """
+    @functools.wraps(method)
+    def wrapper(widget, *args, **kwargs):
+        pending = widget.__dict__.setdefault("_pending_reloads", {})
+        if method.__name__ in pending:
+            _, previous_kwargs = pending[method.__name__]
+            pending[method.__name__] = (args, {**previous_kwargs, **kwargs})
+            return
+        pending[method.__name__] = (args, kwargs)
+        widget.after_idle(lambda: _run_pending_reload(widget, method))
+    return wrapper
+
+
+def _run_pending_reload(widget, method):
+    args, kwargs = widget.__dict__["_pending_reloads"].pop(method.__name__)
+    try:
+        if not widget.winfo_exists(): return
+    except tk.TclError: # El frame se destruyó antes de quedar Tk ocioso
+        return
+    method(widget, *args, **kwargs)
+
+
+if __name__ == "__main__":
+    from tkinter import ttk
+
+    root = tk.Tk(); root.withdraw()
+    tree = ttk.Treeview(root, columns=("name", "status"), show="headings")
+    tree_sync = TreeviewSync(tree)
+    members = [(f"MBR-{number:04d}", (f"Socio {number}", "Activo")) for number in range(1000)]
+    print("  alta inicial:", tree_sync.sync(members), "operaciones")
+    tree.selection_set("MBR-0500")
+    members[500] = ("MBR-0500", ("Socio 500 (editado)", "Activo"))
+    print("  una fila editada:", tree_sync.sync(members), "operaciones; selección:", tree.selection())
+    members.insert(0, members.pop(999)); del members[10]
+    print("  una fila movida y otra borrada:", tree_sync.sync(members), "operaciones")
+    assert list(tree.get_children()) == [iid for iid, _ in members]
+    assert tree.item("MBR-0500", "values")[0] == "Socio 500 (editado)"
+    root.destroy()
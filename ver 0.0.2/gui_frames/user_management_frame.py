@@ -26,6 +26,8 @@ try:
         update_user_password
     )
     from core_logic.utils import is_valid_system_username, check_password_strength, format_datetime_for_ui
+    from core_logic.database import subscribe_to_database_changes, unsubscribe_from_database_changes
+    from gui_frames.treeview_sync import TreeviewSync, coalesce_reloads
 except ImportError as e:
     messagebox.showerror("Error de Carga (UserManagement)", f"No se pudieron cargar componentes para Gestión de Usuarios.\nError: {e}")
     raise
@@ -43,6 +45,16 @@ class UserManagementFrame(ttk.Frame):
         self.create_widgets()
         self.grid_widgets()
         self.load_user_list()
+        subscribe_to_database_changes(self.on_database_changed, ("system_users",))
+
+    def destroy(self):
+        unsubscribe_from_database_changes(self.on_database_changed)
+        super().destroy()
+
+    def on_database_changed(self, changed_tables: set[str]):
+        # Otro PC creó/editó usuarios (o alguien inició sesión): recargar la lista conservando la selección.
+        if self.controller.current_frame is not self: return
+        self.load_user_list(select_username=self.selected_username)
 
     def create_widgets(self):
         # (Código de create_widgets sin cambios funcionales aquí)
@@ -80,6 +92,7 @@ class UserManagementFrame(ttk.Frame):
 
 
         self.users_treeview.bind("<<TreeviewSelect>>", self.on_user_selected_in_tree)
+        self.users_sync = TreeviewSync(self.users_treeview) # Recargas por diferencias (iid = nombre de usuario)
 
         self.tree_scrollbar_y = ttk.Scrollbar(self, orient="vertical", command=self.users_treeview.yview)
         self.users_treeview.configure(yscrollcommand=self.tree_scrollbar_y.set)
@@ -102,39 +115,37 @@ class UserManagementFrame(ttk.Frame):
         self.tree_scrollbar_y.grid(row=1, column=1, sticky="ns", padx=(0,5), pady=5)
 
 
-    def load_user_list(self):
-        for item in self.users_treeview.get_children():
-            self.users_treeview.delete(item)
-        
+    @coalesce_reloads
+    def load_user_list(self, select_username: str | None = None):
         current_user_role = self.controller.current_user_info.get('role') if self.controller.current_user_info else None
         exclude_su = (current_user_role != ROLE_SUPERUSER)
-        users_data = get_all_system_users(exclude_superuser=exclude_su)
-
-        if users_data:
-            for user_item in users_data:
-                user_id_db = user_item.get('id', 'N/A')
-                username = user_item.get('username', 'N/A')
-                role = user_item.get('role', 'N/A')
-                is_active_num = user_item.get('is_active', 0)
-                status_text = "Activo" if is_active_num == 1 else "Inactivo"
-                
-                last_login_raw = user_item.get('last_login_at')
-                last_login_ui = "Nunca"
-                if isinstance(last_login_raw, str):
-                    try:
-                        # Línea 127 (del error) donde se usa `datetime`
-                        dt_obj = datetime.fromisoformat(last_login_raw) # Uso de `datetime`
-                        last_login_ui = format_datetime_for_ui(dt_obj) # Asumimos que esta función existe en utils
-                    except ValueError:
-                        last_login_ui = "Fecha Inv." 
-                elif isinstance(last_login_raw, datetime): # Si ya es un objeto datetime
-                     last_login_ui = format_datetime_for_ui(last_login_raw)
-
-
-                values = (user_id_db, username, role, status_text, last_login_ui)
-                self.users_treeview.insert("", "end", values=values, iid=username)
-        
-        self.deselect_user()
+        self.controller.task_runner.submit(
+            get_all_system_users, exclude_superuser=exclude_su, owner=self, key="user_list",
+            busy_message="Cargando usuarios...", on_success=lambda users_data: self.fill_user_list(users_data, select_username))
+
+    def fill_user_list(self, users_data: list, select_username: str | None = None):
+        # Solo cambian los usuarios nuevos, editados o borrados: el resto conserva selección y desplazamiento.
+        self.users_sync.sync((user_item.get('username', 'N/A'), self.format_user_row(user_item)) for user_item in users_data or ())
+        if select_username and self.users_treeview.exists(select_username):
+            self.users_treeview.selection_set(select_username); self.users_treeview.see(select_username)
+        if self.users_treeview.selection():
+            self.on_user_selected_in_tree() # Rol o estado pueden haber cambiado: recalcular los botones
+        else:
+            self.deselect_user() # El seleccionado se borró (o no había selección)
+
+    def format_user_row(self, user_item: dict) -> tuple:
+        status_text = "Activo" if user_item.get('is_active', 0) == 1 else "Inactivo"
+        last_login_raw = user_item.get('last_login_at')
+        last_login_ui = "Nunca"
+        if isinstance(last_login_raw, str):
+            try:
+                dt_obj = datetime.fromisoformat(last_login_raw)
+                last_login_ui = format_datetime_for_ui(dt_obj) # Asumimos que esta función existe en utils
+            except ValueError:
+                last_login_ui = "Fecha Inv." 
+        elif isinstance(last_login_raw, datetime): # Si ya es un objeto datetime
+            last_login_ui = format_datetime_for_ui(last_login_raw)
+        return (user_item.get('id', 'N/A'), user_item.get('username', 'N/A'), user_item.get('role', 'N/A'), status_text, last_login_ui)
 
     # (Resto de los métodos de UserManagementFrame como on_user_selected_in_tree,
     #  deselect_user, update_action_buttons_state, open_create_user_dialog,
@@ -180,7 +191,7 @@ class UserManagementFrame(ttk.Frame):
     def open_create_user_dialog(self):
         dialog = UserFormDialog(self, controller=self.controller, title="Crear Nuevo Usuario del Sistema", existing_username=None)
         if dialog.result and dialog.result.get("success"): 
-            self.load_user_list() 
+            self.load_user_list(select_username=dialog.result.get('username')) 
             messagebox.showinfo("Usuario Creado", f"Usuario '{dialog.result.get('username', 'N/A')}' creado.", parent=self)
 
     def open_edit_user_dialog(self):
@@ -190,7 +201,7 @@ class UserManagementFrame(ttk.Frame):
         
         dialog = UserFormDialog(self, controller=self.controller, title=f"Modificar Usuario: {self.selected_username}", existing_username=self.selected_username)
         if dialog.result and dialog.result.get("success"):
-            self.load_user_list()
+            self.load_user_list(select_username=self.selected_username)
             messagebox.showinfo("Usuario Modificado", f"Usuario '{self.selected_username}' modificado.", parent=self)
 
     def open_change_password_dialog(self):
@@ -526,6 +537,8 @@ class ChangePasswordDialog(tk.Toplevel):
 
 # --- Para probar este frame de forma aislada ---
 if __name__ == "__main__":
+    from gui_frames.task_runner import TaskRunner
+
     class MockAppController(tk.Tk):
         def __init__(self):
             super().__init__()
@@ -539,6 +552,7 @@ if __name__ == "__main__":
             except: pass
             self.style.configure("Error.TLabel", foreground="red")
             self.style.configure("TFrame", background="#F0F0F0") # Asegurar que los TFrame tengan bg
+            self.task_runner = TaskRunner(self); self.current_frame = None
 
         def show_frame_by_name(self, frame_name):
             print(f"Mock Controller: Show frame '{frame_name}' (no action)")
@@ -0,0 +1,436 @@
+# gimnasio_mgmt_gui/gui_frames/virtual_treeview.py
+# Treeview "virtual" para los listados grandes (socios, transacciones...): solo existen como items de Tk
+# las filas que caben en pantalla. Los datos se piden a core_logic por bloques (ventanas LIMIT/OFFSET o a
+# partir de la fila anterior) según se desplaza el usuario, en segundo plano con el TaskRunner, y se
+# guardan los últimos bloques usados. Las listas pequeñas ya cargadas (set_rows) se pintan igual.
+# El repintado se hace una vez por ciclo del bucle de Tk (after_idle) y por diferencias (TreeviewSync): al
+# desplazar o recargar solo cambian los items de las filas que entran, salen o se modificaron.
+#
+# Uso (sustituye a ttk.Treeview + su ttk.Scrollbar; se coloca con grid/pack como cualquier frame):
+#     self.members_treeview = VirtualTreeview(parent, columns=cols, show="headings", selectmode="browse",
+#                                             task_runner=controller.task_runner,
+#                                             format_row=self.format_member_row, row_id=lambda m: m["internal_member_id"])
+#     self.members_treeview.set_row_source(fetch_rows, count_rows, on_loaded=self.on_member_count_loaded)
+#   - fetch_rows(offset, limit, previous_row) -> lista de filas; previous_row es la fila justo anterior a la
+#     ventana si ya se conoce (para saltar por índice en vez de recorrer el OFFSET), si no None.
+#   - count_rows() -> número total de filas.
+#   Ambas se ejecutan en un hilo del pool (sin tocar Tk); format_row(fila) -> valores, en el hilo de Tk.
+#
+# heading(), column(), bind(), selection(), selection_set(), exists(), see() y focus_set() se usan como en
+# ttk.Treeview, pero la selección es lógica (por iid): se conserva aunque la fila salga de la pantalla.
+
+import tkinter as tk
+from tkinter import ttk
+from collections import OrderedDict
+
+from gui_frames.treeview_sync import TreeviewSync
+
+try:
+    from config import VIRTUAL_TREEVIEW_BLOCK_SIZE, VIRTUAL_TREEVIEW_MAX_CACHED_BLOCKS
+except ImportError as e:
+    print(f"ADVERTENCIA (virtual_treeview.py): No se pudo importar config. Usando valores por defecto. Error: {e}")
+    VIRTUAL_TREEVIEW_BLOCK_SIZE = 100
+    VIRTUAL_TREEVIEW_MAX_CACHED_BLOCKS = 20
+
+WHEEL_SCROLL_ROWS = 3 # Filas por paso de la rueda del ratón
+_PLACEHOLDER_IID_PREFIX = "__virtual_row_" # Filas aún sin cargar (y el aviso de lista vacía)
+
+
+class VirtualTreeview(ttk.Frame):
+    """
+    Lista con cabeceras que solo materializa la ventana visible. El total de filas lo da count_rows() (o
+    len() de la lista de set_rows) y la barra de desplazamiento se mueve sobre ese total.
+    """
+
+    def __init__(self, parent, columns, task_runner=None, format_row=None, row_id=None,
+                 placeholder_text: str = "Cargando...", empty_values: tuple | None = None,
+                 block_size: int = VIRTUAL_TREEVIEW_BLOCK_SIZE, **treeview_options):
+        super().__init__(parent, style="TFrame")
+        self.task_runner = task_runner # Sin runner, los bloques se piden en el momento (solo para listas rápidas)
+        self.format_row = format_row or tuple
+        self.row_id = row_id
+        self.placeholder_values = (placeholder_text,) + ("",) * (len(columns) - 1)
+        self.empty_values = empty_values # Fila informativa si el listado está vacío ("Sin membresías")
+        self.block_size = block_size
+
+        self.tree = ttk.Treeview(self, columns=columns, **treeview_options)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.yview)
+        self.tree.grid(row=0, column=0, sticky="nsew"); self.scrollbar.grid(row=0, column=1, sticky="ns")
+        self.columnconfigure(0, weight=1); self.rowconfigure(0, weight=1)
+
+        self._fetch_rows = None
+        self._count_rows = None
+        self._on_loaded = None
+        self._busy_message = None
+        self._rows_in_memory: list | None = None
+        self._blocks: OrderedDict[int, list] = OrderedDict() # Índice de bloque -> filas (LRU)
+        self._pending_blocks: set[int] = set()
+        self._generation = 0 # Cambia con cada origen de datos; descarta respuestas de consultas anteriores
+        self._awaiting_new_source = False # Se sigue viendo lo anterior hasta que llegue lo nuevo (sin parpadeo)
+        self._total_rows: int | None = None
+        self._first_row = 0
+        self._visible_rows = max(1, int(self.tree.cget("height")))
+        self._row_height, self._header_height = self._estimate_row_metrics()
+        self._tree_sync = TreeviewSync(self.tree)
+        self._render_after_id = None # Repintado pendiente (uno por ciclo del bucle de Tk)
+        self._rendered_iids: list[str] = [] # iid de cada fila pintada, desde _rendered_first_row
+        self._rendered_first_row = 0
+        self._rendered_generation = 0
+        self._selected_iid: str | None = None
+        self._pending_selection_index: int | None = None # Fila elegida con el teclado que aún no ha llegado
+        self._select_callbacks = []
+
+        self.tree.bind("<<TreeviewSelect>>", self._on_tree_select)
+        self.tree.bind("<Configure>", self._on_tree_configure)
+        self.tree.bind("<MouseWheel>", self._on_mouse_wheel) # Windows y macOS
+        self.tree.bind("<Button-4>", lambda event: self._scroll_rows(-WHEEL_SCROLL_ROWS)) # Linux (X11)
+        self.tree.bind("<Button-5>", lambda event: self._scroll_rows(WHEEL_SCROLL_ROWS))
+        for sequence, step in (("<Up>", -1), ("<Down>", 1), ("<Prior>", "page_up"), ("<Next>", "page_down"),
+                               ("<Home>", "home"), ("<End>", "end")):
+            self.tree.bind(sequence, lambda event, step=step: self._move_selection(step))
+
+    def _estimate_row_metrics(self) -> tuple[int, int]:
+        """Alto de fila del estilo (main_gui fija rowheight); se corrige con bbox() tras pintar."""
+        try:
+            row_height = int(ttk.Style(self).lookup(self.tree.cget("style") or "Treeview", "rowheight"))
+        except (ValueError, tk.TclError):
+            row_height = 20
+        return row_height, row_height + 4
+
+    def destroy(self):
+        if self.task_runner is not None: self.task_runner.cancel(owner=self)
+        if self._render_after_id is not None: self.after_cancel(self._render_after_id)
+        super().destroy()
+
+    # --- ORIGEN DE LOS DATOS ---
+    def set_row_source(self, fetch_rows, count_rows, on_loaded=None, keep_position: bool = False,
+                       busy_message: str | None = None):
+        """
+        Listado consultado por ventanas. on_loaded(total) se llama en el hilo de Tk al conocer el total.
+        keep_position=True (recargas tras guardar o por cambios de otro PC) mantiene la fila superior.
+        """
+        self._start_new_source()
+        self._fetch_rows, self._count_rows = fetch_rows, count_rows
+        self._on_loaded, self._busy_message = on_loaded, busy_message
+        self._awaiting_new_source = True
+        if not keep_position: self._first_row = 0
+        generation = self._generation
+        if self.task_runner is None:
+            self._on_count_loaded(generation, count_rows())
+        else:
+            self.task_runner.submit(count_rows, owner=self, key="count", busy_message=busy_message, interruptible=True,
+                                    on_success=lambda total: self._on_count_loaded(generation, total),
+                                    on_error=lambda error: self._on_source_error(generation, "count_rows", error))
+        self._request_missing_blocks() # El primer bloque va en paralelo con el recuento
+
+    def set_rows(self, rows: list):
+        """Listado pequeño ya cargado (ítems recurrentes, historial de membresías): sin consultas por bloques."""
+        self._start_new_source()
+        self._rows_in_memory = list(rows)
+        self._total_rows = len(self._rows_in_memory)
+        self._refresh_view()
+        if self._selected_iid is not None and self._index_of(self._selected_iid) is None:
+            self.selection_clear() # La fila seleccionada ya no está (p. ej. se borró)
+
+    def refresh(self):
+        """Vuelve a consultar el origen actual sin mover la posición ni la selección."""
+        if self._fetch_rows is not None:
+            self.set_row_source(self._fetch_rows, self._count_rows, self._on_loaded, keep_position=True,
+                                busy_message=self._busy_message)
+
+    def _start_new_source(self):
+        if self.task_runner is not None: self.task_runner.cancel(owner=self) # Interrumpe las consultas anteriores
+        self._generation += 1
+        self._fetch_rows = self._count_rows = None
+        self._rows_in_memory = None
+        self._blocks.clear(); self._pending_blocks.clear()
+        self._total_rows = None
+        self._awaiting_new_source = False
+
+    @property
+    def total_rows(self) -> int | None:
+        return self._total_rows
+
+    # --- CARGA POR BLOQUES ---
+    def _request_missing_blocks(self):
+        """Pide los bloques de la ventana visible más medio bloque por arriba y por abajo."""
+        if self._fetch_rows is None: return
+        buffer_rows = self.block_size // 2
+        first = max(0, self._first_row - buffer_rows)
+        last = self._first_row + self._visible_rows + buffer_rows
+        if self._total_rows is not None: last = min(last, self._total_rows)
+        if last <= first: return
+        for block_index in range(first // self.block_size, (last - 1) // self.block_size + 1):
+            if block_index in self._blocks:
+                self._blocks.move_to_end(block_index)
+            elif block_index not in self._pending_blocks:
+                self._request_block(block_index)
+
+    def _request_block(self, block_index: int):
+        self._pending_blocks.add(block_index)
+        previous_block = self._blocks.get(block_index - 1)
+        previous_row = previous_block[-1] if previous_block and len(previous_block) == self.block_size else None
+        args = (block_index * self.block_size, self.block_size, previous_row)
+        generation = self._generation
+        if self.task_runner is None:
+            self._on_block_loaded(generation, block_index, self._fetch_rows(*args)); return
+        self.task_runner.submit(self._fetch_rows, *args, owner=self, key=f"block_{block_index}", interruptible=True,
+                                on_success=lambda rows: self._on_block_loaded(generation, block_index, rows),
+                                on_error=lambda error: self._on_source_error(generation, "fetch_rows", error, block_index))
+
+    def _on_block_loaded(self, generation: int, block_index: int, rows: list):
+        if generation != self._generation: return
+        self._pending_blocks.discard(block_index)
+        self._blocks[block_index] = rows
+        while len(self._blocks) > VIRTUAL_TREEVIEW_MAX_CACHED_BLOCKS:
+            self._blocks.popitem(last=False) # Los bloques de la ventana visible se acaban de usar: no salen
+        block_end = block_index * self.block_size + len(rows)
+        if len(rows) < self.block_size and (self._total_rows is None or block_end < self._total_rows):
+            self._total_rows = block_end # Último bloque: ya se sabe el total (o se borraron filas)
+        self._refresh_view()
+
+    def _on_count_loaded(self, generation: int, total: int):
+        if generation != self._generation: return
+        self._total_rows = total
+        self._refresh_view()
+        if self._on_loaded: self._on_loaded(total)
+
+    def _on_source_error(self, generation: int, function_name: str, error: BaseException, block_index: int | None = None):
+        print(f"ERROR (virtual_treeview.py - {function_name}): {error!r}")
+        if generation != self._generation: return
+        if block_index is not None:
+            self._pending_blocks.discard(block_index); self._blocks[block_index] = [] # No reintentar en bucle
+        elif self._total_rows is None:
+            self._total_rows = 0
+        self._awaiting_new_source = False
+        self._refresh_view()
+
+    def _row_at(self, index: int):
+        if self._rows_in_memory is not None:
+            return self._rows_in_memory[index] if 0 <= index < len(self._rows_in_memory) else None
+        rows = self._blocks.get(index // self.block_size)
+        position = index % self.block_size
+        return rows[position] if rows is not None and position < len(rows) else None
+
+    def _loaded_rows(self):
+        """(índice, fila) de todo lo que hay en memoria."""
+        if self._rows_in_memory is not None:
+            yield from enumerate(self._rows_in_memory)
+            return
+        for block_index, rows in self._blocks.items():
+            for position, row in enumerate(rows):
+                yield block_index * self.block_size + position, row
+
+    def _iid_for(self, row, index: int) -> str:
+        return str(self.row_id(row)) if self.row_id else f"row_{index}"
+
+    def _index_of(self, iid: str) -> int | None:
+        if self._rendered_generation == self._generation and iid in self._rendered_iids: # Pintado con los datos actuales
+            return self._rendered_first_row + self._rendered_iids.index(iid)
+        return next((index for index, row in self._loaded_rows() if self._iid_for(row, index) == iid), None)
+
+    def get_row(self, iid):
+        """Datos de la fila con ese iid si están cargados (la seleccionada casi siempre lo está)."""
+        index = self._index_of(str(iid))
+        return self._row_at(index) if index is not None else None
+
+    # --- PINTADO DE LA VENTANA VISIBLE ---
+    def _refresh_view(self):
+        if self._total_rows is not None: # Sin total aún (recarga en curso) se conserva la posición
+            self._first_row = min(self._first_row, max(0, self._total_rows - self._visible_rows))
+        self._request_missing_blocks()
+        self._update_scrollbar()
+        if self._render_after_id is None: # Varios bloques, el recuento y la rueda en el mismo ciclo: un repintado
+            self._render_after_id = self.after_idle(self._render)
+
+    def _visible_blocks_pending(self) -> bool:
+        last_row = min(self._first_row + self._visible_rows, self._total_rows or 0) - 1
+        if last_row < self._first_row: return False
+        return any(block_index in self._pending_blocks
+                   for block_index in range(self._first_row // self.block_size, last_row // self.block_size + 1))
+
+    def _render(self):
+        self._render_after_id = None
+        if self._awaiting_new_source:
+            if self._total_rows is None or self._visible_blocks_pending(): return # Sigue lo anterior en pantalla
+            self._awaiting_new_source = False
+        rows = []
+        if self._total_rows == 0 and self.empty_values:
+            rows.append((f"{_PLACEHOLDER_IID_PREFIX}empty", self.empty_values))
+        elif self._total_rows:
+            rendered = set()
+            for index in range(self._first_row, min(self._first_row + self._visible_rows, self._total_rows)):
+                row = self._row_at(index)
+                iid = self._iid_for(row, index) if row is not None else f"{_PLACEHOLDER_IID_PREFIX}{index}"
+                if iid in rendered: # La misma fila en dos bloques (la BD cambió entre dos consultas)
+                    iid, row = f"{_PLACEHOLDER_IID_PREFIX}{index}", None
+                rendered.add(iid)
+                rows.append((iid, self.format_row(row) if row is not None else self.placeholder_values))
+        self._tree_sync.sync(rows) # Solo las filas que entran, salen o cambian
+        self._rendered_iids = [iid for iid, _ in rows] if self._total_rows else []
+        self._rendered_first_row, self._rendered_generation = self._first_row, self._generation
+        if not self._rendered_iids: return
+
+        pending_index = self._pending_selection_index
+        if pending_index is not None and self._row_at(pending_index) is not None:
+            self.selection_set(self._iid_for(self._row_at(pending_index), pending_index))
+        else:
+            self._show_selection()
+        self._measure_rows()
+
+    def _measure_rows(self):
+        """Ajusta el alto real de fila y cabecera con la primera fila pintada (fuentes y escalado de Windows)."""
+        bbox = self.tree.bbox(self._rendered_iids[0]) if self._rendered_iids else None
+        if not bbox: return # Aún no se ha dibujado la ventana
+        if (bbox[1], bbox[3]) != (self._header_height, self._row_height):
+            self._header_height, self._row_height = bbox[1], bbox[3]
+            self._on_tree_configure()
+
+    def _on_tree_configure(self, event=None):
+        height = self.tree.winfo_height()
+        if height <= 1: return # Aún sin tamaño
+        visible_rows = max(1, (height - self._header_height - 1) // self._row_height)
+        if visible_rows != self._visible_rows:
+            self._visible_rows = visible_rows
+            self._refresh_view()
+
+    def _update_scrollbar(self):
+        total = self._total_rows or 0
+        if total <= self._visible_rows:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(self._first_row / total, min(1.0, (self._first_row + self._visible_rows) / total))
+
+    # --- DESPLAZAMIENTO ---
+    def yview(self, *args):
+        """Comando de la barra: ('moveto', fracción) o ('scroll', n, 'units' | 'pages')."""
+        if not args or not self._total_rows: return
+        if args[0] == "moveto":
+            self._scroll_to(int(float(args[1]) * self._total_rows))
+        elif args[0] == "scroll":
+            step = int(args[1]) * (self._visible_rows if args[2] == "pages" else 1)
+            self._scroll_to(self._first_row + step)
+
+    def _scroll_to(self, first_row: int):
+        max_first_row = max(0, (self._total_rows or 0) - self._visible_rows)
+        first_row = min(max(0, first_row), max_first_row)
+        if first_row != self._first_row:
+            self._first_row = first_row
+            self._refresh_view()
+
+    def _scroll_rows(self, delta: int):
+        self._scroll_to(self._first_row + delta)
+        return "break"
+
+    def _on_mouse_wheel(self, event):
+        if not event.delta: return "break"
+        # Windows da múltiplos de 120 por paso; macOS, valores pequeños.
+        steps = -event.delta // 120 if abs(event.delta) >= 120 else (-1 if event.delta > 0 else 1)
+        return self._scroll_rows(steps * WHEEL_SCROLL_ROWS)
+
+    def see(self, iid):
+        """Desplaza la lista hasta la fila con ese iid (si está cargada)."""
+        index = self._index_of(str(iid))
+        if index is None: return
+        if index < self._first_row:
+            self._scroll_to(index)
+        elif index >= self._first_row + self._visible_rows:
+            self._scroll_to(index - self._visible_rows + 1)
+
+    # --- SELECCIÓN (lógica, por iid) ---
+    def selection(self) -> tuple:
+        return (self._selected_iid,) if self._selected_iid is not None else ()
+
+    def selection_set(self, iid):
+        """Selecciona la fila con ese iid (aunque aún no esté en pantalla); None quita la selección."""
+        iid = str(iid) if iid is not None else None
+        changed = iid != self._selected_iid
+        self._selected_iid = iid
+        self._pending_selection_index = None
+        self._show_selection()
+        if changed: self._notify_selection_changed()
+
+    def selection_clear(self):
+        self.selection_set(None)
+
+    def exists(self, iid) -> bool:
+        return self._index_of(str(iid)) is not None
+
+    def _show_selection(self):
+        """Refleja la selección lógica en los items pintados (vacía si la fila está fuera de la ventana)."""
+        if self._selected_iid in self._rendered_iids:
+            if self.tree.selection() != (self._selected_iid,):
+                self.tree.selection_set(self._selected_iid); self.tree.focus(self._selected_iid)
+        elif self.tree.selection():
+            self.tree.selection_set(())
+
+    def _on_tree_select(self, event=None):
+        # Tk también avisa cuando la selección cambia al repintar; solo cuenta un cambio a otra fila con datos.
+        selected = self.tree.selection()
+        iid = selected[0] if selected else None
+        if iid is None or iid == self._selected_iid: return
+        if iid.startswith(_PLACEHOLDER_IID_PREFIX): # Fila aún sin cargar: no seleccionable
+            self._show_selection(); return
+        self._selected_iid = iid
+        self._pending_selection_index = None
+        self._notify_selection_changed(event)
+
+    def _move_selection(self, step):
+        """Flechas, Re Pág/Av Pág, Inicio/Fin: mueven la selección por todo el listado, no solo lo pintado."""
+        if not self._total_rows: return "break"
+        current = self._index_of(self._selected_iid) if self._selected_iid is not None else None
+        if step == "home": index = 0
+        elif step == "end": index = self._total_rows - 1
+        else:
+            if step == "page_up": step = -self._visible_rows
+            elif step == "page_down": step = self._visible_rows
+            index = self._first_row if current is None else current + step
+        index = min(max(0, index), self._total_rows - 1)
+        if index < self._first_row: self._scroll_to(index)
+        elif index >= self._first_row + self._visible_rows: self._scroll_to(index - self._visible_rows + 1)
+        row = self._row_at(index)
+        if row is not None:
+            self.selection_set(self._iid_for(row, index))
+        else:
+            self._pending_selection_index = index # Se selecciona al llegar su bloque (_render)
+        return "break"
+
+    def _notify_selection_changed(self, event=None):
+        for callback in self._select_callbacks:
+            callback(event)
+
+    # --- API DE ttk.Treeview USADA POR LOS FRAMES ---
+    def heading(self, column, **options):
+        return self.tree.heading(column, **options)
+
+    def column(self, column, **options):
+        return self.tree.column(column, **options)
+
+    def bind(self, sequence=None, func=None, add=None):
+        """<<TreeviewSelect>> avisa de cambios de la selección lógica; el resto se enlaza al Treeview."""
+        if sequence == "<<TreeviewSelect>>":
+            self._select_callbacks.append(func); return None
+        return self.tree.bind(sequence, func, add)
+
+    def focus_set(self):
+        self.tree.focus_set()
+
+
+if __name__ == "__main__":
+    root = tk.Tk(); root.geometry("520x360")
+    sample_rows = [{"id": number, "name": f"Socio {number:06d}"} for number in range(100000)]
+    fetch_calls = []
+
+    def fetch_sample_rows(offset, limit, previous_row):
+        fetch_calls.append((offset, previous_row is not None)); return sample_rows[offset:offset + limit]
+
+    tree = VirtualTreeview(root, columns=("id", "name"), show="headings", selectmode="browse",
+                           row_id=lambda row: row["id"], format_row=lambda row: (row["id"], row["name"]))
+    tree.heading("id", text="ID"); tree.heading("name", text="Nombre")
+    tree.pack(fill="both", expand=True)
+    tree.bind("<<TreeviewSelect>>", lambda event: print("  seleccionado:", tree.selection()))
+    tree.set_row_source(fetch_sample_rows, lambda: len(sample_rows), on_loaded=lambda total: print(f"  total: {total:,}"))
+    root.update()
+    tree.yview("moveto", 0.5); tree.yview("scroll", 1, "pages"); tree.selection_set(50020); root.update()
+    print(f"  items de Tk: {len(tree.tree.get_children())} de {tree.total_rows:,} filas; consultas: {fetch_calls}")
+    root.after(1500, root.destroy); root.mainloop()
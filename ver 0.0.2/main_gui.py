@@ -13,10 +13,13 @@ import sys # Para sys.exit en caso de errores críticos
 try:
     import config # Configuraciones globales de la aplicación
 
-    # Módulos de inicialización del backend
-    from core_logic.utils import setup_app_data_directories
-    from core_logic.database import create_or_verify_tables
-    from core_logic.auth import initialize_superuser_account
+    # Solo lo necesario para pintar el login; la preparación (directorios, BD, superusuario) y los demás
+    # frames se cargan después, con la ventana ya en pantalla (gui_frames/startup.py).
+    from core_logic.database import close_all_db_connections, start_database_change_polling, stop_database_change_polling
+    from gui_frames.task_runner import TaskRunner
+    from gui_frames.startup import (
+        run_application_setup, preload_next_frame_module, StartupTimeline, STARTUP_PRELOAD_FRAME_MODULES
+    )
     
     # Los frames específicos de la GUI se importarán dinámicamente a través de _get_frame_class.
     # No es necesario listarlos aquí si se usa ese método de carga.
@@ -44,6 +47,8 @@ except ImportError as e_initial_import:
 class GymManagerApp(tk.Tk):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        self.startup_timeline = StartupTimeline() # Tiempos del arranque (benchmarks/bench_startup.py)
+        self.startup_ready = False # La BD está preparada y se puede iniciar sesión
 
         self.title(config.UI_MAIN_WINDOW_TITLE) # Título de config.py
         self.set_window_geometry()           # Método para tamaño y posición
@@ -56,6 +61,11 @@ class GymManagerApp(tk.Tk):
         self.style = ttk.Style(self)
         self.configure_global_styles()       # Método para aplicar estilos visuales
 
+        # Tareas en segundo plano (llamadas a core_logic fuera del hilo de Tk) y barra de estado que las muestra
+        self.task_runner = TaskRunner(self)
+        self.create_status_bar()
+        self.task_runner.add_busy_listener(self.on_background_tasks_changed)
+
         # Contenedor principal para los frames (vistas)
         self.main_container = ttk.Frame(self, style="App.TFrame") # Estilo base para el contenedor
         self.main_container.pack(side="top", fill="both", expand=True)
@@ -64,53 +74,70 @@ class GymManagerApp(tk.Tk):
 
         # Caché para las instancias de los frames
         self.frames_cache = {}
+        self.current_frame = None # Frame visible ahora mismo (los demás no refrescan ante cambios externos)
+
+        # Mostrar el frame de Login al iniciar (con el botón de entrar deshabilitado hasta preparar la BD)
+        self.show_frame_by_name("LoginFrame")
+
+        # En cuanto Tk pinte la ventana, preparar la aplicación en segundo plano
+        self.after_idle(self.perform_application_setup)
+
 
-        # --- Realizar tareas críticas de inicialización ---
-        if not self.perform_application_setup():
+    def perform_application_setup(self):
+        """Lanza las tareas de configuración inicial críticas con el login ya visible."""
+        self.startup_timeline.mark("login visible")
+        self.task_runner.submit(run_application_setup, key="application_setup", busy_message="Preparando la base de datos...",
+                                on_success=self.on_application_setup_done, on_error=self.on_application_setup_error)
+
+    def on_application_setup_done(self, result: tuple[bool, str]):
+        success, error_message = result
+        if not success:
             # Si el setup falla (ej. no se puede crear BD), la app no puede continuar.
-            # perform_application_setup ya debería haber cerrado la ventana si es necesario.
-            return # Evitar continuar si el setup falló
+            messagebox.showerror("Error Crítico de Arranque", f"{error_message}\nLa aplicación se cerrará.")
+            self.destroy(); return
+        self.startup_ready = True
+        self.startup_timeline.mark("login listo")
+        login_frame = self.frames_cache.get("LoginFrame")
+        if login_frame: login_frame.update_startup_state()
+
+        # Vigilar los cambios que hagan otros PCs en la BD (los frames se suscriben a sus tablas)
+        start_database_change_polling(self)
+        # Importar los demás frames mientras el usuario escribe sus credenciales
+        self.pending_frame_modules = list(STARTUP_PRELOAD_FRAME_MODULES)
+        self.after_idle(self.preload_frame_modules_step)
+
+    def on_application_setup_error(self, error: BaseException):
+        print(f"ERROR CRÍTICO (main_gui.py - Setup): {error!r}")
+        self.on_application_setup_done((False, f"Error inesperado al preparar la aplicación:\n{error}"))
+
+    def preload_frame_modules_step(self):
+        """Un módulo por cada vez que Tk queda ocioso: la ventana sigue atendiendo al teclado entre uno y otro."""
+        if preload_next_frame_module(self.pending_frame_modules):
+            self.after_idle(self.preload_frame_modules_step)
+        else:
+            self.startup_timeline.mark("frames precargados")
+            print(f"INFO (main_gui.py - Arranque): {self.startup_timeline.summary()}")
 
-        # Mostrar el frame de Login al iniciar
-        self.show_frame_by_name("LoginFrame")
 
+    def create_status_bar(self):
+        """Barra inferior con el progreso de las tareas en segundo plano (oculta si no hay ninguna)."""
+        self.status_bar = ttk.Frame(self, style="App.TFrame", padding=(8, 2))
+        self.status_bar_label = ttk.Label(self.status_bar, text="", background="#EAECEE")
+        self.status_bar_progress = ttk.Progressbar(self.status_bar, mode="indeterminate", length=160)
+        self.status_bar_label.pack(side="left"); self.status_bar_progress.pack(side="right")
+        self.status_bar_visible = False
 
-    def perform_application_setup(self) -> bool:
-        """Realiza las tareas de configuración inicial críticas y necesarias."""
-        print_prefix_setup = "INFO (main_gui.py - Setup):"
-
-        # 1. Asegurar directorios de datos de la aplicación
-        print(f"{print_prefix_setup} Verificando/Creando directorios de datos...")
-        if not setup_app_data_directories(): # De core_logic.utils
-            messagebox.showerror(
-                "Error Crítico de Directorios",
-                "No se pudieron crear los directorios necesarios para la aplicación.\n"
-                "Verifique los permisos de escritura en la carpeta del proyecto.\n"
-                "La aplicación se cerrará."
-            )
-            self.destroy()
-            return False
-        print(f"{print_prefix_setup} Directorios de datos listos.")
-
-        # 2. Inicializar la base de datos (crear tablas si no existen)
-        print(f"{print_prefix_setup} Verificando/Creando tablas de la base de datos...")
-        if not create_or_verify_tables(): # De core_logic.database
-             messagebox.showerror(
-                "Error Crítico de Base de Datos",
-                "No se pudo inicializar la base de datos (crear/verificar tablas).\n"
-                "Verifique la consola para más detalles. La aplicación se cerrará."
-            )
-             self.destroy()
-             return False
-        print(f"{print_prefix_setup} Base de datos lista.")
-        
-        # 3. Inicializar la cuenta de superusuario
-        print(f"{print_prefix_setup} Verificando/Creando cuenta de superusuario...")
-        initialize_superuser_account() # De core_logic.auth
-        print(f"{print_prefix_setup} Cuenta de superusuario lista.")
-        
-        print(f"{print_prefix_setup} Configuración inicial completada exitosamente.")
-        return True
+
+    def on_background_tasks_changed(self, active_task_count: int, busy_message: str | None):
+        if active_task_count:
+            self.status_bar_label.config(text=busy_message or f"Cargando... ({active_task_count})")
+            if not self.status_bar_visible:
+                self.status_bar.pack(side="bottom", fill="x", before=self.main_container)
+                self.status_bar_progress.start(15)
+                self.config(cursor="watch"); self.status_bar_visible = True
+        elif self.status_bar_visible:
+            self.status_bar_progress.stop(); self.status_bar.pack_forget()
+            self.config(cursor=""); self.status_bar_visible = False
 
 
     def set_window_geometry(self, width_percent=0.85, height_percent=0.9):
@@ -290,6 +317,7 @@ class GymManagerApp(tk.Tk):
             self.after(20, lambda f=frame_instance: f.give_focus()) # Dar foco si no hay on_show
 
         frame_instance.tkraise() # Traer al frente
+        self.current_frame = frame_instance
         self.update_app_title()
 
 
@@ -362,6 +390,9 @@ if __name__ == "__main__":
     try:
         app = GymManagerApp() # Crear la instancia de la aplicación
         app.mainloop()        # Iniciar el bucle principal de eventos de Tkinter
+        stop_database_change_polling()
+        app.task_runner.shutdown() # Espera a las tareas en marcha antes de cerrar sus conexiones
+        close_all_db_connections() # Cerrar las conexiones persistentes de core_logic
         print(f"INFO (main_gui.py): {config.APP_NAME} cerrado normalmente.")
     except Exception as e_startup_fatal:
         # Este try-except captura errores muy tempranos (antes del mainloop o si mainloop falla críticamente)